@@ -0,0 +1,237 @@
+## Benchmarks of every pipeline stage on replayed data, for 10, 1k and 100k
+## simulations. Reports seconds, throughput and peak memory (tracemalloc).
+## Run from the repository root:
+##     python g0_testing/benchmark_pipeline.py
+##     python g0_testing/benchmark_pipeline.py --output benchmark.json
+##     python g0_testing/benchmark_pipeline.py --baseline benchmark.json
+## With --baseline it exits with an error if any stage got slower than the
+## tolerance allows
+
+import argparse
+import copy
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_nba_api import FakeNBAApi
+from g1_data_gathering.DataFetcher import DataFetcher
+from g1_data_gathering.GamelogSources import RecordingSource, ReplaySource
+from g2_input_reader.MatchupReader import MatchupReader
+from g3_performance_modeler.PerformanceModeler import PerformanceModeler
+from g4_matchup_calculator.MatchupCalculator import MatchupCalculator
+
+INPUT_PATH = Path(__file__).parents[1] / "example_input.xlsx"
+
+
+def measure(function, repeat=3, track_memory=True):
+    """Time a function and measure its peak memory
+
+    Args:
+        function (function): Function without arguments
+        repeat (int, optional): Number of timed runs, the best one is
+            kept. Defaults to 3.
+        track_memory (bool, optional): Do one more run under tracemalloc
+            to get the peak memory. Defaults to True.
+
+    Returns:
+        dict: Dict with the best wall time and the peak memory in MB
+    """
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    peak_memory = None
+    if track_memory:
+        # tracemalloc slows allocations down, so it gets a run of its own
+        tracemalloc.start()
+        function()
+        peak_memory = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+
+    return {"seconds": min(times), "peak_memory_mb": peak_memory}
+
+
+def record_fixtures(fixture_dir, matchup):
+    """Record the gamelogs of every player in a matchup from the fake API
+
+    Args:
+        fixture_dir (str): Folder to save the fixtures in
+        matchup (dict): Output of MatchupReader.read_given_excel
+    """
+    datafetcher = DataFetcher(source=RecordingSource(fixture_dir, FakeNBAApi(number_of_games=82)))
+    for key in matchup.keys():
+        for player in matchup[key]["Player"]:
+            datafetcher.get_player_clean_gamelog(player)
+
+
+def filled_game_dicts(matchup_calculator, game_dict, number_of_simulations):
+    """Team sheets filled with forecasts, the input of process_game"""
+    forecasts = matchup_calculator._MatchupCalculator__generate_game_scenarios(
+        game_dict, number_of_simulations, np.random.default_rng(0))
+
+    return [{key: matchup_calculator._MatchupCalculator__fill_gamesheet_with_forecast(
+            game_dict[key]["team_sheet"], forecasts[key], i)
+        for key in game_dict.keys()}
+        for i in range(number_of_simulations)]
+
+
+def run_benchmarks(sizes, legacy_max, repeat, latency):
+    """Run every stage benchmark
+
+    Args:
+        sizes (list): Numbers of simulations
+        legacy_max (int): Largest number of simulations for the team sheet
+            (non vectorized) stages, which take about 0.3s per game
+        repeat (int): Number of timed runs per benchmark
+        latency (float): Seconds every replayed request takes
+
+    Returns:
+        list: List of dicts with stage, simulations, seconds, throughput
+            and peak memory
+    """
+    results = []
+
+    def add_result(stage, number_of_simulations, units, measurement):
+        measurement.update({"stage": stage, "simulations": number_of_simulations,
+            "throughput": units / measurement["seconds"]})
+        results.append(measurement)
+        print_result(measurement)
+
+    matchupreader = MatchupReader(DataFetcher())
+    add_result("read_given_excel", None, 1,
+        measure(lambda: matchupreader.read_given_excel(INPUT_PATH), repeat))
+    matchup = matchupreader.read_given_excel(INPUT_PATH)
+    players = [player for key in matchup.keys() for player in matchup[key]["Player"]]
+
+    with tempfile.TemporaryDirectory(prefix="benchmark_fixtures_") as fixture_dir:
+        record_fixtures(fixture_dir, matchup)
+        replay_source = ReplaySource(fixture_dir, latency=latency)
+
+        # a new DataFetcher per run so team gamelogs are not reused
+        def fetch_players():
+            datafetcher = DataFetcher(source=replay_source)
+            for player in players:
+                datafetcher.get_player_clean_gamelog(player)
+        add_result("get_player_clean_gamelog", None, len(players), measure(fetch_players, repeat))
+
+        datafetcher = DataFetcher(source=replay_source)
+        player_gamelog = datafetcher.get_player_clean_gamelog(players[0])
+        performance_modeler = PerformanceModeler()
+        game_dict = {key: MatchupCalculator(matchup, datafetcher=datafetcher)
+            .process_team_performances(matchup[key]) for key in matchup.keys()}
+
+        for number_of_simulations in sizes:
+            rng = np.random.default_rng(0)
+            add_result("determine_forecast", number_of_simulations, number_of_simulations,
+                measure(lambda: performance_modeler.determine_forecast(
+                    player_gamelog, number_of_simulations, rng), repeat))
+
+            matchup_calculator = MatchupCalculator(matchup, datafetcher=datafetcher, seed=0)
+            if number_of_simulations <= legacy_max:
+                game_simulations = filled_game_dicts(matchup_calculator, game_dict,
+                    number_of_simulations)
+                add_result("process_game", number_of_simulations, number_of_simulations,
+                    measure(lambda: [matchup_calculator.process_game(game_simulation)
+                        for game_simulation in game_simulations], 1))
+
+            forecasts = matchup_calculator._MatchupCalculator__generate_game_scenarios(
+                game_dict, number_of_simulations, np.random.default_rng(0))
+            team_matrices = {key: matchup_calculator.build_forecast_matrices(
+                game_dict[key]["team_sheet"], forecasts[key], number_of_simulations)
+                for key in game_dict.keys()}
+            add_result("process_forecast_matrices", number_of_simulations, number_of_simulations,
+                measure(lambda: matchup_calculator.process_forecast_matrices(team_matrices),
+                    repeat))
+
+            modes = {"generate_forecasts[vectorized]": ({"vectorized": True}, {}),
+                "generate_forecasts[summary_only]": ({}, {"summary_only": True})}
+            if number_of_simulations <= legacy_max:
+                modes["generate_forecasts[legacy]"] = ({}, {})
+            for stage, (calculator_kwargs, forecast_kwargs) in modes.items():
+                def generate_forecasts():
+                    MatchupCalculator(matchup, datafetcher=DataFetcher(source=replay_source),
+                        seed=0, **calculator_kwargs).generate_forecasts(
+                        copy.deepcopy(matchup), number_of_simulations, **forecast_kwargs)
+                add_result(stage, number_of_simulations, number_of_simulations,
+                    measure(generate_forecasts, 1 if "legacy" in stage else repeat))
+
+    return results
+
+
+def print_result(result):
+    simulations = "-" if result["simulations"] is None else str(result["simulations"])
+    peak_memory = "-" if result["peak_memory_mb"] is None else (
+        str(round(result["peak_memory_mb"], 1)) + " MB")
+    print(result["stage"].ljust(36) + simulations.rjust(8)
+        + (str(round(result["seconds"], 4)) + " s").rjust(14)
+        + (str(round(result["throughput"], 1)) + " /s").rjust(16)
+        + peak_memory.rjust(12))
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Find the stages that got slower than the baseline
+
+    Args:
+        results (list): Output of run_benchmarks
+        baseline (list): Output of an earlier run_benchmarks
+        tolerance (float): Allowed relative loss of throughput
+
+    Returns:
+        list: Descriptions of the regressions
+    """
+    baseline_throughput = {(result["stage"], result["simulations"]): result["throughput"]
+        for result in baseline}
+    regressions = []
+    for result in results:
+        key = (result["stage"], result["simulations"])
+        if key in baseline_throughput and (
+            result["throughput"] < baseline_throughput[key] * (1 - tolerance)):
+            regressions.append(str(key) + ": " + str(round(result["throughput"], 1))
+                + "/s vs " + str(round(baseline_throughput[key], 1)) + "/s")
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--legacy-max", type=int, default=100,
+        help="largest number of simulations for the team sheet stages")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0,
+        help="seconds every replayed request takes")
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+        help="allowed relative loss of throughput against the baseline")
+    arguments = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    # pandas SettingWithCopy warnings from DataFetcher would flood the table
+    warnings.simplefilter("ignore")
+    print("stage".ljust(36) + "sims".rjust(8) + "time".rjust(14)
+        + "throughput".rjust(16) + "peak mem".rjust(12))
+    results = run_benchmarks(arguments.sizes, arguments.legacy_max,
+        arguments.repeat, arguments.latency)
+
+    if arguments.output is not None:
+        Path(arguments.output).write_text(json.dumps(results, indent=2))
+    if arguments.baseline is not None:
+        regressions = compare_to_baseline(results,
+            json.loads(Path(arguments.baseline).read_text()), arguments.tolerance)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if len(regressions) > 0:
+            sys.exit(1)
@@ -0,0 +1,163 @@
+## Variance of the simulated home win probability with each sampling
+## method, on replayed data. Every method is run with many seeds and the
+## spread of its estimates gives the standard error, from which follows the
+## number of simulations needed for a target standard error. Common random
+## numbers are benchmarked on the difference between the lineup and the
+## lineup with one player benched. Run from the repository root:
+##     python g0_testing/benchmark_variance_reduction.py
+##     python g0_testing/benchmark_variance_reduction.py --target 0.0025 --output vr.json
+
+import argparse
+import copy
+import json
+import logging
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_pipeline import INPUT_PATH, record_fixtures
+from g1_data_gathering.DataFetcher import DataFetcher
+from g1_data_gathering.GamelogSources import ReplaySource
+from g2_input_reader.MatchupReader import MatchupReader
+from g4_matchup_calculator.MatchupCalculator import MatchupCalculator
+from g4_matchup_calculator.UniformSampler import SAMPLING_METHODS, UniformSampler
+
+
+def prepare_matchup():
+    """Matchup of the example input with its team sheets and forecast
+    samplers, so the replications only simulate
+
+    Returns:
+        tuple: MatchupCalculator, game dict and forecast samplers
+    """
+    matchup = MatchupReader(DataFetcher()).read_given_excel(INPUT_PATH)
+    # a game after the recorded season, so every player gets forecast
+    for key in matchup.keys():
+        matchup[key]["Game"] = 83
+    # the replications only simulate, so the fixtures are not needed afterwards
+    with tempfile.TemporaryDirectory(prefix="benchmark_fixtures_") as fixture_dir:
+        record_fixtures(fixture_dir, matchup)
+        matchup_calculator = MatchupCalculator(matchup,
+            datafetcher=DataFetcher(source=ReplaySource(fixture_dir)), seed=0)
+        output = matchup_calculator.generate_forecasts(copy.deepcopy(matchup), 1,
+            summary_only=True)
+
+    return matchup_calculator, output["game_dict"], output["player_forecasts"]
+
+
+def bench_player(game_dict, forecast_samplers):
+    """Same matchup with the first home player still to play left out"""
+    player = list(forecast_samplers["Home"].keys())[0]
+    benched_game_dict = copy.deepcopy(game_dict)
+    team_sheet = benched_game_dict["Home"]["team_sheet"]
+    benched_game_dict["Home"]["team_sheet"] = team_sheet[team_sheet["Player"] != player]
+    benched_samplers = {key: {name: samplers for name, samplers in forecast_samplers[key].items()
+            if name != player}
+        for key in forecast_samplers.keys()}
+
+    return benched_game_dict, benched_samplers
+
+
+def home_win_estimates(matchup_calculator, game_dict, forecast_samplers, uniform_sampler,
+    number_of_simulations, replications):
+    """Home win probability of one run per seed
+
+    Returns:
+        tuple: Estimates and the mean seconds per run
+    """
+    estimates = []
+    start = time.perf_counter()
+    for seed in range(replications):
+        matchup_calculator.seed = seed
+        simulation_summary = matchup_calculator.simulate_in_chunks(game_dict, forecast_samplers,
+            number_of_simulations, number_of_simulations, uniform_sampler=uniform_sampler)
+        estimates.append(simulation_summary.home_victories / number_of_simulations)
+
+    return np.array(estimates), (time.perf_counter() - start) / replications
+
+
+def run_benchmarks(number_of_simulations, replications, target):
+    """Standard error of every sampling method and of the lineup difference
+    with and without common random numbers
+
+    Args:
+        number_of_simulations (int): Simulations per run
+        replications (int): Runs (seeds) per method
+        target (float): Target standard error of the home win probability
+
+    Returns:
+        list: List of dicts with method, estimate, standard error, variance
+            ratio against random sampling, simulations needed for the target
+            and seconds per run
+    """
+    matchup_calculator, game_dict, forecast_samplers = prepare_matchup()
+    benched_game_dict, benched_samplers = bench_player(game_dict, forecast_samplers)
+
+    def add_result(method, estimates, seconds, reference=None):
+        standard_error = np.std(estimates, ddof=1)
+        result = {"method": method,
+            "estimate": float(np.mean(estimates)),
+            "standard_error": float(standard_error),
+            "variance_ratio": 1.0 if reference is None else float(
+                (reference["standard_error"] / standard_error)**2),
+            "simulations_for_target": int(np.ceil(number_of_simulations
+                * (standard_error / target)**2)),
+            "seconds": seconds}
+        results.append(result)
+        print_result(result)
+
+    results = []
+    for method in SAMPLING_METHODS:
+        estimates, seconds = home_win_estimates(matchup_calculator, game_dict,
+            forecast_samplers, UniformSampler(method), number_of_simulations, replications)
+        add_result(method, estimates, seconds, None if method == "random" else results[0])
+
+    # effect of benching a player, both lineups simulated with the same seeds
+    random_difference = None
+    for common_random_numbers in [False, True]:
+        uniform_sampler = UniformSampler("random", common_random_numbers)
+        estimates, seconds = home_win_estimates(matchup_calculator, game_dict,
+            forecast_samplers, uniform_sampler, number_of_simulations, replications)
+        benched_estimates, benched_seconds = home_win_estimates(matchup_calculator,
+            benched_game_dict, benched_samplers, uniform_sampler, number_of_simulations,
+            replications)
+        add_result("bench difference" + (" [crn]" if common_random_numbers else ""),
+            estimates - benched_estimates, seconds + benched_seconds, random_difference)
+        random_difference = results[-1]
+
+    return results
+
+
+def print_result(result):
+    print(result["method"].ljust(24) + str(round(result["estimate"], 4)).rjust(10)
+        + str(round(result["standard_error"], 5)).rjust(12)
+        + str(round(result["variance_ratio"], 1)).rjust(10)
+        + str(result["simulations_for_target"]).rjust(14)
+        + (str(round(result["seconds"], 3)) + " s").rjust(12))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the sampling methods")
+    parser.add_argument("--simulations", type=int, default=4096,
+        help="simulations per run, a power of 2 keeps sobol points balanced")
+    parser.add_argument("--replications", type=int, default=50)
+    parser.add_argument("--target", type=float, default=0.005,
+        help="target standard error of the home win probability")
+    parser.add_argument("--output", help="save the results as JSON")
+    arguments = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore")
+    print("method".ljust(24) + "estimate".rjust(10) + "std error".rjust(12)
+        + "var ratio".rjust(10) + "sims needed".rjust(14) + "time".rjust(12))
+    results = run_benchmarks(arguments.simulations, arguments.replications, arguments.target)
+
+    if arguments.output is not None:
+        Path(arguments.output).write_text(json.dumps(results, indent=2))
@@ -0,0 +1,49 @@
+## Factories shared by the simulation tests. Run with python -m pytest from
+## the repository root
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from g3_performance_modeler.FppmSampler import FppmSampler
+from g4_matchup_calculator.MatchupCalculator import MatchupCalculator
+
+POSSIBLE_FPPM = np.round(np.arange(0, 3.1, 0.1), 2)
+
+
+@pytest.fixture
+def make_team():
+    def make_team(prefix, minutes, rng, played=()):
+        """Team sheet plus forecast samplers of the players that have not played"""
+        team_sheet = pd.DataFrame({"Player": [prefix + str(i) for i in range(len(minutes))],
+            "Game": 30, "Position": ["G", "F", "C", "GF", "F"][:len(minutes)],
+            "Order": range(1, len(minutes) + 1), "Sec_order": 0,
+            "MIN": np.nan, "FP": np.nan, "FPPM": np.nan, "GAME_PLAYED": 0})
+        forecast_samplers = {}
+        for i in range(len(minutes)):
+            if i in played:
+                team_sheet.loc[i, ["MIN", "FPPM", "GAME_PLAYED"]] = [minutes[i], 1.13, 1]
+            else:
+                forecast_samplers[prefix + str(i)] = {"minute_forecast": minutes[i],
+                    "fppm_sampler": FppmSampler(POSSIBLE_FPPM,
+                        rng.dirichlet(np.full(len(POSSIBLE_FPPM), 0.3)))}
+
+        return team_sheet, forecast_samplers
+
+    return make_team
+
+
+@pytest.fixture
+def make_matchup(make_team):
+    def make_matchup(seed=1):
+        """MatchupCalculator, game dict and forecast samplers of a test matchup"""
+        rng = np.random.default_rng(0)
+        home_sheet, home_samplers = make_team("h", [20, 25, 18, 22, 15], rng, played=(1,))
+        away_sheet, away_samplers = make_team("a", [24, 21, 19, 23, 17], rng)
+        game_dict = {"Home": {"team_sheet": home_sheet}, "Away": {"team_sheet": away_sheet}}
+        forecast_samplers = {"Home": home_samplers, "Away": away_samplers}
+
+        return (MatchupCalculator(game_dict, datafetcher=None, seed=seed), game_dict,
+            forecast_samplers)
+
+    return make_matchup
@@ -0,0 +1,244 @@
+## Offline stand-ins for the nba_api gamelog endpoints, used by the tests
+## and benchmarks. Every team plays number_of_games games and every player
+## plays for a single team, missing some of its games
+
+import time
+import zlib
+import threading
+import numpy as np
+import pandas as pd
+from requests.exceptions import HTTPError
+
+from nba_api.stats.static import teams
+from nba_api.stats.endpoints import playergamelog, teamgamelog
+
+from g1_data_gathering.GamelogSources import filter_from_date
+
+NBA_TEAMS = sorted(teams.get_teams(), key=lambda team: team["id"])
+
+
+class FakeNBAApi():
+    def __init__(self, number_of_games=40, latency=0, failures_per_request=0,
+        league_player_ids=(), trades=None):
+        """Synthetic season served through objects with the same interface as
+            playergamelog.PlayerGameLog and teamgamelog.TeamGameLog
+
+        Args:
+            number_of_games (int, optional): Games played by every team.
+                Defaults to 40.
+            latency (float, optional): Seconds every request takes. Defaults to 0.
+            failures_per_request (int, optional): Number of times every
+                request fails with an HTTP 429 before succeeding. Defaults to 0.
+            league_player_ids (list, optional): Players in the league game
+                log. Defaults to none.
+            trades (dict, optional): Player ID -> (new team ID, game number
+                of the first game for the new team). Defaults to no trades.
+        """
+        self.number_of_games = number_of_games
+        self.latency = latency
+        self.failures_per_request = failures_per_request
+        self.league_player_ids = list(league_player_ids)
+        self.trades = {} if trades is None else trades
+        self.request_count = 0
+        self.failure_count = 0
+        self.__attempts = {}
+        self.__lock = threading.Lock()
+
+    def __team_for_player(self, player_id):
+        return NBA_TEAMS[int(player_id) % len(NBA_TEAMS)]
+
+    def team_gamelog(self, team_id):
+        """Build a team's raw gamelog
+
+        Args:
+            team_id (int): Team ID
+
+        Returns:
+            pd.DataFrame: Gamelog with the TeamGameLog columns
+        """
+        team_index = [team["id"] for team in NBA_TEAMS].index(int(team_id))
+        team = NBA_TEAMS[team_index]
+        rng = np.random.default_rng(int(team_id))
+        rows = []
+        for game in range(self.number_of_games):
+            opponent = NBA_TEAMS[(team_index + game + 1) % len(NBA_TEAMS)]
+            rows.append({
+                "Team_ID": int(team_id),
+                "Game_ID": "0021900" + str(team_index).zfill(2) + str(game).zfill(3),
+                "GAME_DATE": (pd.Timestamp("2019-10-22") + pd.Timedelta(days=2 * game))
+                    .strftime("%b %d, %Y").upper(),
+                "MATCHUP": team["abbreviation"] + " vs. " + opponent["abbreviation"],
+                "WL": "W" if rng.random() > 0.5 else "L",
+            })
+        gamelog_df = pd.DataFrame(rows)
+        # the endpoint returns the most recent games first
+        gamelog_df = gamelog_df.iloc[::-1].reset_index(drop=True)
+
+        return gamelog_df
+
+    def player_gamelog(self, player_id):
+        """Build a player's raw gamelog, without the games the player missed
+
+        Args:
+            player_id (int): Player ID
+
+        Returns:
+            pd.DataFrame: Gamelog with the PlayerGameLog columns
+        """
+        team = self.__team_for_player(player_id)
+        team_gamelog = self.team_gamelog(team["id"])
+        if int(player_id) in self.trades:
+            new_team_id, first_new_game = self.trades[int(player_id)]
+            # most recent games first: the new team's, then the old team's
+            games_with_new_team = self.number_of_games - first_new_game + 1
+            team_gamelog = pd.concat([self.team_gamelog(new_team_id).iloc[:games_with_new_team],
+                team_gamelog.iloc[games_with_new_team:]], ignore_index=True)
+        rng = np.random.default_rng(zlib.crc32(str(player_id).encode()))
+        played = rng.random(len(team_gamelog)) > 0.15
+        # the most recent game is always played so minute forecasts exist
+        played[0] = True
+        team_gamelog = team_gamelog[played].reset_index(drop=True)
+        number_of_games = len(team_gamelog)
+
+        fgm = rng.integers(0, 12, number_of_games)
+        ftm = rng.integers(0, 8, number_of_games)
+        oreb = rng.integers(0, 4, number_of_games)
+        dreb = rng.integers(0, 9, number_of_games)
+        gamelog_df = pd.DataFrame({
+            "SEASON_ID": "22019",
+            "Player_ID": int(player_id),
+            "Game_ID": team_gamelog["Game_ID"],
+            "GAME_DATE": team_gamelog["GAME_DATE"],
+            "MATCHUP": team_gamelog["MATCHUP"],
+            "WL": team_gamelog["WL"],
+            "MIN": rng.integers(8, 40, number_of_games),
+            "FGM": fgm,
+            "FGA": fgm + rng.integers(0, 10, number_of_games),
+            "FG_PCT": 0.0,
+            "FG3M": 0,
+            "FG3A": 0,
+            "FG3_PCT": 0.0,
+            "FTM": ftm,
+            "FTA": ftm + rng.integers(0, 3, number_of_games),
+            "FT_PCT": 0.0,
+            "OREB": oreb,
+            "DREB": dreb,
+            "REB": oreb + dreb,
+            "AST": rng.integers(0, 10, number_of_games),
+            "STL": rng.integers(0, 3, number_of_games),
+            "BLK": rng.integers(0, 3, number_of_games),
+            "TOV": rng.integers(0, 5, number_of_games),
+            "PF": rng.integers(0, 5, number_of_games),
+            "PTS": 2 * fgm + ftm,
+            "PLUS_MINUS": 0,
+            "VIDEO_AVAILABLE": 1,
+        })
+
+        return gamelog_df
+
+    def __request(self, key, build_function):
+        with self.__lock:
+            self.request_count = self.request_count + 1
+            attempts = self.__attempts.get(key, 0)
+            self.__attempts[key] = attempts + 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+        if attempts < self.failures_per_request:
+            with self.__lock:
+                self.failure_count = self.failure_count + 1
+            raise HTTPError("429 Client Error: Too Many Requests")
+
+        return build_function()
+
+    def get_gamelog(self, kind, entity_id, season=None, date_from=None):
+        """Serve a raw gamelog with the GamelogSources interface, so the fake
+            can be passed to DataFetcher(source=...) or recorded
+
+        Args:
+            kind (str): "player" or "team"
+            entity_id (int): Player or team id
+            season (str, optional): Season, ignored. Defaults to None.
+            date_from (pd.Timestamp, optional): Only games from this date
+                on. Defaults to None, all games.
+
+        Returns:
+            pd.DataFrame: Raw gamelog
+        """
+        if kind == "player":
+            gamelog_df = self.__request(("player", entity_id),
+                lambda: self.player_gamelog(entity_id))
+        else:
+            gamelog_df = self.__request(("team", entity_id), lambda: self.team_gamelog(entity_id))
+
+        return filter_from_date(gamelog_df, date_from)
+
+    def get_league_gamelog(self, kind, season=None):
+        """Serve a whole season of gamelogs in the LeagueGameLog format
+
+        Args:
+            kind (str): "player" or "team"
+            season (str, optional): Season, ignored. Defaults to None.
+
+        Returns:
+            pd.DataFrame: League game log, dates as YYYY-MM-DD
+        """
+        if kind == "player":
+            gamelogs = []
+            for player_id in self.league_player_ids:
+                team = self.__team_for_player(player_id)
+                gamelogs.append(self.player_gamelog(player_id).rename(
+                    columns={"Player_ID": "PLAYER_ID", "Game_ID": "GAME_ID"})
+                    .assign(TEAM_ID=team["id"], TEAM_ABBREVIATION=team["abbreviation"]))
+        else:
+            gamelogs = [self.team_gamelog(team["id"]).rename(
+                columns={"Team_ID": "TEAM_ID", "Game_ID": "GAME_ID"})
+                .assign(TEAM_ABBREVIATION=team["abbreviation"]) for team in NBA_TEAMS]
+        league_gamelog = self.__request(("league", kind), lambda: pd.concat(gamelogs,
+            ignore_index=True))
+        league_gamelog["GAME_DATE"] = pd.to_datetime(
+            league_gamelog["GAME_DATE"]).dt.strftime("%Y-%m-%d")
+
+        # the endpoint returns the whole season in date order
+        return league_gamelog.sort_values("GAME_DATE", kind="mergesort").reset_index(drop=True)
+
+    def install(self, monkeypatch):
+        """Replace the nba_api gamelog endpoints with this fake
+
+        Args:
+            monkeypatch (pytest.MonkeyPatch): pytest monkeypatch fixture
+        """
+        fake_api = self
+
+        class FakeEndpoint():
+            def __init__(self, gamelog_df):
+                self.gamelog_df = gamelog_df
+
+            def get_data_frames(self):
+                return [self.gamelog_df]
+
+        def player_endpoint(player_id, season=None, **kwargs):
+            return FakeEndpoint(fake_api.__request(("player", player_id),
+                lambda: fake_api.player_gamelog(player_id)))
+
+        def team_endpoint(team_id, season=None, **kwargs):
+            return FakeEndpoint(fake_api.__request(("team", team_id),
+                lambda: fake_api.team_gamelog(team_id)))
+
+        monkeypatch.setattr(playergamelog, "PlayerGameLog", player_endpoint)
+        monkeypatch.setattr(teamgamelog, "TeamGameLog", team_endpoint)
+
+
+class SeasonSoFar():
+    """Serve a fake season as it was on a given date"""
+
+    def __init__(self, source, last_date):
+        self.source = source
+        self.last_date = pd.Timestamp(last_date)
+        self.rows_served = 0
+
+    def get_gamelog(self, kind, entity_id, season, date_from=None):
+        gamelog_df = self.source.get_gamelog(kind, entity_id, season, date_from)
+        gamelog_df = gamelog_df[pd.to_datetime(gamelog_df["GAME_DATE"]) <= self.last_date]
+        self.rows_served = self.rows_served + len(gamelog_df)
+
+        return gamelog_df.reset_index(drop=True)
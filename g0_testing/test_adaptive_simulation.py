@@ -0,0 +1,47 @@
+## Adaptive number of simulations stopped by confidence interval width.
+## Run with python -m pytest from the repository root
+
+import pytest
+
+
+def test_stops_once_precision_is_reached(make_matchup):
+    matchup_calculator, game_dict, forecast_samplers = make_matchup()
+
+    simulation_summary, stopped_by = matchup_calculator.simulate_adaptively(game_dict,
+        forecast_samplers, max_simulations=1000000, precision=0.01, chunk_size=2000)
+    intervals = simulation_summary.get_confidence_intervals()
+
+    assert stopped_by == "precision"
+    assert intervals["home_win_probability"]["half_width"] <= 0.01
+    # +-1 pp needs roughly 1.96^2/4/0.01^2 ~ 9600 games at p ~ 0.5
+    assert simulation_summary.number_of_games < 12000
+    assert simulation_summary.number_of_games % 2000 == 0
+    # same seeds as simulating the same number of games in chunks
+    fixed = matchup_calculator.simulate_in_chunks(game_dict, forecast_samplers,
+        simulation_summary.number_of_games, 2000)
+    assert fixed.get_results_summary() == simulation_summary.get_results_summary()
+
+
+def test_stops_at_max_simulations_or_time_budget(make_matchup):
+    matchup_calculator, game_dict, forecast_samplers = make_matchup()
+
+    simulation_summary, stopped_by = matchup_calculator.simulate_adaptively(game_dict,
+        forecast_samplers, max_simulations=5000, precision=0.0001, chunk_size=2000)
+    assert stopped_by == "max_simulations"
+    assert simulation_summary.number_of_games == 5000
+
+    simulation_summary, stopped_by = matchup_calculator.simulate_adaptively(game_dict,
+        forecast_samplers, max_simulations=1000000, time_budget=0, chunk_size=2000)
+    assert stopped_by == "time_budget"
+    assert simulation_summary.number_of_games == 2000
+
+
+def test_invalid_stopping_rules_are_rejected(make_matchup):
+    matchup_calculator, game_dict, forecast_samplers = make_matchup()
+
+    for arguments in [{"max_simulations": 0}, {"max_simulations": -10},
+            {"max_simulations": 1000, "precision": 0},
+            {"max_simulations": 1000, "margin_precision": -1},
+            {"max_simulations": 1000, "time_budget": -1}]:
+        with pytest.raises(ValueError):
+            matchup_calculator.simulate_adaptively(game_dict, forecast_samplers, **arguments)
@@ -0,0 +1,118 @@
+## In memory LRU cache of clean gamelogs and game number lookups.
+## Run with python -m pytest from the repository root
+
+import threading
+
+import pandas as pd
+
+import g1_data_gathering.CleanGamelogCache as clean_gamelog_cache_module
+from fake_nba_api import FakeNBAApi, SeasonSoFar
+from g1_data_gathering.CleanGamelogCache import CleanGamelogCache
+from g1_data_gathering.DataFetcher import DataFetcher
+from g1_data_gathering.TeamGamelogRegistry import TeamGamelogRegistry
+
+PLAYERS = ["Stephen Curry", "Fred VanVleet", "Kawhi Leonard"]
+
+
+def test_player_is_built_once_for_several_game_numbers():
+    fake_api = FakeNBAApi()
+    datafetcher = DataFetcher(source=fake_api)
+
+    performances = [datafetcher.get_player_performance(PLAYERS[0], game_number)
+        for game_number in [3, 10, 25, 45]]
+
+    assert datafetcher.memory_cache.get_stats()["misses"] == 1
+    assert datafetcher.memory_cache.get_stats()["hits"] == 3
+    # the player's request plus the one of their team
+    assert fake_api.request_count == 2
+    player_gamelog = performances[0]["player_gamelog"]
+    expected = player_gamelog.loc[player_gamelog["GAME_NUMBER"] == 10, "FP"]
+    assert performances[1]["performance"]["FP"].tolist() == expected.tolist()
+    # after the last game the first one is returned as not played
+    assert performances[3]["performance"]["GAME_PLAYED"].tolist() == [0]
+
+
+def test_least_recently_used_gamelogs_are_evicted():
+    datafetcher = DataFetcher(source=FakeNBAApi())
+    gamelog_size = datafetcher.get_player_clean_gamelog(PLAYERS[0]).memory_usage(
+        deep=True).sum()
+    memory_cache = CleanGamelogCache(max_bytes=int(2.5 * gamelog_size))
+    datafetcher = DataFetcher(source=FakeNBAApi(), memory_cache=memory_cache)
+
+    datafetcher.get_player_clean_gamelog(PLAYERS[0])
+    datafetcher.get_player_clean_gamelog(PLAYERS[1])
+    datafetcher.get_player_clean_gamelog(PLAYERS[0])
+    datafetcher.get_player_clean_gamelog(PLAYERS[2])
+
+    cached_players = [player for player, _ in memory_cache.entries.keys()]
+    assert cached_players == [PLAYERS[0], PLAYERS[2]]
+    assert memory_cache.get_stats()["evictions"] == 1
+    assert memory_cache.total_bytes <= memory_cache.max_bytes
+
+
+def test_concurrent_requests_build_gamelog_once():
+    fake_api = FakeNBAApi(latency=0.05)
+    datafetcher = DataFetcher(source=fake_api)
+    gamelogs = []
+
+    def get_gamelog():
+        gamelogs.append(datafetcher.get_player_clean_gamelog(PLAYERS[0]))
+    threads = [threading.Thread(target=get_gamelog) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fake_api.request_count == 2
+    for gamelog in gamelogs:
+        pd.testing.assert_frame_equal(gamelog, gamelogs[0])
+
+
+def test_gamelogs_expire_and_are_returned_as_copies(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(clean_gamelog_cache_module.time, "time", lambda: now[0])
+    fake_api = FakeNBAApi()
+    datafetcher = DataFetcher(source=fake_api, memory_cache=CleanGamelogCache(ttl=60))
+
+    gamelog = datafetcher.get_player_clean_gamelog(PLAYERS[0])
+    gamelog.loc[:, "FP"] = -1
+    assert (datafetcher.get_player_clean_gamelog(PLAYERS[0])["FP"] != -1).all()
+    assert fake_api.request_count == 2
+
+    now[0] = now[0] + 61
+    datafetcher.get_player_clean_gamelog(PLAYERS[0])
+    # the player is built again, the team gamelog stays in the registry
+    assert fake_api.request_count == 3
+    assert datafetcher.memory_cache.get_stats()["expirations"] == 1
+
+
+def test_locks_of_evicted_gamelogs_are_dropped():
+    memory_cache = CleanGamelogCache(max_entries=1)
+    datafetcher = DataFetcher(source=FakeNBAApi(), memory_cache=memory_cache)
+
+    for player in PLAYERS:
+        datafetcher.get_player_clean_gamelog(player)
+
+    assert len(memory_cache._CleanGamelogCache__key_locks) == 1
+
+
+def test_expired_gamelog_picks_up_new_games(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(clean_gamelog_cache_module.time, "time", lambda: now[0])
+    season_so_far = SeasonSoFar(FakeNBAApi(), "2019-12-15")
+    datafetcher = DataFetcher(source=season_so_far, team_registry=TeamGamelogRegistry(),
+        memory_cache=CleanGamelogCache(ttl=60))
+    gamelog = datafetcher.get_player_clean_gamelog(PLAYERS[0])
+
+    season_so_far.last_date = pd.Timestamp("2020-01-31")
+    now[0] = now[0] + 61
+    gamelog = datafetcher.get_player_clean_gamelog(PLAYERS[0])
+
+    # the registered team gamelog is refreshed, so the new games get numbers
+    expected = DataFetcher(source=SeasonSoFar(FakeNBAApi(), "2020-01-31"),
+        team_registry=TeamGamelogRegistry()).get_player_clean_gamelog(PLAYERS[0])
+    assert datafetcher.memory_cache.get_stats()["expirations"] == 1
+    assert gamelog["GAME_DATE"].max() > pd.Timestamp("2019-12-15")
+    pd.testing.assert_frame_equal(
+        gamelog.sort_values("GAME_NUMBER").reset_index(drop=True),
+        expected.sort_values("GAME_NUMBER").reset_index(drop=True), check_dtype=False)
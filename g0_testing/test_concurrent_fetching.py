@@ -0,0 +1,110 @@
+## Concurrent player fetching against a stubbed NBA API with latency and
+## 429 failures. Run with python -m pytest from the repository root
+
+import time
+import pandas as pd
+import pytest
+
+from fake_nba_api import FakeNBAApi
+from g1_data_gathering.DataFetcher import DataFetcher
+from g1_data_gathering.ConcurrentFetcher import ConcurrentFetcher
+from g1_data_gathering.RequestThrottler import RequestThrottler
+from g4_matchup_calculator.LeagueCalculator import LeagueCalculator
+
+PLAYERS = ["Stephen Curry", "Fred VanVleet", "Kawhi Leonard", "Bradley Beal",
+    "Jamal Murray", "Steven Adams", "OG Anunoby", "Kyle Kuzma"]
+
+
+def test_concurrent_fetch_matches_sequential(monkeypatch):
+    FakeNBAApi().install(monkeypatch)
+    datafetcher = DataFetcher()
+    sequential = {player: datafetcher.get_player_performance(player, 35)
+        for player in PLAYERS}
+
+    fake_api = FakeNBAApi(latency=0.05, failures_per_request=1)
+    fake_api.install(monkeypatch)
+    throttler = RequestThrottler(requests_per_second=200, burst=20, backoff=0.01)
+    concurrent_fetcher = ConcurrentFetcher(DataFetcher(throttler=throttler), max_workers=8)
+    start = time.monotonic()
+    concurrent = concurrent_fetcher.get_player_performances(
+        [(player, 35) for player in PLAYERS])
+    elapsed = time.monotonic() - start
+
+    assert fake_api.failure_count > 0
+    assert throttler.retry_count == fake_api.failure_count
+    # sequentially this would take at least 2 requests x 2 attempts x latency per player
+    assert elapsed < len(PLAYERS) * 4 * fake_api.latency
+    for player in PLAYERS:
+        pd.testing.assert_frame_equal(concurrent[(player, 35)]["performance"],
+            sequential[player]["performance"])
+        pd.testing.assert_frame_equal(concurrent[(player, 35)]["player_gamelog"],
+            sequential[player]["player_gamelog"])
+
+
+def test_league_prefetch_fetches_each_player_once(monkeypatch):
+    fake_api = FakeNBAApi()
+    fake_api.install(monkeypatch)
+    matchups = [{"Home": pd.DataFrame({"Player": PLAYERS[:4], "Game": game_number}),
+        "Away": pd.DataFrame({"Player": PLAYERS[2:6], "Game": game_number})}
+        for game_number in [35, 50]]
+    throttler = RequestThrottler(requests_per_second=200, burst=20)
+    league_calculator = LeagueCalculator(matchups, DataFetcher(throttler=throttler), max_workers=4)
+    performances = league_calculator.prefetch_performances()
+
+    player_requests = fake_api.request_count - league_calculator.datafetcher.team_registry.fetch_count
+    assert player_requests == 6
+    assert len(performances) == 12
+    direct = DataFetcher().get_player_performance(PLAYERS[3], 50)
+    pd.testing.assert_frame_equal(performances[(PLAYERS[3], 50)]["performance"],
+        direct["performance"])
+
+
+def test_throttler_respects_rate():
+    throttler = RequestThrottler(requests_per_second=20, burst=1)
+    start = time.monotonic()
+    for i in range(6):
+        throttler.call(lambda: None)
+
+    assert time.monotonic() - start >= 5 / 20 * 0.9
+
+
+def test_nba_api_requests_are_throttled_by_default():
+    datafetcher = DataFetcher()
+    concurrent_fetcher = ConcurrentFetcher(datafetcher, max_workers=4)
+    assert isinstance(concurrent_fetcher.throttler, RequestThrottler)
+    # the caller's DataFetcher keeps its rate limiting
+    assert datafetcher.throttler is None
+
+    # offline sources are not rate limited
+    assert ConcurrentFetcher(DataFetcher(source=FakeNBAApi()), max_workers=4).throttler is None
+    # a DataFetcher with a throttler already limits every request
+    throttled_fetcher = DataFetcher(throttler=RequestThrottler())
+    assert ConcurrentFetcher(throttled_fetcher, max_workers=4).throttler is None
+
+
+def test_player_fetches_go_through_the_fetchers_throttler():
+    fake_api = FakeNBAApi(latency=0.01, failures_per_request=1)
+    datafetcher = DataFetcher(source=fake_api)
+    throttler = RequestThrottler(requests_per_second=200, burst=20, backoff=0.01)
+    concurrent_fetcher = ConcurrentFetcher(datafetcher, max_workers=4, throttler=throttler)
+
+    gamelogs = concurrent_fetcher.get_player_gamelogs(PLAYERS[:4])
+
+    assert set(gamelogs) == set(PLAYERS[:4])
+    # failed fetches were retried by the fetcher's throttler
+    assert throttler.retry_count >= len(PLAYERS[:4])
+    assert datafetcher.throttler is None
+
+
+def test_throttler_only_retries_request_errors():
+    throttler = RequestThrottler(backoff=0.01)
+    attempts = []
+
+    def parse_error():
+        attempts.append(1)
+        raise ValueError("not a gamelog")
+    with pytest.raises(ValueError):
+        throttler.call(parse_error)
+
+    assert len(attempts) == 1
+    assert throttler.retry_count == 0
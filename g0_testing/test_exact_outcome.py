@@ -0,0 +1,57 @@
+## Exact win probabilities from convolved FP distributions against
+## simulations. Run with python -m pytest from the repository root
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+from fake_nba_api import FakeNBAApi
+from g1_data_gathering.DataFetcher import DataFetcher
+from g4_matchup_calculator.MatchupCalculator import MatchupCalculator
+
+
+def test_exact_probabilities_match_simulation(make_team):
+    rng = np.random.default_rng(0)
+    home_sheet, home_samplers = make_team("h", [20, 25, 18, 22, 15], rng, played=(1,))
+    away_sheet, away_samplers = make_team("a", [24, 21, 19, 23, 17], rng)
+    game_dict = {"Home": {"team_sheet": home_sheet}, "Away": {"team_sheet": away_sheet}}
+    matchup_calculator = MatchupCalculator(game_dict, datafetcher=None, seed=1)
+    exact_outcome_calculator = matchup_calculator.exact_outcome_calculator
+
+    home_distribution = exact_outcome_calculator.team_fp_distribution(home_sheet, home_samplers)
+    away_distribution = exact_outcome_calculator.team_fp_distribution(away_sheet, away_samplers)
+    margins, probabilities = exact_outcome_calculator.margin_distribution(home_distribution,
+        away_distribution)
+    exact = exact_outcome_calculator.summarise(margins, probabilities)
+
+    number_of_simulations = 200000
+    simulated = matchup_calculator.simulate_in_chunks(game_dict,
+        {"Home": home_samplers, "Away": away_samplers}, number_of_simulations,
+        50000).get_results_summary()
+
+    assert not home_distribution["caps_bind"] and not away_distribution["caps_bind"]
+    assert abs(probabilities.sum() - 1) < 1e-9
+    for probability, count in [(exact["home_win_probability"], simulated["home_victories"]),
+        (exact["tie_probability"], simulated["unresolved_ties"])]:
+        standard_error = np.sqrt(probability * (1 - probability) / number_of_simulations)
+        assert abs(count / number_of_simulations - probability) < 4 * standard_error
+
+
+def test_calculate_exact_outcome_on_a_matchup():
+    datafetcher = DataFetcher(source=FakeNBAApi())
+    players = ["Stephen Curry", "Fred VanVleet", "Kawhi Leonard", "Bradley Beal",
+        "Jamal Murray", "Steven Adams"]
+    game_dict = {key: pd.DataFrame({"Player": players[i::2], "Game": 41,
+            "Position": ["G", "F", "C"], "Order": [1, 2, 3], "Sec_order": 0})
+        for i, key in enumerate(["Home", "Away"])}
+
+    output = MatchupCalculator(game_dict, datafetcher=datafetcher, seed=0).calculate_exact_outcome(
+        copy.deepcopy(game_dict), fallback_simulations=5000)
+    results_summary = output["results_summary"]
+
+    assert results_summary["method"] in ["exact", "simulated_ties"]
+    assert abs(results_summary["home_win_probability"] + results_summary["away_win_probability"]
+        + results_summary["tie_probability"] - 1) < 1e-9
+    assert abs(sum(results_summary["margin_distribution"].values()) - 1) < 1e-6
+    assert "convolve" in output["metrics"]["stages"]
@@ -0,0 +1,63 @@
+## Per team forecast matrices built straight from the team sheet and the
+## forecasts, against filling in a team sheet per simulation. Run with
+## python -m pytest from the repository root
+
+import numpy as np
+
+from g4_matchup_calculator.MatchupCalculator import MatchupCalculator
+
+
+def make_forecasts(make_team, number_of_simulations):
+    rng = np.random.default_rng(0)
+    home_sheet, home_samplers = make_team("h", [20, 25, 18, 22, 15], rng, played=(1,))
+    away_sheet, away_samplers = make_team("a", [34, 30, 25, 23, 27], rng, played=(0, 3))
+    # rows out of order, the matrices follow the Order column
+    team_sheets = {"Home": home_sheet.iloc[::-1], "Away": away_sheet}
+    forecast_dicts = {key: {player: {"minute_forecast": samplers[player]["minute_forecast"],
+            "fppm_forecast": samplers[player]["fppm_sampler"].sample(number_of_simulations + 5,
+                rng)}
+            for player in samplers.keys()}
+        for key, samplers in [("Home", home_samplers), ("Away", away_samplers)]}
+
+    return team_sheets, forecast_dicts
+
+
+def test_matrices_match_filled_team_sheets(make_team):
+    number_of_simulations = 50
+    team_sheets, forecast_dicts = make_forecasts(make_team, number_of_simulations)
+    matchup_calculator = MatchupCalculator({}, datafetcher=None)
+    fill_team_sheet = matchup_calculator._MatchupCalculator__fill_gamesheet_with_forecast
+
+    for key in team_sheets.keys():
+        team_matrices = matchup_calculator.build_forecast_matrices(team_sheets[key],
+            forecast_dicts[key], number_of_simulations)
+
+        assert team_matrices["minutes"].shape == (number_of_simulations, 5)
+        assert team_matrices["slots"]["players"] == [key[0].lower() + str(i) for i in range(5)]
+        for i in range(number_of_simulations):
+            filled_sheet = fill_team_sheet(team_sheets[key], forecast_dicts[key],
+                i).sort_values("Order")
+            np.testing.assert_array_equal(team_matrices["minutes"][i],
+                filled_sheet["MIN"].to_numpy(dtype=float))
+            np.testing.assert_array_equal(team_matrices["fppm"][i],
+                filled_sheet["FPPM"].to_numpy(dtype=float))
+
+
+def test_matrix_outcomes_match_team_sheet_cascade(make_team):
+    number_of_simulations = 10
+    team_sheets, forecast_dicts = make_forecasts(make_team, number_of_simulations)
+    matchup_calculator = MatchupCalculator({}, datafetcher=None)
+    fill_team_sheet = matchup_calculator._MatchupCalculator__fill_gamesheet_with_forecast
+
+    matrix_results = matchup_calculator.process_forecast_matrices({key:
+        matchup_calculator.build_forecast_matrices(team_sheets[key], forecast_dicts[key],
+            number_of_simulations)
+        for key in team_sheets.keys()})
+    for i in range(number_of_simulations):
+        expected = matchup_calculator.process_game({key: fill_team_sheet(team_sheets[key],
+            forecast_dicts[key], i) for key in team_sheets.keys()})
+
+        assert matrix_results["Result"][i] == expected["result"]["Result"]
+        assert matrix_results["Home"][i] == expected["result"]["Home"]
+        assert matrix_results["Away"][i] == expected["result"]["Away"]
+        assert matrix_results["extra_times"][i] == expected["extra_times"]
@@ -0,0 +1,88 @@
+## Statistical checks for the inverse CDF FPPM sampler. Run with
+## python -m pytest from the repository root
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chisquare
+
+from g3_performance_modeler.FppmSampler import FppmSampler
+from g3_performance_modeler.PerformanceModeler import PerformanceModeler
+
+
+def make_gamelog(seed=0, number_of_games=60):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"MIN": rng.integers(0, 40, number_of_games),
+        "FPPM": np.round(rng.normal(1.1, 0.5, number_of_games), 2)})
+
+
+def test_sampler_follows_pmf():
+    modeler = PerformanceModeler()
+    fppms = modeler._PerformanceModeler__preprocess_player_gamelog_for_fppm(make_gamelog())
+    probabilities = np.array(modeler._PerformanceModeler__calculate_probabilities(fppms))
+
+    outcomes = FppmSampler(modeler.possible_fppm, probabilities).sample(
+        200000, np.random.default_rng(1))
+    bin_index = np.rint(outcomes / modeler.bin_size).astype(int)
+    observed = np.bincount(bin_index, minlength=len(probabilities))
+
+    # bins with zero probability are never drawn
+    assert observed[probabilities == 0].sum() == 0
+    supported = probabilities > 0
+    _, p_value = chisquare(observed[supported], probabilities[supported] * len(outcomes))
+    assert p_value > 0.001
+
+
+def test_determine_fppm_forecast_returns_array_of_bins():
+    modeler = PerformanceModeler()
+    outcomes = modeler.determine_fppm_forecast(make_gamelog(2), number_of_simulations=1000)
+
+    assert isinstance(outcomes, np.ndarray)
+    assert len(outcomes) == 1000
+    assert np.isin(outcomes, modeler.possible_fppm).all()
+
+
+def test_sampler_handles_cdf_rounding():
+    sampler = FppmSampler([0, 0.1, 0.2, 0.3], [0.3, 0.3, 0.3999999, 0])
+
+    assert sampler.sample_from_uniforms(np.array([0.99999999]))[0] == 0.2
+
+
+def test_batch_probabilities_match_single_player():
+    for bin_size in [0.1, 0.25]:
+        modeler = PerformanceModeler(bin_size)
+        gamelogs = {i: make_gamelog(i, 30 + i) for i in range(5)}
+        batch = modeler.calculate_batch_probabilities(gamelogs)
+        for i in gamelogs:
+            fppm_bins = modeler._PerformanceModeler__preprocess_player_gamelog_for_fppm(gamelogs[i])
+            single = modeler._PerformanceModeler__calculate_probabilities(fppm_bins)
+            assert len(batch[i]) == len(modeler.possible_fppm)
+            assert np.array_equal(batch[i], single)
+            assert round(batch[i].sum(), 4) == 1
+
+
+def test_continuous_sampler_follows_fitted_distribution():
+    gamelog = make_gamelog(3, 80)
+    played_fppms = np.clip(gamelog.loc[gamelog["MIN"] > 0, "FPPM"], 0, 3)
+    for fppm_model in ["kde", "normal"]:
+        modeler = PerformanceModeler(fppm_model=fppm_model)
+        outcomes = modeler.determine_fppm_forecast(gamelog, 200000, np.random.default_rng(4))
+
+        assert outcomes.min() >= 0 and outcomes.max() <= modeler.max_fppm
+        # continuous, not restricted to the bins
+        assert len(np.unique(outcomes)) > 1000
+        assert abs(np.median(outcomes) - np.median(played_fppms)) < 0.1
+        assert abs(outcomes.std() - played_fppms.std()) < 0.1
+
+
+def test_continuous_tables_are_reused_between_runs(tmp_path):
+    gamelog = make_gamelog(5)
+    sampler = PerformanceModeler(fppm_model="kde", table_cache_dir=tmp_path).determine_fppm_sampler(
+        gamelog)
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+
+    cached = PerformanceModeler(fppm_model="kde", table_cache_dir=tmp_path).determine_fppm_sampler(
+        gamelog)
+    uniforms = np.random.default_rng(6).random(1000)
+    assert np.array_equal(cached.sample_from_uniforms(uniforms),
+        sampler.sample_from_uniforms(uniforms))
+    assert len(list(tmp_path.glob("*.npy"))) == 1
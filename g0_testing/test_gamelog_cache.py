@@ -0,0 +1,58 @@
+## On disk SQLite gamelog cache: expiry, invalidation and counters.
+## Run with python -m pytest from the repository root
+
+import pandas as pd
+
+import g1_data_gathering.GamelogCache as gamelog_cache_module
+from fake_nba_api import FakeNBAApi
+from g1_data_gathering.DataFetcher import DataFetcher
+from g1_data_gathering.GamelogCache import GamelogCache
+
+GAMELOG = pd.DataFrame({"Game_ID": ["001", "002"], "PTS": [10, 25]})
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(gamelog_cache_module.time, "time", lambda: now[0])
+    cache = GamelogCache(tmp_path / "cache.sqlite", ttl=60)
+
+    assert cache.get("player", 1, "2019-20") is None
+    cache.put("player", 1, "2019-20", GAMELOG)
+    now[0] = now[0] + 60
+    pd.testing.assert_frame_equal(cache.get("player", 1, "2019-20"), GAMELOG)
+    now[0] = now[0] + 1
+    assert cache.get("player", 1, "2019-20") is None
+
+    assert cache.get_stats() == {"hits": 1, "misses": 2}
+    # entries without expiry are kept however old they are
+    assert GamelogCache(tmp_path / "cache.sqlite", ttl=None).get("player", 1, "2019-20") is not None
+
+
+def test_invalidate_matches_given_arguments(tmp_path):
+    cache = GamelogCache(tmp_path / "cache.sqlite")
+    for kind, entity_id, season in [("player", 1, "2019-20"), ("player", 2, "2019-20"),
+        ("team", 1, "2019-20"), ("player", 1, "2018-19")]:
+        cache.put(kind, entity_id, season, GAMELOG)
+
+    assert cache.invalidate(kind="player", entity_id=1, season="2019-20") == 1
+    assert cache.get("player", 1, "2019-20") is None
+    assert cache.get("player", 1, "2018-19") is not None
+    assert cache.invalidate(kind="player") == 2
+    assert cache.get("team", 1, "2019-20") is not None
+    assert cache.invalidate() == 1
+
+
+def test_datafetcher_reuses_cached_gamelogs_across_runs(tmp_path):
+    fake_api = FakeNBAApi()
+    cache_path = tmp_path / "cache.sqlite"
+    gamelog = DataFetcher(cache=GamelogCache(cache_path), source=fake_api).get_player_clean_gamelog(
+        "Stephen Curry")
+    requests_made = fake_api.request_count
+
+    cache = GamelogCache(cache_path)
+    datafetcher = DataFetcher(cache=cache, source=fake_api)
+    pd.testing.assert_frame_equal(datafetcher.get_player_clean_gamelog("Stephen Curry"), gamelog)
+
+    assert fake_api.request_count == requests_made
+    assert datafetcher.request_count == 0
+    assert cache.get_stats() == {"hits": 2, "misses": 0}
@@ -0,0 +1,47 @@
+## Refreshing clean gamelogs with only the games played since they were built.
+## Run with python -m pytest from the repository root
+
+import pandas as pd
+
+from fake_nba_api import FakeNBAApi, SeasonSoFar
+from g1_data_gathering.DataFetcher import DataFetcher
+from g1_data_gathering.TeamGamelogRegistry import TeamGamelogRegistry
+
+PLAYERS = ["Stephen Curry", "Fred VanVleet", "Kawhi Leonard"]
+
+
+def test_refresh_matches_full_rebuild():
+    season_so_far = SeasonSoFar(FakeNBAApi(number_of_games=40), "2019-12-15")
+    datafetcher = DataFetcher(source=season_so_far, team_registry=TeamGamelogRegistry())
+    player_gamelogs = {player: datafetcher.get_player_clean_gamelog(player)
+        for player in PLAYERS}
+
+    season_so_far.last_date = pd.Timestamp("2020-01-31")
+    requests_before = datafetcher.request_count
+    season_so_far.rows_served = 0
+    refreshed = datafetcher.refresh_player_clean_gamelogs(player_gamelogs)
+    # one request per player and team, for the new games only
+    teams = {team for gamelog in player_gamelogs.values() for team in gamelog["Team_ID"]}
+    assert datafetcher.request_count - requests_before == len(PLAYERS) + len(teams)
+    assert season_so_far.rows_served < 20 * (len(PLAYERS) + len(teams))
+
+    full_fetcher = DataFetcher(source=FakeNBAApi(number_of_games=40),
+        team_registry=TeamGamelogRegistry())
+    for player in PLAYERS:
+        expected = full_fetcher.get_player_clean_gamelog(player)
+        assert len(refreshed[player]) > len(player_gamelogs[player])
+        assert set(refreshed[player].index) == set(expected.index)
+        pd.testing.assert_frame_equal(
+            refreshed[player].sort_values("GAME_NUMBER").reset_index(drop=True),
+            expected.sort_values("GAME_NUMBER").reset_index(drop=True),
+            check_dtype=False)
+
+
+def test_refresh_without_new_games_keeps_gamelog():
+    datafetcher = DataFetcher(source=FakeNBAApi(number_of_games=30),
+        team_registry=TeamGamelogRegistry())
+    player_gamelog = datafetcher.get_player_clean_gamelog(PLAYERS[0])
+
+    refreshed = datafetcher.refresh_player_clean_gamelog(PLAYERS[0], player_gamelog)
+
+    pd.testing.assert_frame_equal(refreshed, player_gamelog)
@@ -0,0 +1,47 @@
+## A league week of overlapping matchups: every player fetched and
+## forecast once. Run with python -m pytest from the repository root
+
+import pandas as pd
+
+from fake_nba_api import FakeNBAApi
+from g1_data_gathering.DataFetcher import DataFetcher
+from g3_performance_modeler.PerformanceModeler import PerformanceModeler
+from g4_matchup_calculator.LeagueCalculator import LeagueCalculator
+
+PLAYERS = ["Stephen Curry", "Fred VanVleet", "Kawhi Leonard", "Bradley Beal",
+    "Jamal Murray", "Steven Adams", "OG Anunoby", "Kyle Kuzma"]
+
+
+def team_sheet(players):
+    # game 45 comes after the fake season, so every player is forecast
+    return pd.DataFrame({"Player": players, "Game": 45, "Position": ["G", "F", "F", "C"],
+        "Order": [1, 2, 3, 4], "Sec_order": 0})
+
+
+def test_overlapping_matchups_forecast_each_player_once(monkeypatch):
+    forecast_players = []
+    determine_fppm_sampler = PerformanceModeler.determine_fppm_sampler
+
+    def count_forecast(self, player_gamelog):
+        forecast_players.append(player_gamelog["Player_ID"].iloc[0])
+        return determine_fppm_sampler(self, player_gamelog)
+    monkeypatch.setattr(PerformanceModeler, "determine_fppm_sampler", count_forecast)
+    fake_api = FakeNBAApi()
+    matchups = {"week_a": {"Home": team_sheet(PLAYERS[:4]), "Away": team_sheet(PLAYERS[4:])},
+        "week_b": {"Home": team_sheet(PLAYERS[2:6]), "Away": team_sheet(PLAYERS[6:] + PLAYERS[:2])}}
+    league_calculator = LeagueCalculator(matchups, DataFetcher(source=fake_api), max_workers=4,
+        seed=0)
+
+    output = league_calculator.generate_forecasts(200, summary_only=True, chunk_size=100)
+
+    assert sorted(forecast_players) == sorted(set(forecast_players))
+    assert len(forecast_players) == len(PLAYERS)
+    assert set(league_calculator.forecast_cache) == set(PLAYERS)
+    fetch_counts = output["fetch_counts"]
+    assert fetch_counts["player_slots"] == 16
+    assert fetch_counts["player_gamelogs"] == len(PLAYERS)
+    assert fetch_counts["forecasts"] == len(PLAYERS)
+    assert fake_api.request_count == len(PLAYERS) + fetch_counts["team_gamelogs"]
+    assert fetch_counts["memory_cache"]["misses"] == len(PLAYERS)
+    for name in matchups.keys():
+        assert output["results_summary"][name]["number_of_games"] == 200
@@ -0,0 +1,83 @@
+## Serving player gamelogs from a league wide store loaded in one pass.
+## Run with python -m pytest from the repository root
+
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from fake_nba_api import NBA_TEAMS, FakeNBAApi
+from g1_data_gathering.DataFetcher import DataFetcher
+from g1_data_gathering.LeagueGamelogStore import LeagueGamelogStore
+from g1_data_gathering.TeamGamelogRegistry import TeamGamelogRegistry
+
+PLAYERS = ["Stephen Curry", "Fred VanVleet", "Kawhi Leonard", "Bradley Beal",
+    "Jamal Murray", "Steven Adams"]
+# clean gamelogs built with the outer merge of player and team gamelogs the
+#   keyed join replaced, Fred VanVleet traded to NBA_TEAMS[0] from game 21 on
+OUTER_MERGE_FIXTURE = Path(__file__).parent / "fixtures" / "outer_merge_clean_gamelogs.json"
+
+
+def test_store_serves_same_gamelogs_as_player_endpoint(tmp_path):
+    per_player_fetcher = DataFetcher(source=FakeNBAApi())
+    player_ids = [per_player_fetcher.players_id_dict[player] for player in PLAYERS]
+    fake_api = FakeNBAApi(league_player_ids=player_ids)
+    store = LeagueGamelogStore.from_api(per_player_fetcher.season, fake_api)
+    store.save(tmp_path / "players.csv", tmp_path / "teams.csv")
+    store = LeagueGamelogStore.from_files(tmp_path / "players.csv", tmp_path / "teams.csv",
+        per_player_fetcher.season)
+
+    store_fetcher = DataFetcher(source=store)
+    for player in PLAYERS:
+        expected = per_player_fetcher.get_player_performance(player, 30)
+        served = store_fetcher.get_player_performance(player, 30)
+        pd.testing.assert_frame_equal(served["player_gamelog"], expected["player_gamelog"],
+            check_dtype=False)
+        pd.testing.assert_frame_equal(served["performance"], expected["performance"],
+            check_dtype=False)
+
+    assert fake_api.request_count == 2
+
+
+def test_clean_concatenated_player_gamelogs_in_one_call():
+    datafetcher = DataFetcher(source=FakeNBAApi())
+    player_ids = [datafetcher.players_id_dict[player] for player in PLAYERS]
+    raw_gamelogs = [datafetcher.source.get_gamelog("player", player_id)
+        for player_id in player_ids]
+
+    cleaned = datafetcher.clean_raw_player_gamelogs(pd.concat(raw_gamelogs, ignore_index=True))
+
+    expected = pd.concat([datafetcher.clean_raw_player_gamelogs(raw_gamelog)
+        for raw_gamelog in raw_gamelogs], ignore_index=True)
+    pd.testing.assert_frame_equal(cleaned, expected)
+    assert set(cleaned["Player_ID"]) == set(player_ids)
+    assert "PLUS_MINUS" not in cleaned.columns
+
+
+def test_batch_clean_gamelogs_match_single_player_ones():
+    single_fetcher = DataFetcher(source=FakeNBAApi(), team_registry=TeamGamelogRegistry())
+    batch_fetcher = DataFetcher(source=FakeNBAApi(), team_registry=TeamGamelogRegistry())
+
+    player_gamelogs = batch_fetcher.get_player_clean_gamelogs(PLAYERS)
+
+    assert list(player_gamelogs.keys()) == PLAYERS
+    for player in PLAYERS:
+        pd.testing.assert_frame_equal(player_gamelogs[player],
+            single_fetcher.get_player_clean_gamelog(player))
+
+
+def test_clean_gamelogs_match_outer_merge_fixture():
+    expected = {player: pd.read_json(json.dumps(table), orient="table")
+        for player, table in json.loads(OUTER_MERGE_FIXTURE.read_text()).items()}
+    player_id = DataFetcher(source=FakeNBAApi()).players_id_dict["Fred VanVleet"]
+    trades = {player_id: (NBA_TEAMS[0]["id"], 21)}
+
+    single_fetcher = DataFetcher(source=FakeNBAApi(trades=trades))
+    batch_gamelogs = DataFetcher(source=FakeNBAApi(trades=trades)).get_player_clean_gamelogs(
+        list(expected.keys()))
+
+    assert expected["Fred VanVleet"]["Team_ID"].nunique() == 2
+    for player in expected.keys():
+        pd.testing.assert_frame_equal(single_fetcher.get_player_clean_gamelog(player),
+            expected[player])
+        pd.testing.assert_frame_equal(batch_gamelogs[player], expected[player])
@@ -0,0 +1,151 @@
+## Array based minute allocation against the team sheet cascade of
+## MatchupCalculator.process_game. Run with python -m pytest from the
+## repository root
+
+import numpy as np
+import pandas as pd
+
+from g4_matchup_calculator.MatchupCalculator import MatchupCalculator
+
+POSITIONS = ["G", "F", "C", "GF", "FC", "FG", "CF"]
+
+
+def team_sheet(prefix, positions, minutes, fppm):
+    return pd.DataFrame({"Player": [prefix + str(i) for i in range(len(positions))],
+        "Game": 30, "Position": positions, "Order": range(1, len(positions) + 1),
+        "Sec_order": 0, "MIN": minutes, "FP": np.nan, "FPPM": fppm})
+
+
+def random_team_sheet(prefix, rng):
+    number_of_players = rng.integers(3, 8)
+    return team_sheet(prefix, list(rng.choice(POSITIONS, number_of_players)),
+        rng.integers(0, 49, number_of_players).astype(float),
+        np.round(rng.choice(np.arange(0, 2.1, 0.1), number_of_players), 2))
+
+
+def assert_same_outcomes(matchup_calculator, game_simulations):
+    """Compare both ways of processing games, returns the extra times needed"""
+    extra_times = []
+    vectorized = matchup_calculator.process_games_vectorized(game_simulations)
+    for game_dict, outcome in zip(game_simulations, vectorized):
+        expected = matchup_calculator.process_game(game_dict)
+
+        assert outcome["result"]["Result"] == expected["result"]["Result"]
+        assert outcome["result"]["Home"] == expected["result"]["Home"]
+        assert outcome["result"]["Away"] == expected["result"]["Away"]
+        assert outcome["extra_times"] == expected["extra_times"]
+        for key in ["Home", "Away"]:
+            np.testing.assert_array_equal(outcome["endgame_dict"][key]["FPU"],
+                expected["endgame_dict"][key]["FPU"].to_numpy(dtype=float))
+        extra_times.append(expected["extra_times"])
+
+    return extra_times
+
+
+def test_random_rosters_match_team_sheet_cascade():
+    rng = np.random.default_rng(2)
+    # ties that extra time can't break would go through 50 slow team sheet extra times
+    matchup_calculator = MatchupCalculator({}, datafetcher=None, max_extra_times=3)
+    extra_times = []
+    for i in range(30):
+        home_sheet = random_team_sheet("h", rng)
+        if i % 2 == 0:
+            away_sheet = random_team_sheet("a", rng)
+        else:
+            # the home roster plus a last center worth 2 FP ties the game
+            #   whenever centers have minutes left, so extra times are needed
+            away_sheet = pd.concat([home_sheet.assign(Player="a" + home_sheet["Player"]),
+                team_sheet("a_extra", ["C"], [2.0], [1.0]).assign(Order=len(home_sheet) + 1)],
+                ignore_index=True)
+        game_dict = {"Home": home_sheet, "Away": away_sheet}
+
+        extra_times = extra_times + assert_same_outcomes(matchup_calculator, [game_dict])
+
+    assert max(extra_times) > 1
+
+
+def test_tie_resolved_in_extra_time_matches_team_sheet_cascade():
+    # 96+1 against 98-1 in regulation, the home guard's last 4 minutes and
+    # the double position player's secondary slot only count in extra time
+    game_dict = {"Home": team_sheet("h", ["G", "FC"], [100, 0], [1.0, 1.5]),
+        "Away": team_sheet("a", ["G", "CF"], [96, 2], [1.0, 1.0])}
+    matchup_calculator = MatchupCalculator({}, datafetcher=None)
+
+    assert assert_same_outcomes(matchup_calculator, [game_dict]) == [2]
+
+
+def test_extra_time_on_top_matches_full_allocation():
+    rng = np.random.default_rng(3)
+    matchup_calculator = MatchupCalculator({}, datafetcher=None)
+    minute_allocator = matchup_calculator.minute_allocator
+    for i in range(20):
+        sheet = random_team_sheet("h", rng)
+        slots = minute_allocator.build_slots(sheet)
+        # many players wanting many minutes, so extra times change the allocation
+        minutes = rng.integers(0, 60, (200, len(sheet))).astype(float)
+        fppm = np.round(rng.choice(np.arange(0, 2.1, 0.1), (200, len(sheet))), 2)
+
+        allocation = minute_allocator.allocate(minutes, fppm, slots)
+        for no_of_extra_times in range(1, 4):
+            allocation = minute_allocator.allocate_extra_time(minutes, fppm, slots, allocation)
+            expected = minute_allocator.allocate(minutes, fppm, slots, no_of_extra_times)
+
+            np.testing.assert_allclose(allocation["used_minutes"], expected["used_minutes"])
+            np.testing.assert_allclose(allocation["fp"], expected["fp"])
+            for remaining, expected_remaining in zip(allocation["remaining_minutes"],
+                    expected["remaining_minutes"]):
+                np.testing.assert_allclose(remaining, expected_remaining)
+
+
+def test_only_tied_simulations_get_extra_time():
+    # one guard per team, per simulation: tie extra time can't break, home
+    # win in regulation, tie the away guard's last 10 minutes break
+    team_matrices = {key: {"slots": {"players": [key], "player_index": np.array([0]),
+            "position_index": np.array([0]), "is_secondary": np.array([False])},
+            "minutes": np.array([[minutes] for minutes in minutes_per_simulation]),
+            "fppm": np.ones((3, 1))}
+        for key, minutes_per_simulation in [("Home", [50, 50, 94]), ("Away", [52, 40, 106])]}
+    matchup_calculator = MatchupCalculator({}, datafetcher=None, max_extra_times=3)
+    minute_allocator = matchup_calculator.minute_allocator
+    extra_time_simulations = []
+    allocate_extra_time = minute_allocator.allocate_extra_time
+
+    def counting_allocate_extra_time(minutes, fppm, slots, previous_allocation):
+        extra_time_simulations.append(len(minutes))
+        return allocate_extra_time(minutes, fppm, slots, previous_allocation)
+
+    minute_allocator.allocate_extra_time = counting_allocate_extra_time
+    matrix_results = matchup_calculator.process_forecast_matrices(team_matrices)
+
+    assert list(matrix_results["Result"]) == ["Tie", "Home", "Away"]
+    assert list(matrix_results["extra_times"]) == [4, 1, 2]
+    assert matrix_results["unresolved_ties"] == 1
+    assert extra_time_simulations == [2, 2, 1, 1, 1, 1]
+    np.testing.assert_array_equal(matrix_results["allocations"]["Away"]["used_minutes"][:, 0],
+        [52, 40, 106])
+
+
+def test_process_game_calculates_team_sheets_once_and_reports_the_cap(monkeypatch):
+    calculate_fp = MatchupCalculator._MatchupCalculator__calculate_fp
+    extra_times_calculated = []
+
+    def counting_calculate_fp(self, team_sheet, no_of_extra_times=0):
+        extra_times_calculated.append(no_of_extra_times)
+        return calculate_fp(self, team_sheet, no_of_extra_times)
+    monkeypatch.setattr(MatchupCalculator, "_MatchupCalculator__calculate_fp",
+        counting_calculate_fp)
+    matchup_calculator = MatchupCalculator({}, datafetcher=None, max_extra_times=3)
+
+    # tie broken in the first extra time, see above
+    resolved = matchup_calculator.process_game({
+        "Home": team_sheet("h", ["G", "FC"], [100, 0], [1.0, 1.5]),
+        "Away": team_sheet("a", ["G", "CF"], [96, 2], [1.0, 1.0])})
+    assert extra_times_calculated == [1, 1]
+    assert resolved["result"]["Result"] == "Home" and not resolved["capped"]
+
+    # no player wants more minutes, so extra time can't break the tie
+    extra_times_calculated.clear()
+    capped = matchup_calculator.process_game({"Home": team_sheet("h", ["G"], [50], [1.0]),
+        "Away": team_sheet("a", ["G"], [52], [1.0])})
+    assert extra_times_calculated == [3, 3]
+    assert capped["result"]["Result"] == "Tie" and capped["capped"]
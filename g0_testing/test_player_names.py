@@ -0,0 +1,43 @@
+## Player name resolution against the NBA API static player list. Run with
+## python -m pytest from the repository root
+
+from nba_api.stats.static import players
+
+from g1_data_gathering.PlayerNameIndex import PlayerNameIndex
+
+
+def test_resolves_accents_suffixes_nicknames_and_typos():
+    name_index = PlayerNameIndex(players.get_players())
+    roster = name_index.resolve_roster(["Nikola Vucevic", "Wendell Carter Jr",
+        "Bruce Brown Jr", "Tim Hardaway Jr", "Moe Harkless", "Ellie Okobo",
+        "JJ Reddick", "Xyzzy Qwerty"])
+
+    assert roster["resolved"] == {"Nikola Vucevic": "Nikola Vučević",
+        "Wendell Carter Jr": "Wendell Carter Jr.", "Bruce Brown Jr": "Bruce Brown",
+        "Tim Hardaway Jr": "Tim Hardaway Jr.", "Moe Harkless": "Maurice Harkless",
+        "Ellie Okobo": "Elie Okobo", "JJ Reddick": "JJ Redick"}
+    assert list(roster["missing"]) == ["Xyzzy Qwerty"]
+    assert name_index.suggest("Kawhi Lenard")[0][0] == "Kawhi Leonard"
+
+
+def test_saved_index_is_reused_until_player_list_changes(tmp_path):
+    nba_players = players.get_players()
+    path = tmp_path / "name_index.pkl"
+    PlayerNameIndex.load_or_build(nba_players, path)
+    loaded = PlayerNameIndex.load_or_build(nba_players, path)
+    assert loaded.resolve("Luka Doncic") == "Luka Dončić"
+
+    rebuilt = PlayerNameIndex.load_or_build(nba_players[:100], path)
+    assert rebuilt.resolve("Luka Doncic") is None
+
+
+def test_player_ids_are_only_looked_up_without_typos():
+    name_index = PlayerNameIndex(players.get_players())
+
+    assert name_index.get_player_id("Nikola Vucevic") == name_index.get_player_id(
+        "Nikola Vučević")
+    assert name_index.get_player_id("Moe Harkless") is not None
+    # a typo could be another player, it is only resolved with the rename shown
+    assert name_index.get_player_id("Ellie Okobo") is None
+    assert name_index.resolve_roster(["Ellie Okobo"])["resolved"] == {
+        "Ellie Okobo": "Elie Okobo"}
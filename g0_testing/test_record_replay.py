@@ -0,0 +1,37 @@
+## Recording gamelogs from the (stubbed) NBA API and replaying them offline.
+## Run with python -m pytest from the repository root
+
+import time
+import pandas as pd
+from nba_api.stats.endpoints import playergamelog, teamgamelog
+
+from fake_nba_api import FakeNBAApi
+from g1_data_gathering.DataFetcher import DataFetcher
+from g1_data_gathering.GamelogSources import RecordingSource, ReplaySource
+
+PLAYERS = ["Stephen Curry", "Fred VanVleet", "Kawhi Leonard", "Bradley Beal"]
+
+
+def test_replay_matches_recording_without_api(monkeypatch, tmp_path):
+    FakeNBAApi().install(monkeypatch)
+    recording_source = RecordingSource(tmp_path)
+    recorded = {player: DataFetcher(source=recording_source).get_player_performance(player, 20)
+        for player in PLAYERS}
+
+    def offline(*args, **kwargs):
+        raise ConnectionError("offline")
+    monkeypatch.setattr(playergamelog, "PlayerGameLog", offline)
+    monkeypatch.setattr(teamgamelog, "TeamGameLog", offline)
+
+    replay_source = ReplaySource(tmp_path, latency=0.01)
+    datafetcher = DataFetcher(source=replay_source)
+    start = time.monotonic()
+    for player in PLAYERS:
+        replayed = datafetcher.get_player_performance(player, 20)
+        pd.testing.assert_frame_equal(replayed["player_gamelog"],
+            recorded[player]["player_gamelog"])
+        pd.testing.assert_frame_equal(replayed["performance"],
+            recorded[player]["performance"])
+
+    assert replay_source.request_count == recording_source.recorded_count
+    assert time.monotonic() - start >= replay_source.request_count * 0.01
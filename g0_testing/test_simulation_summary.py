@@ -0,0 +1,134 @@
+## Chunked aggregation of simulated games: merged totals, medians, player
+## contributions and the reservoir sample. Run with python -m pytest from
+## the repository root
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+from fake_nba_api import FakeNBAApi
+from g1_data_gathering.DataFetcher import DataFetcher
+from g4_matchup_calculator.MatchupCalculator import MatchupCalculator
+from g4_matchup_calculator.SimulationSummary import SimulationSummary
+
+
+def simulate_matrix_results(make_matchup, number_of_simulations):
+    """Outcome arrays of one seeded run of the test matchup"""
+    matchup_calculator, game_dict, forecast_samplers = make_matchup()
+    rng = np.random.default_rng(3)
+    team_matrices = {key: matchup_calculator.build_forecast_matrices(
+            game_dict[key]["team_sheet"],
+            {player: {"minute_forecast": samplers["minute_forecast"],
+                "fppm_forecast": samplers["fppm_sampler"].sample(number_of_simulations, rng)}
+                for player, samplers in forecast_samplers[key].items()},
+            number_of_simulations)
+        for key in game_dict.keys()}
+
+    return matchup_calculator.process_forecast_matrices(team_matrices)
+
+
+def slice_matrix_results(matrix_results, start, end):
+    sliced = dict(matrix_results)
+    for name in ["Home", "Away", "Result", "extra_times", "capped"]:
+        sliced[name] = matrix_results[name][start:end]
+    sliced["allocations"] = {key: {name: values[start:end] for name, values in allocation.items()}
+        for key, allocation in matrix_results["allocations"].items()}
+
+    return sliced
+
+
+def test_merged_chunks_match_a_single_chunk(make_matchup):
+    matrix_results = simulate_matrix_results(make_matchup, 5000)
+    single = SimulationSummary(reservoir_size=50, track_players=True,
+        rng=np.random.default_rng(0))
+    single.add_chunk(matrix_results, lambda i: i)
+
+    merged = SimulationSummary(reservoir_size=50, track_players=True,
+        rng=np.random.default_rng(1))
+    chunk_starts = [0, 1200, 1230, 4000, 5000]
+    for start, end in zip(chunk_starts[:-1], chunk_starts[1:]):
+        chunk_summary = SimulationSummary(reservoir_size=50, track_players=True,
+            rng=np.random.default_rng(start))
+        chunk_summary.add_chunk(slice_matrix_results(matrix_results, start, end),
+            lambda i, start=start: start + i)
+        merged.merge(chunk_summary)
+
+    single_results = single.get_results_summary()
+    merged_results = merged.get_results_summary()
+    for name in ["home_victories", "away_victories", "unresolved_ties",
+        "amount_of_extra_times", "number_of_games", "margin_distribution",
+        "average_home_margin", "average_away_margin"]:
+        assert merged_results[name] == single_results[name]
+    for key in ["Home", "Away"]:
+        for player, fpu in single_results["player_contributions"][key].items():
+            assert np.isclose(merged_results["player_contributions"][key][player], fpu)
+
+    margins = matrix_results["Home"] - matrix_results["Away"]
+    assert single_results["average_home_margin"] == np.median(margins[margins > 0])
+    assert single_results["average_away_margin"] == np.median(-margins[margins < 0])
+    # every FPU point of the home team is a player's, plus the home advantage
+    assert np.isclose(sum(single_results["player_contributions"]["Home"].values()),
+        matrix_results["Home"].sum() - 5000)
+
+    assert len(merged.reservoir) == 50
+    assert len(set(merged.reservoir)) == 50
+    assert all(0 <= game < 5000 for game in merged.reservoir)
+
+
+def test_merged_reservoir_is_a_uniform_sample(make_matchup):
+    matrix_results = simulate_matrix_results(make_matchup, 10)
+    times_sampled = np.zeros(10)
+    for seed in range(2000):
+        summary = SimulationSummary(reservoir_size=2, rng=np.random.default_rng(seed))
+        for start, end in [(0, 3), (3, 10)]:
+            chunk_summary = SimulationSummary(reservoir_size=2,
+                rng=np.random.default_rng([seed, start]))
+            chunk_summary.add_chunk(slice_matrix_results(matrix_results, start, end),
+                lambda i, start=start: start + i)
+            summary.merge(chunk_summary)
+        times_sampled[summary.reservoir] += 1
+
+    # each game is kept with probability 2/10, 400 times out of 2000
+    assert np.all(np.abs(times_sampled - 400) < 4 * np.sqrt(2000 * 0.2 * 0.8))
+
+
+def test_summary_only_forecasts():
+    players = ["Stephen Curry", "Fred VanVleet", "Kawhi Leonard", "Bradley Beal",
+        "Jamal Murray", "Steven Adams"]
+    game_dict = {key: pd.DataFrame({"Player": players[i::2], "Game": 41,
+            "Position": ["G", "F", "C"], "Order": [1, 2, 3], "Sec_order": 0})
+        for i, key in enumerate(["Home", "Away"])}
+    matchup_calculator = MatchupCalculator(game_dict,
+        datafetcher=DataFetcher(source=FakeNBAApi()), seed=0)
+
+    output = matchup_calculator.generate_forecasts(copy.deepcopy(game_dict), 3000,
+        summary_only=True, chunk_size=1000, reservoir_size=20, track_players=True)
+    results_summary = output["results_summary"]
+    rerun = matchup_calculator.simulate_in_chunks(output["game_dict"],
+        output["player_forecasts"], 3000, 1000, reservoir_size=20, track_players=True)
+
+    assert results_summary["number_of_games"] == 3000
+    assert (results_summary["home_victories"] + results_summary["away_victories"]
+        + results_summary["unresolved_ties"]) == 3000
+    assert sum(results_summary["margin_distribution"].values()) == 3000
+    assert len(output["simulated_games"]) == 20
+    assert set(results_summary["player_contributions"]["Home"]) == set(players[0::2])
+    rerun_summary = rerun.get_results_summary()
+    for name in ["home_victories", "margin_distribution", "player_contributions"]:
+        assert rerun_summary[name] == results_summary[name]
+
+
+def test_results_do_not_depend_on_the_number_of_processes(make_matchup):
+    summaries = []
+    for processes in [None, 2, 4]:
+        matchup_calculator, game_dict, forecast_samplers = make_matchup()
+        matchup_calculator.processes = processes
+        simulation_summary = matchup_calculator.simulate_in_chunks(game_dict, forecast_samplers,
+            20000, 3000, reservoir_size=10, track_players=True)
+        summaries.append((simulation_summary.get_results_summary(),
+            [(game["result"]["Home"], game["result"]["Away"])
+                for game in simulation_summary.reservoir]))
+
+    assert summaries[1] == summaries[0]
+    assert summaries[2] == summaries[0]
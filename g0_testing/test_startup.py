@@ -0,0 +1,39 @@
+## Import time and construction cost of the pipeline objects, measured in a
+## fresh interpreter. Run with python -m pytest from the repository root
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from g2_input_reader.MatchupReader import MatchupReader
+from g4_matchup_calculator.MatchupCalculator import MatchupCalculator
+from g1_data_gathering.DataFetcher import DataFetcher
+imported = time.perf_counter()
+matchupreader = MatchupReader()
+MatchupCalculator({}, datafetcher=matchupreader.datafetcher)
+MatchupCalculator({})
+constructed = time.perf_counter()
+print(json.dumps({"import_time": imported - start,
+    "construction_time": constructed - imported,
+    "endpoints_imported": "nba_api.stats.endpoints" in sys.modules,
+    "players_loaded": matchupreader.datafetcher._DataFetcher__players is not None,
+    "shared_fetcher_built": DataFetcher._shared is not None}))
+"""
+
+
+def test_pipeline_startup_is_lazy():
+    output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], check=True,
+        capture_output=True, text=True, cwd=Path(__file__).parents[1])
+    startup = json.loads(output.stdout.strip().splitlines()[-1])
+
+    assert not startup["endpoints_imported"]
+    assert not startup["players_loaded"]
+    # the process wide DataFetcher is opt in
+    assert not startup["shared_fetcher_built"]
+    # pandas and numpy dominate the import, the nba_api endpoints alone take seconds
+    assert startup["import_time"] < 5
+    assert startup["construction_time"] < 0.05
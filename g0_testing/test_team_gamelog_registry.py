@@ -0,0 +1,52 @@
+## Team gamelogs fetched once per registry, also under concurrent requests.
+## Run with python -m pytest from the repository root
+
+import pandas as pd
+
+from fake_nba_api import FakeNBAApi
+from g1_data_gathering.ConcurrentFetcher import ConcurrentFetcher
+from g1_data_gathering.DataFetcher import DataFetcher
+from g1_data_gathering.TeamGamelogRegistry import TeamGamelogRegistry
+
+# Murray and Adams, Anunoby and Embiid, Jokic, Doncic and Tatum are teammates
+#   in the fake API
+PLAYERS = ["Stephen Curry", "Fred VanVleet", "Kawhi Leonard", "Bradley Beal",
+    "Jamal Murray", "Steven Adams", "OG Anunoby", "Kyle Kuzma", "LeBron James",
+    "Anthony Davis", "Nikola Jokic", "Luka Doncic", "James Harden", "Kevin Durant",
+    "Joel Embiid", "Jayson Tatum"]
+
+
+def test_concurrent_players_fetch_each_team_once():
+    fake_api = FakeNBAApi(latency=0.05)
+    datafetcher = DataFetcher(source=fake_api)
+    gamelogs = ConcurrentFetcher(datafetcher, max_workers=16).get_player_gamelogs(PLAYERS)
+
+    teams = set(pd.concat(gamelogs.values())["Team_ID"])
+    assert len(teams) < len(PLAYERS)
+    assert datafetcher.team_registry.fetch_count == len(teams)
+    assert fake_api.request_count == len(PLAYERS) + len(teams)
+
+
+def test_refresh_and_clear():
+    registry = TeamGamelogRegistry()
+    fetched = []
+
+    def fetch_team_gamelog(team_id):
+        fetched.append(team_id)
+        return pd.DataFrame({"Team_ID": [team_id], "GAME_NUMBER": [1]})
+
+    def add_game(team_id, team_gamelog):
+        return pd.concat([team_gamelog, pd.DataFrame({"Team_ID": [team_id], "GAME_NUMBER": [2]})],
+            ignore_index=True)
+
+    assert registry.refresh_team_gamelog(1, "2019-20", add_game) is None
+    registry.get_team_gamelog(1, "2019-20", fetch_team_gamelog)
+    assert len(registry.refresh_team_gamelog(1, "2019-20", add_game)) == 2
+    # the refreshed gamelog is served without fetching again
+    assert len(registry.get_team_gamelog(1, "2019-20", fetch_team_gamelog)) == 2
+    assert fetched == [1]
+
+    registry.clear()
+    assert len(registry.get_team_gamelog(1, "2019-20", fetch_team_gamelog)) == 1
+    assert fetched == [1, 1]
+    assert registry.fetch_count == 2
@@ -0,0 +1,94 @@
+## Antithetic, Sobol and common random number draws of UniformSampler.
+## Run with python -m pytest from the repository root
+
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fake_nba_api import FakeNBAApi
+from g1_data_gathering.DataFetcher import DataFetcher
+from g4_matchup_calculator.MatchupCalculator import MatchupCalculator
+from g4_matchup_calculator.UniformSampler import UniformSampler
+
+
+def test_antithetic_and_sobol_draws():
+    seed_sequence = np.random.SeedSequence(0)
+
+    antithetic = UniformSampler("antithetic").draw(["a", "b"], 1000, seed_sequence)
+    np.testing.assert_allclose(antithetic[:, 500:], 1 - antithetic[:, :500])
+
+    sobol = UniformSampler("sobol").draw(["a", "b", "c"], 1024, seed_sequence)
+    assert sobol.shape == (3, 1024)
+    # every one of the 1024 equal bins of each dimension gets exactly one point
+    for row in sobol:
+        assert np.array_equal(np.sort(np.floor(row * 1024)), np.arange(1024))
+
+    with pytest.raises(ValueError):
+        UniformSampler("sobol", common_random_numbers=True)
+
+
+def test_common_random_numbers_follow_the_player():
+    seed_sequence = np.random.SeedSequence(0)
+    uniform_sampler = UniformSampler("random", common_random_numbers=True)
+
+    lineup = uniform_sampler.draw(["a", "b", "c"], 100, seed_sequence)
+    benched = uniform_sampler.draw(["a", "c"], 100, seed_sequence)
+    np.testing.assert_array_equal(lineup[[0, 2]], benched)
+
+    plain = UniformSampler().draw(["a", "c"], 100, seed_sequence)
+    assert not np.array_equal(lineup[2], plain[1])
+
+
+def test_variance_reduced_estimates_agree_with_random_sampling(make_matchup):
+    estimates = {}
+    for method in ["random", "antithetic", "sobol"]:
+        matchup_calculator, game_dict, forecast_samplers = make_matchup()
+        simulation_summary = matchup_calculator.simulate_in_chunks(game_dict,
+            forecast_samplers, 65536, 16384, uniform_sampler=UniformSampler(method))
+        estimates[method] = simulation_summary.home_victories / 65536
+
+    standard_error = np.sqrt(estimates["random"] * (1 - estimates["random"]) / 65536)
+    assert abs(estimates["antithetic"] - estimates["random"]) < 5 * standard_error
+    assert abs(estimates["sobol"] - estimates["random"]) < 5 * standard_error
+
+
+def test_sobol_chunks_are_rounded_to_powers_of_two(make_matchup):
+    assert UniformSampler("sobol").get_chunk_size(10000) == 8192
+    assert UniformSampler("sobol").get_chunk_size(4096) == 4096
+    assert UniformSampler("antithetic").get_chunk_size(10000) == 10000
+
+    matchup_calculator, game_dict, forecast_samplers = make_matchup()
+    simulation_summary = matchup_calculator.simulate_in_chunks(game_dict, forecast_samplers,
+        16384, 10000, uniform_sampler=UniformSampler("sobol"))
+    same_chunks = matchup_calculator.simulate_in_chunks(game_dict, forecast_samplers,
+        16384, 8192, uniform_sampler=UniformSampler("sobol"))
+
+    assert simulation_summary.get_results_summary() == same_chunks.get_results_summary()
+
+
+def test_full_output_forecasts_use_the_sampling_method():
+    players = ["Stephen Curry", "Fred VanVleet", "Kawhi Leonard", "Bradley Beal"]
+    game_dict = {key: pd.DataFrame({"Player": players[i::2], "Game": 41,
+            "Position": ["G", "F"], "Order": [1, 2], "Sec_order": 0})
+        for i, key in enumerate(["Home", "Away"])}
+    datafetcher = DataFetcher(source=FakeNBAApi())
+
+    for forecast_cache in [None, {}]:
+        matchup_calculator = MatchupCalculator(game_dict, datafetcher=datafetcher,
+            vectorized=True, seed=0)
+        output = matchup_calculator.generate_forecasts(copy.deepcopy(game_dict), 64,
+            forecast_cache=forecast_cache, sampling="antithetic")
+
+        # every simulated game is kept, the draws are the antithetic ones
+        assert len(output["simulated_games"]) == 64
+        uniforms = UniformSampler("antithetic").draw(players[0::2] + players[1::2], 64,
+            np.random.SeedSequence(0))
+        for i, (key, player) in enumerate([("Home", player) for player in players[0::2]]
+                + [("Away", player) for player in players[1::2]]):
+            fppm_sampler = matchup_calculator.performance_modeler.determine_fppm_sampler(
+                output["game_dict"][key]["player_gamelogs"][player])
+            np.testing.assert_array_equal(
+                output["player_forecasts"][key][player]["fppm_forecast"],
+                fppm_sampler.sample_from_uniforms(uniforms[i]))
@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import OrderedDict
+import logging
+
+logger = logging.getLogger("CleanGamelogCache")
+
+def index_game_numbers(player_gamelog):
+    """Index a clean gamelog by game number, for lookups without masking
+        the whole frame
+
+    Args:
+        player_gamelog (pd.DataFrame): Output of get_player_clean_gamelog
+
+    Returns:
+        dict: Dict with the row position of each game number and the set
+            of row labels
+    """
+    game_index = {"positions":{game_number:position for position, game_number
+            in enumerate(player_gamelog["GAME_NUMBER"].to_numpy())},
+        "labels":set(player_gamelog.index)}
+
+    return game_index
+
+
+class CleanGamelogCache():
+    def __init__(self,max_bytes=256*2**20,max_entries=None,ttl=6*60*60):
+        """In memory LRU cache of clean player gamelogs, so a player asked
+            for several game numbers or by several matchups is only built
+            once per process. The least recently used gamelogs are evicted
+            once the budget is exceeded, and gamelogs older than ttl are
+            built again so new games are picked up. Callers get copies, so
+            changing a returned gamelog does not change the cached one
+
+        Args:
+            max_bytes (int, optional): Memory budget for the cached frames.
+                Defaults to 256 MB.
+            max_entries (int, optional): Maximum number of gamelogs, None
+                for no limit. Defaults to None.
+            ttl (int, optional): Seconds a gamelog stays valid, None for no
+                expiry. Defaults to 6 hours, as GamelogCache.
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.__lock = threading.Lock()
+        self.__key_locks = {}
+
+    def get_player_gamelog(self,player_name,season,build_function):
+        """Get a clean gamelog, building it only if it is not cached
+
+        Args:
+            player_name (str): Player name
+            season (str): Season (ex: 2019-20)
+            build_function (function): Function that returns the clean
+                gamelog given the player name
+
+        Returns:
+            tuple: Clean gamelog and its game number index
+                (see index_game_numbers)
+        """
+        key = (player_name,season)
+        entry = self.__get(key)
+        if entry is not None:
+            return entry
+
+        with self.__lock:
+            key_lock = self.__key_locks.setdefault(key,threading.Lock())
+
+        # one lock per player so a gamelog is not built twice at once
+        with key_lock:
+            entry = self.__get(key,count=False)
+            if entry is None:
+                try:
+                    player_gamelog = build_function(player_name)
+                    entry = self.put(player_name,season,player_gamelog)
+                finally:
+                    # only cached gamelogs keep their lock
+                    with self.__lock:
+                        if key not in self.entries:
+                            self.__key_locks.pop(key,None)
+
+        return entry
+
+    def __get(self,key,count=True):
+        with self.__lock:
+            entry = self.entries.get(key)
+            if (entry is not None and self.ttl is not None
+                and time.time()-entry["stored_at"]>self.ttl):
+                self.__remove(key)
+                self.expirations = self.expirations+1
+                logger.debug("Gamelog of "+str(key[0])+" expired")
+                entry = None
+            if entry is not None:
+                self.entries.move_to_end(key)
+            if count:
+                if entry is None:
+                    self.misses = self.misses+1
+                else:
+                    self.hits = self.hits+1
+
+        if entry is None:
+            return None
+
+        return entry["gamelog"].copy(), entry["game_index"]
+
+    def __remove(self,key):
+        """Hidden method to drop an entry and its lock, with self.__lock held"""
+        self.total_bytes = self.total_bytes-self.entries.pop(key)["size"]
+        self.__key_locks.pop(key,None)
+
+    def put(self,player_name,season,player_gamelog):
+        """Store a clean gamelog, evicting the least recently used ones if
+            the budget is exceeded. Gamelogs larger than the whole budget
+            are not stored. A copy is stored, so the caller can keep
+            changing its gamelog
+
+        Args:
+            player_name (str): Player name
+            season (str): Season (ex: 2019-20)
+            player_gamelog (pd.DataFrame): Clean gamelog
+
+        Returns:
+            tuple: Clean gamelog and its game number index
+        """
+        key = (player_name,season)
+        game_index = index_game_numbers(player_gamelog)
+        size = int(player_gamelog.memory_usage(deep=True).sum())
+
+        with self.__lock:
+            if key in self.entries:
+                self.total_bytes = self.total_bytes-self.entries.pop(key)["size"]
+            if size<=self.max_bytes:
+                self.entries[key] = {"gamelog":player_gamelog.copy(),"game_index":game_index,
+                    "size":size,"stored_at":time.time()}
+                self.total_bytes = self.total_bytes+size
+            while (self.total_bytes>self.max_bytes
+                or (self.max_entries is not None and len(self.entries)>self.max_entries)):
+                evicted_key = next(iter(self.entries))
+                self.__remove(evicted_key)
+                self.evictions = self.evictions+1
+                logger.debug("Evicted gamelog of "+str(evicted_key[0]))
+
+        return player_gamelog, game_index
+
+    def invalidate(self,player_name=None):
+        """Remove gamelogs from the cache
+
+        Args:
+            player_name (str, optional): Player whose gamelogs are removed.
+                Defaults to None, all of them.
+
+        Returns:
+            int: Number of removed gamelogs
+        """
+        with self.__lock:
+            keys = [key for key in self.entries.keys()
+                if player_name is None or key[0]==player_name]
+            for key in keys:
+                self.__remove(key)
+
+        return len(keys)
+
+    def get_stats(self):
+        """Get cache counters
+
+        Returns:
+            dict: Dict with hits, misses, evictions, expirations, entries
+                and bytes
+        """
+        with self.__lock:
+            stats = {"hits":self.hits,
+                "misses":self.misses,
+                "evictions":self.evictions,
+                "expirations":self.expirations,
+                "entries":len(self.entries),
+                "bytes":self.total_bytes}
+
+        return stats
@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+from g1_data_gathering.GamelogSources import NBAApiSource
+from g1_data_gathering.RequestThrottler import RequestThrottler
+
+logger = logging.getLogger("ConcurrentFetcher")
+
+class ConcurrentFetcher():
+    def __init__(self,datafetcher,max_workers=8,throttler=None):
+        """Fetch many players' performances in parallel with a bounded
+            thread pool. Rate limiting and retries are done by the
+            DataFetcher's throttler if it has one. Otherwise every player
+            fetch goes through this fetcher's throttler, a default
+            RequestThrottler when the DataFetcher requests the NBA API, so
+            parallel requests to stats.nba.com are always rate limited
+            without changing the DataFetcher
+
+        Args:
+            datafetcher (DataFetcher): DataFetcher used for every request
+            max_workers (int, optional): Maximum number of threads.
+                Defaults to 8.
+            throttler (RequestThrottler, optional): Rate limits and retries
+                each player fetch when the DataFetcher has no throttler.
+                Defaults to None, a RequestThrottler for the NBA API.
+        """
+        if datafetcher.throttler is not None:
+            throttler = None
+        elif throttler is None and isinstance(datafetcher.source,NBAApiSource):
+            logger.info("No throttler given, rate limiting with the default RequestThrottler")
+            throttler = RequestThrottler()
+        self.datafetcher = datafetcher
+        self.max_workers = max_workers
+        self.throttler = throttler
+
+    def __call(self,function,*args,**kwargs):
+        """Hidden method to call a DataFetcher method through the throttler,
+            if this fetcher has one"""
+        if self.throttler is None:
+            return function(*args,**kwargs)
+
+        return self.throttler.call(function,*args,**kwargs)
+
+    def get_player_performances(self,player_requests):
+        """Get the performances of several players in parallel
+
+        Args:
+            player_requests (list): List of (player name, game number) tuples
+
+        Returns:
+            dict: Dict with the get_player_performance output for each
+                (player name, game number) tuple
+        """
+        # the same request can show up more than once, fetch it only once
+        unique_requests = list(dict.fromkeys(player_requests))
+        logger.info("Fetching "+str(len(unique_requests))+" players with "
+            +str(self.max_workers)+" workers...")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {request:executor.submit(self.__call,
+                self.datafetcher.get_player_performance,
+                player_name=request[0],game_number=request[1])
+                for request in unique_requests}
+            performances = {request:futures[request].result()
+                for request in unique_requests}
+
+        return performances
+
+    def get_player_gamelogs(self,player_names):
+        """Get the clean gamelogs of several players in parallel
+
+        Args:
+            player_names (list): List of player names
+
+        Returns:
+            dict: Dict with the clean gamelog of each player
+        """
+        unique_players = list(dict.fromkeys(player_names))
+        logger.info("Fetching "+str(len(unique_players))+" player gamelogs with "
+            +str(self.max_workers)+" workers...")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {player:executor.submit(self.__call,
+                self.datafetcher.get_player_clean_gamelog,player)
+                for player in unique_players}
+            gamelogs = {player:futures[player].result()
+                for player in unique_players}
+
+        return gamelogs
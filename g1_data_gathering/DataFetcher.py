@@ -1,11 +1,15 @@
 import pandas as pd
 import numpy as np
-import math
+import threading
 
 from nba_api.stats.static import teams
 from nba_api.stats.static import players
-from nba_api.stats.endpoints import teamgamelog
-from nba_api.stats.endpoints import playergamelog
+from nba_api.stats.library.parameters import Season
+
+from g1_data_gathering.TeamGamelogRegistry import TeamGamelogRegistry
+from g1_data_gathering.PlayerNameIndex import PlayerNameIndex
+from g1_data_gathering.GamelogSources import NBAApiSource
+from g1_data_gathering.CleanGamelogCache import CleanGamelogCache, index_game_numbers
 
 import logging
 
@@ -13,18 +17,104 @@ logger = logging.getLogger("DataFetcher")
 
 logging.basicConfig(level=logging.INFO)
 
+# team abbreviation (as in MATCHUP) -> team id, built once
+TEAM_IDS_BY_ABBREVIATION = {team["abbreviation"]:team["id"] for team in teams.get_teams()}
+
 ### One(?) does have to create a class that returns relevant FPs for a given player
 ## and game number (Nikola Vucevic, game 35)
 
 class DataFetcher:
-    def __init__(self):
-        self.nba_players = players.get_players()
-        self.players_id_dict = {
-            self.nba_players[i]["full_name"]: self.nba_players[i]["id"]
-            for i in range(len(self.nba_players))
-        }
-        self.nba_players_list = [self.nba_players[i]["full_name"]
-            for i in range(len(self.nba_players))]
+    # process wide instance, see get_shared
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self,cache=None,season=Season.default,team_registry=None,throttler=None,
+        name_index_path=None,source=None,memory_cache=None):
+        # optional GamelogCache to avoid hitting the NBA API on every run
+        self.cache = cache
+        self.season = season
+        # team gamelogs are fetched once per registry, pass
+        # TeamGamelogRegistry.get_shared() to share them process wide
+        if team_registry is None:
+            team_registry = TeamGamelogRegistry()
+        self.team_registry = team_registry
+        # optional RequestThrottler for rate limiting and retries
+        self.throttler = throttler
+        # where raw gamelogs come from, pass a RecordingSource or
+        # ReplaySource (GamelogSources) to record or to run offline
+        if source is None:
+            source = NBAApiSource()
+        self.source = source
+        # clean gamelogs already built in this process, LRU within a memory
+        # budget, see CleanGamelogCache. They expire with the disk cache
+        if memory_cache is None:
+            memory_cache = CleanGamelogCache() if cache is None else CleanGamelogCache(ttl=cache.ttl)
+        self.memory_cache = memory_cache
+        # requests that went to the source, i.e. not served by the cache
+        self.request_count = 0
+        self.__request_count_lock = threading.Lock()
+        # last game seen per (kind, id), so refreshes only ask for newer games
+        self.last_seen = {}
+        # the player list and name index are only built when first needed,
+        # see __load_players
+        self.name_index_path = name_index_path
+        self.__players_lock = threading.Lock()
+        self.__players = None
+
+    @classmethod
+    def get_shared(cls):
+        """Get the process wide DataFetcher, creating it if needed. It uses
+            the shared TeamGamelogRegistry
+
+        Returns:
+            DataFetcher: Shared DataFetcher
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(team_registry=TeamGamelogRegistry.get_shared())
+
+        return cls._shared
+
+    def __load_players(self):
+        """Hidden method to build the player list and lookups the first
+            time they are needed
+
+        Returns:
+            dict: Dict with the player list, name to id dict, name list and
+                name index
+        """
+        with self.__players_lock:
+            if self.__players is None:
+                nba_players = players.get_players()
+                self.__players = {"nba_players":nba_players,
+                    "players_id_dict":{
+                        nba_players[i]["full_name"]: nba_players[i]["id"]
+                        for i in range(len(nba_players))
+                    },
+                    "nba_players_list":[nba_players[i]["full_name"]
+                        for i in range(len(nba_players))],
+                    # exact, normalized and fuzzy name lookups, saved to
+                    # name_index_path if given so it is only built once
+                    "name_index":PlayerNameIndex.load_or_build(nba_players,
+                        self.name_index_path)}
+
+        return self.__players
+
+    @property
+    def nba_players(self):
+        return self.__load_players()["nba_players"]
+
+    @property
+    def players_id_dict(self):
+        return self.__load_players()["players_id_dict"]
+
+    @property
+    def nba_players_list(self):
+        return self.__load_players()["nba_players_list"]
+
+    @property
+    def name_index(self):
+        return self.__load_players()["name_index"]
 
     def __fetch_player_id(self, player_name):
         """Hidden method to fetch a given player's NBA API Id
@@ -35,9 +125,127 @@ class DataFetcher:
         try:
             player_id = self.players_id_dict[player_name]
         except KeyError:
-            raise Exception("Player not found in database")
+            # only exact and normalized matches, typos are fixed with the
+            #   renames shown by resolve_player_names
+            player_id = self.name_index.get_player_id(player_name)
+            if player_id is None:
+                raise Exception("Player not found in database: "+str(player_name))
         return player_id
 
+    def resolve_player_names(self, player_names):
+        """Match a list of player names to the NBA API full names, allowing
+            for accents, suffixes, nicknames and typos
+
+        Args:
+            player_names (list): Player names
+
+        Returns:
+            dict: Dict with the full name of every resolved name and ranked
+                suggestions for every missing one
+        """
+        return self.name_index.resolve_roster(player_names)
+
+    def __request_gamelog(self, kind, entity_id, date_from=None):
+        """Hidden method to request a raw gamelog from the data source
+
+        Args:
+            kind (str): "player" or "team"
+            entity_id (int): Player or team id
+            date_from (pd.Timestamp, optional): Only games from this date
+                on. Defaults to None, all games.
+
+        Returns:
+            pd.DataFrame: Raw gamelog as returned by the endpoint
+        """
+        if date_from is None:
+            return self.source.get_gamelog(kind, entity_id, self.season)
+
+        return self.source.get_gamelog(kind, entity_id, self.season, date_from)
+
+    def __track_last_seen(self, kind, entity_id, gamelog_df):
+        """Hidden method to remember the most recent game of a raw gamelog
+
+        Args:
+            kind (str): "player" or "team"
+            entity_id (int): Player or team id
+            gamelog_df (pd.DataFrame): Raw gamelog
+        """
+        if len(gamelog_df) == 0:
+            return
+        game_dates = pd.to_datetime(gamelog_df["GAME_DATE"])
+        last_game = game_dates.values.argmax()
+        last_seen = {"GAME_DATE": game_dates.iloc[last_game],
+            "Game_ID": gamelog_df["Game_ID"].iloc[last_game]}
+        previous = self.last_seen.get((kind, entity_id))
+        if previous is None or previous["GAME_DATE"] <= last_seen["GAME_DATE"]:
+            self.last_seen[(kind, entity_id)] = last_seen
+
+    def __fetch_gamelog(self, kind, entity_id):
+        """Hidden method to fetch a raw gamelog from the NBA API, going
+            through the cache if there is one
+
+        Args:
+            kind (str): "player" or "team"
+            entity_id (int): Player or team id
+
+        Returns:
+            pd.DataFrame: Raw gamelog as returned by the endpoint
+        """
+        if self.cache is not None:
+            gamelog_df = self.cache.get(kind, entity_id, self.season)
+            if gamelog_df is not None:
+                return gamelog_df
+
+        with self.__request_count_lock:
+            self.request_count = self.request_count + 1
+        if self.throttler is not None:
+            gamelog_df = self.throttler.call(self.__request_gamelog, kind, entity_id)
+        else:
+            gamelog_df = self.__request_gamelog(kind, entity_id)
+
+        if self.cache is not None:
+            self.cache.put(kind, entity_id, self.season, gamelog_df)
+        self.__track_last_seen(kind, entity_id, gamelog_df)
+
+        return gamelog_df
+
+    def __fetch_new_games(self, kind, entity_id, known_game_ids, date_from):
+        """Hidden method to fetch only the games of a gamelog played since
+            date_from and not in known_game_ids, keeping the cached raw
+            gamelog up to date
+
+        Args:
+            kind (str): "player" or "team"
+            entity_id (int): Player or team id
+            known_game_ids (iterable): Game_IDs already processed
+            date_from (pd.Timestamp): Date of the most recent known game
+
+        Returns:
+            pd.DataFrame: Raw gamelog with the new games only
+        """
+        last_seen = self.last_seen.get((kind, entity_id))
+        if last_seen is not None:
+            date_from = max(date_from, last_seen["GAME_DATE"])
+
+        with self.__request_count_lock:
+            self.request_count = self.request_count + 1
+        if self.throttler is not None:
+            gamelog_df = self.throttler.call(self.__request_gamelog, kind, entity_id, date_from)
+        else:
+            gamelog_df = self.__request_gamelog(kind, entity_id, date_from)
+        # the date is included, so the last known game comes again
+        gamelog_df = gamelog_df[~gamelog_df["Game_ID"].isin(set(known_game_ids))]
+        gamelog_df = gamelog_df.reset_index(drop=True)
+
+        if self.cache is not None and len(gamelog_df) > 0:
+            cached_gamelog = self.cache.get(kind, entity_id, self.season)
+            if cached_gamelog is not None:
+                self.cache.put(kind, entity_id, self.season,
+                    pd.concat([gamelog_df, cached_gamelog], ignore_index=True))
+        self.__track_last_seen(kind, entity_id, gamelog_df)
+
+        return gamelog_df
+
     def __get_player_raw_gamelogs(self, player_name):
         """Hidden method that returns a player's gamelog given a player's name
         
@@ -49,25 +257,37 @@ class DataFetcher:
         """
         player_id = self.__fetch_player_id(player_name)
         logger.info("Gathering gamelogs for player "+str(player_name)+"...")
-        gamelog = playergamelog.PlayerGameLog(player_id=player_id)
+        gamelog_df = self.__fetch_gamelog("player", player_id)
 
-        gamelog_df = gamelog.get_data_frames()[0]
+        return self.clean_raw_player_gamelogs(gamelog_df)
 
-        gamelog_df.loc[:, "GAME_DATE"] = pd.to_datetime(gamelog_df["GAME_DATE"])
+    def clean_raw_player_gamelogs(self, gamelog_df):
+        """Parse dates, add team ids and round minutes of raw player
+            gamelogs. Works column wise, so the gamelogs of many players
+            concatenated in one frame are cleaned in a single call
 
-        gamelog_df.loc[:, "Team"] = gamelog_df["MATCHUP"].astype(str).str[0:3]
+        Args:
+            gamelog_df (pd.DataFrame): Raw gamelog of one or more players
 
-        gamelog_df.loc[:, "Team_ID"] = gamelog_df["Team"].apply(
-            lambda x: teams.find_team_by_abbreviation(x)["id"]
-        )
-        # round minutes up (sports ws seems to do that)
-        #TODO minute comes already rounded up. Try to solve this, although
-        # it is probably very complicated
-        gamelog_df.loc[:,"MIN"] = gamelog_df["MIN"].apply(
-            lambda x:math.ceil(x)
+        Returns:
+            pd.DataFrame: Cleaned raw player gamelogs
+        """
+        team_abbreviations = gamelog_df["MATCHUP"].astype(str).str[0:3]
+        team_ids = team_abbreviations.map(TEAM_IDS_BY_ABBREVIATION)
+        if team_ids.isnull().any():
+            raise ValueError("Unknown team abbreviations: "
+                +str(sorted(team_abbreviations[team_ids.isnull()].unique())))
+
+        gamelog_df = gamelog_df.assign(
+            GAME_DATE=pd.to_datetime(gamelog_df["GAME_DATE"]),
+            Team_ID=team_ids.astype(np.int64),
+            # round minutes up (sports ws seems to do that)
+            #TODO minute comes already rounded up. Try to solve this, although
+            # it is probably very complicated
+            MIN=np.ceil(gamelog_df["MIN"].to_numpy(dtype=float)).astype(np.int64),
         )
 
-        gamelog_df = gamelog_df.drop(["Team", "PLUS_MINUS", "VIDEO_AVAILABLE"], axis=1)
+        gamelog_df = gamelog_df.drop(["PLUS_MINUS", "VIDEO_AVAILABLE"], axis=1)
 
         return gamelog_df
 
@@ -80,10 +300,22 @@ class DataFetcher:
         Returns:
             pd.DataFrame: Team's gamelog and game number
         """
-        team_gamelog = teamgamelog.TeamGameLog(team_id=team_id)
         logger.debug("Getting teams gamelogs")
-        team_gamelog = team_gamelog.get_data_frames()[0]
+        team_gamelog = self.__fetch_gamelog("team", team_id)
+
+        return self.__number_team_games(team_gamelog)
+
+    def __number_team_games(self, team_gamelog, first_game_number=1):
+        """Hidden method to sort a raw team gamelog and number its games
+
+        Args:
+            team_gamelog (pd.DataFrame): Raw team gamelog
+            first_game_number (int, optional): Number of the first game.
+                Defaults to 1.
 
+        Returns:
+            pd.DataFrame: Team's gamelog and game number
+        """
         team_gamelog["GAME_DATE"] = pd.to_datetime(team_gamelog["GAME_DATE"])
 
         team_gamelog = team_gamelog.sort_values("GAME_DATE")
@@ -92,7 +324,7 @@ class DataFetcher:
 
         team_gamelog = team_gamelog.drop(["index"], axis=1)
 
-        team_gamelog.loc[:, "GAME_NUMBER"] = team_gamelog.index + 1
+        team_gamelog.loc[:, "GAME_NUMBER"] = team_gamelog.index + first_game_number
 
         cols_to_keep = [
             "Team_ID",
@@ -116,29 +348,126 @@ class DataFetcher:
         Returns:
             pd.DataFrame: Player's gamelog with game number
         """
-        teams_played_for = player_gamelog["Team_ID"].unique()
-        teams_gamelogs = pd.concat(
-            [self.__get_team_gamelog(team) for team in teams_played_for]
-        )
-        player_gamelog = player_gamelog.merge(
-            right=teams_gamelogs,
-            how="outer",
-            on=["Team_ID", "Game_ID", "GAME_DATE", "MATCHUP", "WL"],
-        )
+        teams_gamelogs = self.__get_teams_gamelogs(player_gamelog)
 
-        player_gamelog = player_gamelog.sort_values(["GAME_NUMBER", "GAME_DATE"])
+        return self.__merge_player_and_team_gamelogs(player_gamelog, teams_gamelogs)
 
-        player_gamelog = player_gamelog.loc[
-            player_gamelog.notnull()
-            .sum(1)
-            .groupby(player_gamelog.GAME_NUMBER[::-1])
-            .idxmax()
-        ]
+    def __get_teams_gamelogs(self, player_gamelogs):
+        """Hidden method to get the gamelogs of the teams in raw player
+            gamelogs. A registered team gamelog that lacks some of the
+            players' games was fetched before them, for example by a long
+            lived registry, and is refreshed so no game is left without a
+            game number
+
+        Args:
+            player_gamelogs (pd.DataFrame): Cleaned raw gamelog of one or
+                more players
+
+        Returns:
+            pd.DataFrame: Gamelogs of the players' teams with game number
+        """
+        teams_gamelogs = []
+        for team in player_gamelogs["Team_ID"].unique():
+            team_gamelog = self.team_registry.get_team_gamelog(team, self.season,
+                self.__get_team_gamelog)
+            team_game_ids = player_gamelogs.loc[player_gamelogs["Team_ID"] == team, "Game_ID"]
+            if not team_game_ids.isin(team_gamelog["Game_ID"]).all():
+                logger.info("Refreshing gamelog of team "+str(team)+" for newer player games")
+                team_gamelog = self.refresh_team_gamelog(team)
+            teams_gamelogs.append(team_gamelog)
+
+        return pd.concat(teams_gamelogs)
+
+    def __index_team_gamelogs(self, teams_gamelogs):
+        """Hidden method to index team gamelogs by (Team_ID, Game_ID), so
+            game numbers of many players can be looked up with one index
+
+        Args:
+            teams_gamelogs (pd.DataFrame): Team gamelogs with game number
+
+        Returns:
+            tuple: Team gamelogs with a positional index and the
+                (Team_ID, Game_ID) index of their rows
+        """
+        teams_gamelogs = teams_gamelogs.reset_index(drop=True)
+        game_index = pd.MultiIndex.from_frame(teams_gamelogs[["Team_ID", "Game_ID"]])
+
+        return teams_gamelogs, game_index
+
+    def __merge_player_and_team_gamelogs(self, player_gamelog, teams_gamelogs, player_id=None,
+        game_index=None):
+        """Hidden method to join a player gamelog with the gamelogs of their
+            teams, keeping one row per game number. Games are looked up by
+            (Team_ID, Game_ID) and games the player missed are added with a
+            reindex. Rows, row labels and dtypes are those of an outer merge
+            on the game columns keeping, per game number, the row with most
+            values
+
+        Args:
+            player_gamelog (pd.DataFrame): player's gamelog
+            teams_gamelogs (pd.DataFrame): gamelogs of the player's teams
+            player_id (int, optional): Player ID, needed if player_gamelog
+                may be empty. Defaults to None, taken from player_gamelog.
+            game_index (pd.MultiIndex, optional): Index of teams_gamelogs
+                from __index_team_gamelogs, to share it and teams_gamelogs
+                between players, only the player's teams are then used.
+                Defaults to None, built here for all of teams_gamelogs.
+
+        Returns:
+            pd.DataFrame: Player's gamelog with game number
+        """
+        if game_index is None:
+            teams_gamelogs, game_index = self.__index_team_gamelogs(teams_gamelogs)
+            team_rows = np.arange(len(teams_gamelogs))
+        else:
+            # rows of the player's teams, in the order the teams were played for
+            team_ids = teams_gamelogs["Team_ID"].to_numpy()
+            team_rows = np.concatenate([np.flatnonzero(team_ids == team)
+                for team in player_gamelog["Team_ID"].unique()])
+        player_gamelog = player_gamelog.reset_index(drop=True)
+
+        game_rows = game_index.get_indexer(
+            pd.MultiIndex.from_frame(player_gamelog[["Team_ID", "Game_ID"]]))
+        played = game_rows >= 0
+        missed_rows = team_rows[~np.isin(team_rows, game_rows[played])]
+        missed_games = teams_gamelogs.iloc[missed_rows]
+
+        team_game_numbers = teams_gamelogs["GAME_NUMBER"].to_numpy()
+        if played.all():
+            game_numbers = team_game_numbers[game_rows]
+        else:
+            game_numbers = np.where(played, team_game_numbers[game_rows], np.nan)
+
+        # the player's games first, then the ones they missed
+        game_columns = {column: np.concatenate([player_gamelog[column].to_numpy(),
+                missed_games[column].to_numpy()])
+            for column in ["Team_ID", "Game_ID", "GAME_DATE", "MATCHUP", "WL"]}
+        player_gamelog = player_gamelog.reindex(np.arange(len(player_gamelog) + len(missed_rows)))
+        player_gamelog = player_gamelog.assign(
+            GAME_NUMBER=np.concatenate([game_numbers, team_game_numbers[missed_rows]]),
+            **game_columns
+        )
+
+        # per game number, the row with most values, then the earliest
+        number_of_values = player_gamelog.notnull().sum(1).to_numpy()
+        sorted_rows = np.lexsort((
+            np.arange(len(player_gamelog)),
+            player_gamelog["GAME_DATE"].to_numpy().view(np.int64),
+            -number_of_values,
+            player_gamelog["GAME_NUMBER"].to_numpy(),
+        ))
+        sorted_game_numbers = player_gamelog["GAME_NUMBER"].to_numpy()[sorted_rows]
+        first_of_game = np.append(True, sorted_game_numbers[1:] != sorted_game_numbers[:-1])
+        first_of_game = first_of_game & ~pd.isnull(sorted_game_numbers)
+        player_gamelog = player_gamelog.iloc[sorted_rows[first_of_game]]
 
         # fix missing values
-        player_id = [
-            id for id in player_gamelog["Player_ID"].unique() if not np.isnan(id)
-        ][0]
+        if player_id is None:
+            player_id = [
+                id for id in player_gamelog["Player_ID"].unique() if not np.isnan(id)
+            ][0]
+        else:
+            player_id = player_gamelog["Player_ID"].dtype.type(player_id)
         player_gamelog.loc[:, "Player_ID"] = player_id
 
         # season_id = [id for id in player_gamelog["SEASON_ID"].unique() if not np.isnan(id)][0]
@@ -185,11 +514,26 @@ class DataFetcher:
 
     def get_player_clean_gamelog(self, player_name):
         """Fetch complete player gamelog, assign game numbers and calculate
-            fantasy points
+            fantasy points. Gamelogs are kept in the memory cache, so the
+            same player is only built once
         
         Args:
             player_name (str): Player name
         
+        Returns:
+            pd.DataFrame: Clean processed player gamelog
+        """
+        player_gamelog, _ = self.memory_cache.get_player_gamelog(player_name, self.season,
+            self.__build_player_clean_gamelog)
+
+        return player_gamelog
+
+    def __build_player_clean_gamelog(self, player_name):
+        """Hidden method to build a clean gamelog without the memory cache
+
+        Args:
+            player_name (str): Player name
+
         Returns:
             pd.DataFrame: Clean processed player gamelog
         """
@@ -201,6 +545,131 @@ class DataFetcher:
 
         return player_gamelog
 
+    def get_player_clean_gamelogs(self, player_names):
+        """Clean gamelogs of several players at once: raw gamelogs are
+            cleaned in one call and game numbers are looked up in a single
+            (Team_ID, Game_ID) index of all their teams
+
+        Args:
+            player_names (list): Player names
+
+        Returns:
+            dict: Clean processed gamelogs by player name, as
+                get_player_clean_gamelog returns them
+        """
+        player_names = list(dict.fromkeys(player_names))
+        player_ids = [self.__fetch_player_id(player_name) for player_name in player_names]
+        raw_gamelogs = [self.__fetch_gamelog("player", player_id) for player_id in player_ids]
+        row_ends = np.cumsum([len(raw_gamelog) for raw_gamelog in raw_gamelogs])
+        raw_gamelogs = self.clean_raw_player_gamelogs(pd.concat(raw_gamelogs, ignore_index=True))
+
+        teams_gamelogs = self.__get_teams_gamelogs(raw_gamelogs)
+        teams_gamelogs, game_index = self.__index_team_gamelogs(teams_gamelogs)
+
+        player_gamelogs = {}
+        for player_name, player_id, row_start, row_end in zip(player_names, player_ids,
+            np.append(0, row_ends[:-1]), row_ends):
+            player_gamelog = self.__merge_player_and_team_gamelogs(
+                raw_gamelogs.iloc[row_start:row_end], teams_gamelogs, player_id, game_index)
+            player_gamelogs[player_name] = self.__calculate_fantasy_points(player_gamelog)
+            self.memory_cache.put(player_name, self.season, player_gamelogs[player_name])
+
+        return player_gamelogs
+
+    def refresh_team_gamelog(self, team_id):
+        """Add the games a registered team played since its gamelog was
+            fetched, numbering only the new games
+
+        Args:
+            team_id (int): Team ID
+
+        Returns:
+            pd.DataFrame: Team's updated gamelog and game number
+        """
+        def add_new_games(team_id, team_gamelog):
+            new_games = self.__fetch_new_games("team", team_id, team_gamelog["Game_ID"],
+                team_gamelog["GAME_DATE"].max())
+            if len(new_games) == 0:
+                return team_gamelog
+            new_games = self.__number_team_games(new_games,
+                int(team_gamelog["GAME_NUMBER"].max()) + 1)
+            new_games = new_games[team_gamelog.columns]
+
+            return pd.concat([team_gamelog, new_games], ignore_index=True)
+
+        team_gamelog = self.team_registry.refresh_team_gamelog(team_id, self.season,
+            add_new_games)
+        if team_gamelog is None:
+            team_gamelog = self.team_registry.get_team_gamelog(team_id, self.season,
+                self.__get_team_gamelog)
+
+        return team_gamelog
+
+    def refresh_player_clean_gamelog(self, player_name, player_gamelog, refresh_teams=True):
+        """Add the games played since a clean gamelog was built. Only the
+            new games are fetched, and game numbers and fantasy points are
+            only calculated for them
+
+        Args:
+            player_name (str): Player name
+            player_gamelog (pd.DataFrame): Output of get_player_clean_gamelog
+                or of an earlier refresh
+            refresh_teams (bool, optional): Refresh the player's team
+                gamelogs first, set to False if refresh_team_gamelog was
+                already called for them. Defaults to True.
+
+        Returns:
+            pd.DataFrame: Updated clean player gamelog
+        """
+        player_id = self.__fetch_player_id(player_name)
+        last_date = player_gamelog["GAME_DATE"].max()
+        new_games = self.__fetch_new_games("player", player_id, player_gamelog["Game_ID"],
+            last_date)
+        new_games = self.clean_raw_player_gamelogs(new_games)
+
+        # the team the player last played for, plus any new one
+        last_team = player_gamelog.loc[player_gamelog["GAME_NUMBER"].idxmax(), "Team_ID"]
+        teams_played_for = pd.unique(np.append(new_games["Team_ID"].to_numpy(), last_team))
+        if refresh_teams:
+            teams_gamelogs = [self.refresh_team_gamelog(team) for team in teams_played_for]
+        else:
+            teams_gamelogs = [self.team_registry.get_team_gamelog(team, self.season,
+                self.__get_team_gamelog) for team in teams_played_for]
+        teams_gamelogs = pd.concat(teams_gamelogs)
+        new_team_games = teams_gamelogs[teams_gamelogs["GAME_DATE"] > last_date]
+        if len(new_team_games) == 0:
+            return player_gamelog
+
+        logger.info("Adding "+str(len(new_team_games))+" new games for player "
+            +str(player_name))
+        new_games = self.__merge_player_and_team_gamelogs(new_games, new_team_games,
+            player_id)
+        new_games = self.__calculate_fantasy_points(new_games)
+        # continue the row labels, as if the whole gamelog had been rebuilt
+        new_games.index = np.arange(len(new_games)) + player_gamelog.index.max() + 1
+        player_gamelog = pd.concat([player_gamelog, new_games[player_gamelog.columns]])
+        self.memory_cache.put(player_name, self.season, player_gamelog)
+
+        return player_gamelog
+
+    def refresh_player_clean_gamelogs(self, player_gamelogs):
+        """Refresh several clean gamelogs, refreshing each team only once
+
+        Args:
+            player_gamelogs (dict): Clean gamelogs by player name
+
+        Returns:
+            dict: Updated clean gamelogs by player name
+        """
+        teams = pd.unique(np.concatenate([player_gamelogs[player]["Team_ID"].unique()
+            for player in player_gamelogs.keys()]))
+        for team in teams:
+            self.refresh_team_gamelog(team)
+
+        return {player: self.refresh_player_clean_gamelog(player, player_gamelogs[player],
+                refresh_teams=False)
+            for player in player_gamelogs.keys()}
+
     def get_player_performance(self, player_name, game_number):
         """Get a player's performance in a certain game
 
@@ -211,11 +680,36 @@ class DataFetcher:
         Returns:
             dict: Dict with player performance and total player gamelog
         """
-        player_gamelog = self.get_player_clean_gamelog(player_name)
+        player_gamelog, game_index = self.memory_cache.get_player_gamelog(player_name,
+            self.season, self.__build_player_clean_gamelog)
+
+        return self.get_performance_from_gamelog(player_name, player_gamelog, game_number,
+            game_index)
 
-        if game_number in player_gamelog["GAME_NUMBER"]:
-            performance = player_gamelog.loc[
-                player_gamelog["GAME_NUMBER"] == game_number, :
+    def get_performance_from_gamelog(self, player_name, player_gamelog, game_number,
+        game_index=None):
+        """Get a player's performance in a certain game from an already
+            fetched clean gamelog, so several game numbers can be looked up
+            with a single request
+
+        Args:
+            player_name (str): Player name
+            player_gamelog (pd.DataFrame): Output of get_player_clean_gamelog
+            game_number (int): Game number
+            game_index (dict, optional): Output of index_game_numbers for
+                player_gamelog. Defaults to None, built here.
+
+        Returns:
+            dict: Dict with player performance and total player gamelog
+        """
+        if game_index is None:
+            game_index = index_game_numbers(player_gamelog)
+
+        # the check is on row labels, as "in" does on a Series
+        if game_number in game_index["labels"]:
+            performance = player_gamelog.iloc[
+                [game_index["positions"][game_number]]
+                if game_number in game_index["positions"] else []
             ]
             performance.loc[:, "PLAYER_NAME"] = player_name
             performance.loc[:,"GAME_PLAYED"] = 1
@@ -246,8 +740,8 @@ class DataFetcher:
             ]
 
         else:
-            performance = player_gamelog.loc[
-                player_gamelog["GAME_NUMBER"] == 1, :
+            performance = player_gamelog.iloc[
+                [game_index["positions"][1]] if 1 in game_index["positions"] else []
             ]
 
             performance.loc[:, "PLAYER_NAME"] = player_name
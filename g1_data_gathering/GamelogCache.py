@@ -0,0 +1,135 @@
+import sqlite3
+import pickle
+import time
+import threading
+from contextlib import closing
+import logging
+
+logger = logging.getLogger("GamelogCache")
+
+class GamelogCache():
+    def __init__(self,path="gamelog_cache.sqlite",ttl=6*60*60):
+        """On disk cache for raw NBA API gamelogs, keyed by kind
+            (player or team), entity id and season
+
+        Args:
+            path (str, optional): Path to the SQLite file.
+                Defaults to "gamelog_cache.sqlite".
+            ttl (int, optional): Seconds an entry stays valid, None for
+                no expiry. Defaults to 6 hours.
+        """
+        self.path = str(path)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.Lock()
+
+        with closing(self.__connect()) as conn:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS gamelogs ("
+                    "kind TEXT, entity_id TEXT, season TEXT, "
+                    "fetched_at REAL, gamelog BLOB, "
+                    "PRIMARY KEY (kind, entity_id, season))"
+                )
+
+    def __connect(self):
+        return sqlite3.connect(self.path,timeout=30)
+
+    def __count(self,hit):
+        with self.__lock:
+            if hit:
+                self.hits = self.hits+1
+            else:
+                self.misses = self.misses+1
+
+    def get(self,kind,entity_id,season):
+        """Get a cached gamelog
+
+        Args:
+            kind (str): "player" or "team"
+            entity_id (int): Player or team id
+            season (str): Season (ex: 2019-20)
+
+        Returns:
+            pd.DataFrame: Cached gamelog, None if missing or expired
+        """
+        with closing(self.__connect()) as conn:
+            row = conn.execute(
+                "SELECT fetched_at, gamelog FROM gamelogs "
+                "WHERE kind=? AND entity_id=? AND season=?",
+                (kind,str(entity_id),season)
+            ).fetchone()
+
+        if row is None:
+            logger.debug("Cache miss for "+kind+" "+str(entity_id))
+            self.__count(False)
+            return None
+
+        fetched_at, gamelog = row
+        if self.ttl is not None and time.time()-fetched_at>self.ttl:
+            logger.debug("Cache entry expired for "+kind+" "+str(entity_id))
+            self.__count(False)
+            return None
+
+        self.__count(True)
+
+        return pickle.loads(gamelog)
+
+    def put(self,kind,entity_id,season,gamelog_df):
+        """Store a gamelog in the cache
+
+        Args:
+            kind (str): "player" or "team"
+            entity_id (int): Player or team id
+            season (str): Season (ex: 2019-20)
+            gamelog_df (pd.DataFrame): Gamelog to store
+        """
+        with closing(self.__connect()) as conn:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO gamelogs VALUES (?,?,?,?,?)",
+                    (kind,str(entity_id),season,time.time(),
+                        pickle.dumps(gamelog_df))
+                )
+
+    def invalidate(self,kind=None,entity_id=None,season=None):
+        """Remove entries from the cache. Omitted arguments match everything
+
+        Args:
+            kind (str, optional): "player" or "team". Defaults to None.
+            entity_id (int, optional): Player or team id. Defaults to None.
+            season (str, optional): Season. Defaults to None.
+
+        Returns:
+            int: Number of removed entries
+        """
+        conditions = []
+        values = []
+        for column, value in [("kind",kind),("entity_id",entity_id),("season",season)]:
+            if value is not None:
+                conditions.append(column+"=?")
+                values.append(str(value))
+
+        query = "DELETE FROM gamelogs"
+        if len(conditions)>0:
+            query = query+" WHERE "+" AND ".join(conditions)
+
+        with closing(self.__connect()) as conn:
+            with conn:
+                removed = conn.execute(query,values).rowcount
+
+        logger.info("Removed "+str(removed)+" entries from gamelog cache")
+
+        return removed
+
+    def get_stats(self):
+        """Get cache hit/miss counters
+
+        Returns:
+            dict: Dict with hits and misses
+        """
+        stats = {"hits":self.hits,
+            "misses":self.misses}
+
+        return stats
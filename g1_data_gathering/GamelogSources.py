@@ -0,0 +1,181 @@
+import time
+import threading
+from pathlib import Path
+import pandas as pd
+import logging
+
+logger = logging.getLogger("GamelogSources")
+
+## Where DataFetcher gets its raw gamelogs from. Every source has a
+## get_gamelog(kind, entity_id, season) method returning the endpoint's
+## data frame, so recorded gamelogs can replace the NBA API when offline
+
+class NBAApiSource():
+    def get_gamelog(self,kind,entity_id,season,date_from=None):
+        """Request a raw gamelog from the NBA API
+
+        Args:
+            kind (str): "player" or "team"
+            entity_id (int): Player or team id
+            season (str): Season (ex: 2019-20)
+            date_from (pd.Timestamp, optional): Only games from this date
+                on. Defaults to None, all games.
+
+        Returns:
+            pd.DataFrame: Raw gamelog as returned by the endpoint
+        """
+        # the endpoint modules are slow to import, only do it when requesting
+        from nba_api.stats.endpoints import playergamelog
+        from nba_api.stats.endpoints import teamgamelog
+
+        date_from_nullable = ""
+        if date_from is not None:
+            date_from_nullable = pd.Timestamp(date_from).strftime("%m/%d/%Y")
+
+        if kind == "player":
+            gamelog = playergamelog.PlayerGameLog(player_id=entity_id, season=season,
+                date_from_nullable=date_from_nullable)
+        else:
+            gamelog = teamgamelog.TeamGameLog(team_id=entity_id, season=season,
+                date_from_nullable=date_from_nullable)
+        gamelog_df = gamelog.get_data_frames()[0]
+
+        return gamelog_df
+
+    def get_league_gamelog(self,kind,season):
+        """Request a whole season of player or team gamelogs in one call
+
+        Args:
+            kind (str): "player" or "team"
+            season (str): Season (ex: 2019-20)
+
+        Returns:
+            pd.DataFrame: League game log
+        """
+        from nba_api.stats.endpoints import leaguegamelog
+
+        league_gamelog = leaguegamelog.LeagueGameLog(season=season,
+            player_or_team_abbreviation="P" if kind=="player" else "T")
+
+        return league_gamelog.get_data_frames()[0]
+
+
+def get_fixture_path(fixture_dir,kind,entity_id,season):
+    """Path of the fixture of a gamelog
+
+    Args:
+        fixture_dir (str): Folder with the fixtures
+        kind (str): "player" or "team"
+        entity_id (int): Player or team id
+        season (str): Season (ex: 2019-20)
+
+    Returns:
+        Path: Path of the JSON fixture
+    """
+    return Path(fixture_dir)/(str(season)+"_"+str(kind)+"_"+str(entity_id)+".json")
+
+
+def filter_from_date(gamelog_df,date_from):
+    """Keep the games from a date on, for sources that can only serve
+        whole gamelogs
+
+    Args:
+        gamelog_df (pd.DataFrame): Raw gamelog
+        date_from (pd.Timestamp): First date to keep, None to keep all
+
+    Returns:
+        pd.DataFrame: Filtered gamelog
+    """
+    if date_from is None:
+        return gamelog_df
+
+    return gamelog_df[pd.to_datetime(gamelog_df["GAME_DATE"])>=pd.Timestamp(date_from)
+        ].reset_index(drop=True)
+
+
+class RecordingSource():
+    def __init__(self,fixture_dir,source=None):
+        """Pass requests on to another source and save every response as a
+            JSON fixture that ReplaySource can serve later
+
+        Args:
+            fixture_dir (str): Folder to save the fixtures in
+            source (optional): Source to record. Defaults to NBAApiSource.
+        """
+        if source is None:
+            source = NBAApiSource()
+        self.source = source
+        self.fixture_dir = Path(fixture_dir)
+        self.fixture_dir.mkdir(parents=True,exist_ok=True)
+        self.recorded_count = 0
+        self.__lock = threading.Lock()
+
+    def get_gamelog(self,kind,entity_id,season,date_from=None):
+        """Request a raw gamelog and record it
+
+        Args:
+            kind (str): "player" or "team"
+            entity_id (int): Player or team id
+            season (str): Season (ex: 2019-20)
+            date_from (pd.Timestamp, optional): Only games from this date
+                on, these requests are passed on but not recorded.
+                Defaults to None, all games.
+
+        Returns:
+            pd.DataFrame: Raw gamelog as returned by the source
+        """
+        if date_from is not None:
+            return self.source.get_gamelog(kind,entity_id,season,date_from)
+
+        gamelog_df = self.source.get_gamelog(kind,entity_id,season)
+        fixture_path = get_fixture_path(self.fixture_dir,kind,entity_id,season)
+        gamelog_df.to_json(fixture_path,orient="split",index=False)
+        with self.__lock:
+            self.recorded_count = self.recorded_count+1
+        logger.debug("Recorded "+str(fixture_path))
+
+        return gamelog_df
+
+
+class ReplaySource():
+    def __init__(self,fixture_dir,latency=0):
+        """Serve gamelogs recorded by RecordingSource, without network
+
+        Args:
+            fixture_dir (str): Folder with the fixtures
+            latency (float, optional): Seconds every request takes, to
+                benchmark as if requests went to the API. Defaults to 0.
+        """
+        self.fixture_dir = Path(fixture_dir)
+        self.latency = latency
+        self.request_count = 0
+        self.__lock = threading.Lock()
+
+    def get_gamelog(self,kind,entity_id,season,date_from=None):
+        """Read a recorded raw gamelog
+
+        Args:
+            kind (str): "player" or "team"
+            entity_id (int): Player or team id
+            season (str): Season (ex: 2019-20)
+            date_from (pd.Timestamp, optional): Only games from this date
+                on. Defaults to None, all games.
+
+        Returns:
+            pd.DataFrame: Raw gamelog as it was recorded
+        """
+        fixture_path = get_fixture_path(self.fixture_dir,kind,entity_id,season)
+        if not fixture_path.exists():
+            raise FileNotFoundError("No recorded "+str(kind)+" gamelog for "
+                +str(entity_id)+" in season "+str(season)+" ("+str(fixture_path)+")")
+
+        with self.__lock:
+            self.request_count = self.request_count+1
+        if self.latency>0:
+            time.sleep(self.latency)
+
+        # keep ids like Game_ID as text and dates as returned by the API
+        gamelog_df = pd.read_json(fixture_path,orient="split",dtype=False,
+            convert_dates=False)
+
+        return filter_from_date(gamelog_df,date_from)
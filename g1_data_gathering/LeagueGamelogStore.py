@@ -0,0 +1,143 @@
+import threading
+from pathlib import Path
+import pandas as pd
+import numpy as np
+import logging
+
+from g1_data_gathering.GamelogSources import NBAApiSource, filter_from_date
+
+logger = logging.getLogger("LeagueGamelogStore")
+
+# LeagueGameLog column -> PlayerGameLog/TeamGameLog column
+PLAYER_COLUMNS = {"PLAYER_ID":"Player_ID","GAME_ID":"Game_ID"}
+TEAM_COLUMNS = {"TEAM_ID":"Team_ID","GAME_ID":"Game_ID"}
+# columns only the league endpoint returns
+LEAGUE_ONLY_COLUMNS = ["PLAYER_NAME","TEAM_ID","TEAM_ABBREVIATION","TEAM_NAME",
+    "FANTASY_PTS"]
+
+class LeagueGamelogStore():
+    def __init__(self,player_league_gamelog,team_league_gamelog,season):
+        """In memory store of a whole season of player and team gamelogs,
+            loaded in one pass from the league game log (two requests
+            instead of one per player and team). Has the GamelogSources
+            interface, so DataFetcher(source=store) serves every player
+            from memory
+
+        Args:
+            player_league_gamelog (pd.DataFrame): LeagueGameLog with
+                player_or_team_abbreviation="P"
+            team_league_gamelog (pd.DataFrame): LeagueGameLog with
+                player_or_team_abbreviation="T"
+            season (str): Season (ex: 2019-20)
+        """
+        self.season = season
+        self.request_count = 0
+        self.__lock = threading.Lock()
+        self.gamelogs = {}
+        # row positions of each id, so every lookup is a slice
+        self.row_positions = {}
+        self.ingest(player_league_gamelog,team_league_gamelog)
+
+    @classmethod
+    def from_api(cls,season,source=None):
+        """Load a season from the NBA API league game log endpoint
+
+        Args:
+            season (str): Season (ex: 2019-20)
+            source (optional): Object with a get_league_gamelog(kind, season)
+                method. Defaults to NBAApiSource.
+
+        Returns:
+            LeagueGamelogStore: Store with the whole season
+        """
+        if source is None:
+            source = NBAApiSource()
+        logger.info("Loading league gamelogs for season "+str(season)+"...")
+
+        return cls(source.get_league_gamelog("player",season),
+            source.get_league_gamelog("team",season),season)
+
+    @classmethod
+    def from_files(cls,player_path,team_path,season):
+        """Load a season saved with save
+
+        Args:
+            player_path (str): CSV with the player league game log
+            team_path (str): CSV with the team league game log
+            season (str): Season (ex: 2019-20)
+
+        Returns:
+            LeagueGamelogStore: Store with the whole season
+        """
+        # ids like GAME_ID have leading zeros
+        text_columns = {"GAME_ID":str,"SEASON_ID":str}
+
+        return cls(pd.read_csv(Path(player_path),dtype=text_columns),
+            pd.read_csv(Path(team_path),dtype=text_columns),season)
+
+    def save(self,player_path,team_path):
+        """Save the store as two CSV files in the league game log format
+
+        Args:
+            player_path (str): CSV for the player league game log
+            team_path (str): CSV for the team league game log
+        """
+        self.gamelogs["player"].to_csv(Path(player_path),index=False)
+        self.gamelogs["team"].to_csv(Path(team_path),index=False)
+
+    def ingest(self,player_league_gamelog,team_league_gamelog):
+        """Replace the stored gamelogs, sorting them by id and most recent
+            game first, as the per player and per team endpoints do
+
+        Args:
+            player_league_gamelog (pd.DataFrame): Player league game log
+            team_league_gamelog (pd.DataFrame): Team league game log
+        """
+        for kind, league_gamelog, id_column in [("player",player_league_gamelog,"PLAYER_ID"),
+            ("team",team_league_gamelog,"TEAM_ID")]:
+            league_gamelog = league_gamelog.assign(
+                GAME_DATE_SORT=pd.to_datetime(league_gamelog["GAME_DATE"]))
+            league_gamelog = league_gamelog.sort_values([id_column,"GAME_DATE_SORT","GAME_ID"],
+                ascending=[True,False,False],kind="mergesort")
+            league_gamelog = league_gamelog.drop(["GAME_DATE_SORT"],axis=1).reset_index(drop=True)
+
+            ids = league_gamelog[id_column].to_numpy()
+            starts = np.concatenate([[0],np.flatnonzero(ids[1:]!=ids[:-1])+1]).astype(int)
+            ends = np.append(starts[1:],len(ids))
+            self.gamelogs[kind] = league_gamelog
+            self.row_positions[kind] = {int(ids[start]):(int(start),int(end))
+                for start, end in zip(starts,ends)}
+
+        logger.info("Stored "+str(len(self.gamelogs["player"]))+" player games of "
+            +str(len(self.row_positions["player"]))+" players and "
+            +str(len(self.row_positions["team"]))+" teams")
+
+    def get_gamelog(self,kind,entity_id,season,date_from=None):
+        """Get a raw gamelog in the PlayerGameLog/TeamGameLog format
+
+        Args:
+            kind (str): "player" or "team"
+            entity_id (int): Player or team id
+            season (str): Season (ex: 2019-20)
+            date_from (pd.Timestamp, optional): Only games from this date
+                on. Defaults to None, all games.
+
+        Returns:
+            pd.DataFrame: Raw gamelog, empty if the id has no games
+        """
+        if season!=self.season:
+            raise ValueError("The store has season "+str(self.season)+", not "+str(season))
+        with self.__lock:
+            self.request_count = self.request_count+1
+
+        start, end = self.row_positions[kind].get(int(entity_id),(0,0))
+        gamelog_df = self.gamelogs[kind].iloc[start:end]
+        if kind=="player":
+            gamelog_df = gamelog_df.rename(columns=PLAYER_COLUMNS)
+            gamelog_df = gamelog_df.drop([col for col in LEAGUE_ONLY_COLUMNS
+                if col in gamelog_df.columns],axis=1)
+        else:
+            gamelog_df = gamelog_df.rename(columns=TEAM_COLUMNS)
+
+        return filter_from_date(gamelog_df.reset_index(drop=True),date_from)
+
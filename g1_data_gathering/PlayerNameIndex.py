@@ -0,0 +1,248 @@
+import re
+import pickle
+import hashlib
+import logging
+import unicodedata
+from pathlib import Path
+
+logger = logging.getLogger("PlayerNameIndex")
+
+# name suffixes that are often left out or written differently
+SUFFIXES = {"jr","sr","ii","iii","iv","v"}
+
+# common first name variants, mapped on both the index and the query side
+NICKNAMES = {"moe":"maurice","mo":"maurice","nic":"nicolas","nick":"nicolas",
+    "mike":"michael","matt":"matthew","chris":"christopher","alex":"alexander",
+    "tony":"anthony","danny":"daniel","dan":"daniel","will":"william",
+    "bill":"william","bob":"robert","rob":"robert","jim":"james",
+    "jimmy":"james","joe":"joseph","ron":"ronald","tim":"timothy",
+    "steve":"stephen","steph":"stephen","greg":"gregory","kenny":"kenneth",
+    "ken":"kenneth","ben":"benjamin","sam":"samuel","zach":"zachary",
+    "zack":"zachary","nate":"nathan","jon":"jonathan","josh":"joshua"}
+
+class PlayerNameIndex():
+    def __init__(self,nba_players):
+        """Name index over the NBA API static player list, with an exact
+            lookup, a normalized lookup (accents, punctuation, suffixes and
+            nicknames) and a trigram index for fuzzy suggestions
+
+        Args:
+            nba_players (list): Player dicts as returned by players.get_players()
+        """
+        self.players_id_dict = {player["full_name"]:player["id"] for player in nba_players}
+        self.fingerprint = self.get_fingerprint(nba_players)
+
+        # normalized name -> full names
+        self.normalized_names = {}
+        # trigram -> normalized names containing it
+        self.trigrams = {}
+        for full_name in self.players_id_dict.keys():
+            normalized_name = self.normalize(full_name)
+            self.normalized_names.setdefault(normalized_name,[]).append(full_name)
+        for normalized_name in self.normalized_names.keys():
+            for trigram in self.__get_trigrams(normalized_name):
+                self.trigrams.setdefault(trigram,set()).add(normalized_name)
+
+    @staticmethod
+    def get_fingerprint(nba_players):
+        """Fingerprint of a player list, to know if a saved index is stale
+
+        Args:
+            nba_players (list): Player dicts as returned by players.get_players()
+
+        Returns:
+            str: Hash of the players' ids and names
+        """
+        players_string = "\n".join(str(player["id"])+":"+player["full_name"]
+            for player in nba_players)
+
+        return hashlib.sha1(players_string.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def normalize(name):
+        """Normalize a player name: no accents, punctuation, case or
+            suffixes, and first name nicknames replaced
+
+        Args:
+            name (str): Player name
+
+        Returns:
+            str: Normalized name
+        """
+        name = unicodedata.normalize("NFKD",str(name))
+        name = "".join(character for character in name if not unicodedata.combining(character))
+        name = name.lower().replace(".","").replace("'","")
+        words = [word for word in re.split(r"[^a-z0-9]+",name) if word!=""]
+        # keep the suffix if it is the whole name
+        if len(words)>1 and words[-1] in SUFFIXES:
+            words = words[:-1]
+        if len(words)>1:
+            words[0] = NICKNAMES.get(words[0],words[0])
+
+        return " ".join(words)
+
+    def __get_suffix(self,name):
+        words = str(name).lower().replace(".","").split()
+        if len(words)>1 and words[-1] in SUFFIXES:
+            return words[-1]
+
+        return None
+
+    def __get_trigrams(self,normalized_name):
+        padded_name = "  "+normalized_name+" "
+
+        return {padded_name[i:i+3] for i in range(len(padded_name)-2)}
+
+    def suggest(self,name,limit=5,min_score=0.3):
+        """Rank the players most similar to a name
+
+        Args:
+            name (str): Player name
+            limit (int, optional): Maximum number of suggestions. Defaults to 5.
+            min_score (float, optional): Minimum similarity (Dice coefficient
+                of the trigrams). Defaults to 0.3.
+
+        Returns:
+            list: List of (full name, score) tuples, best first
+        """
+        query_trigrams = self.__get_trigrams(self.normalize(name))
+        shared_trigrams = {}
+        for trigram in query_trigrams:
+            for normalized_name in self.trigrams.get(trigram,()):
+                shared_trigrams[normalized_name] = shared_trigrams.get(normalized_name,0)+1
+
+        scored_names = []
+        for normalized_name, shared in shared_trigrams.items():
+            score = 2*shared/(len(query_trigrams)+len(self.__get_trigrams(normalized_name)))
+            if score>=min_score:
+                scored_names.append((score,normalized_name))
+        scored_names.sort(key=lambda x:(-x[0],x[1]))
+
+        suggestions = [(full_name,round(score,3)) for score, normalized_name in scored_names
+            for full_name in self.normalized_names[normalized_name]]
+
+        return suggestions[:limit]
+
+    def resolve(self,name,min_score=0.8,fuzzy=True):
+        """Find the full name of a player: exact match first, then normalized
+            match, then the best fuzzy match if it is unambiguous
+
+        Args:
+            name (str): Player name
+            min_score (float, optional): Minimum similarity to accept a fuzzy
+                match. Defaults to 0.8.
+            fuzzy (bool, optional): Accept fuzzy matches. A fuzzy match can
+                be a different player, so only use them where the rename is
+                shown to the caller. Defaults to True.
+
+        Returns:
+            str: Full name as in the NBA API, None if not found
+        """
+        if name in self.players_id_dict:
+            return name
+
+        full_names = self.normalized_names.get(self.normalize(name),[])
+        if len(full_names)>1:
+            # father and son, tell them apart by the suffix
+            full_names = [full_name for full_name in full_names
+                if self.__get_suffix(full_name)==self.__get_suffix(name)]
+        if len(full_names)==1:
+            return full_names[0]
+        if len(full_names)>1:
+            logger.warning("Several players match "+str(name)+": "+str(full_names))
+            return None
+        if not fuzzy:
+            return None
+
+        suggestions = self.suggest(name,limit=2,min_score=min_score)
+        if len(suggestions)==1 or (len(suggestions)==2
+            and suggestions[0][1]>suggestions[1][1]):
+            logger.warning("Resolved "+str(name)+" as "+str(suggestions[0][0])
+                +" by similarity "+str(suggestions[0][1]))
+            return suggestions[0][0]
+
+        return None
+
+    def resolve_roster(self,names,limit=5):
+        """Resolve a list of player names in one pass, fuzzy matches
+            included. Every name is returned with the full name it was
+            resolved to, so the caller sees the renames
+
+        Args:
+            names (list): Player names
+            limit (int, optional): Maximum number of suggestions for names
+                that could not be resolved. Defaults to 5.
+
+        Returns:
+            dict: Dict with the full name of every resolved name and ranked
+                suggestions for every missing one
+        """
+        resolved = {}
+        missing = {}
+        for name in dict.fromkeys(names):
+            full_name = self.resolve(name)
+            if full_name is None:
+                missing[name] = self.suggest(name,limit)
+            else:
+                resolved[name] = full_name
+
+        output_dict = {"resolved":resolved,
+            "missing":missing}
+
+        return output_dict
+
+    def get_player_id(self,name):
+        """Get a player's NBA API Id given a name with possibly different
+            accents, punctuation, suffix or nickname. Typos are not
+            corrected here, as a fuzzy match could silently be a different
+            player, resolve them first with resolve_roster
+
+        Args:
+            name (str): Player name
+
+        Returns:
+            int: Player id, None if not found
+        """
+        full_name = self.resolve(name,fuzzy=False)
+        if full_name is None:
+            return None
+
+        return self.players_id_dict[full_name]
+
+    def save(self,path):
+        """Save the index so it does not have to be rebuilt
+
+        Args:
+            path (str): Path of the file
+        """
+        with open(Path(path),"wb") as index_file:
+            pickle.dump(self,index_file)
+
+    @classmethod
+    def load_or_build(cls,nba_players,path=None):
+        """Load a saved index if it matches the player list, build (and
+            save) a new one otherwise
+
+        Args:
+            nba_players (list): Player dicts as returned by players.get_players()
+            path (str, optional): Path of the saved index. Defaults to None,
+                never saving it.
+
+        Returns:
+            PlayerNameIndex: Name index
+        """
+        if path is not None and Path(path).exists():
+            try:
+                with open(Path(path),"rb") as index_file:
+                    name_index = pickle.load(index_file)
+                if name_index.fingerprint==cls.get_fingerprint(nba_players):
+                    return name_index
+                logger.info("Saved player name index is outdated, rebuilding it")
+            except (pickle.UnpicklingError,EOFError,AttributeError) as e:
+                logger.warning("Could not load player name index: "+str(e))
+
+        name_index = cls(nba_players)
+        if path is not None:
+            name_index.save(path)
+
+        return name_index
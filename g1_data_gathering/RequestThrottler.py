@@ -0,0 +1,79 @@
+import time
+import threading
+import logging
+
+from requests.exceptions import RequestException
+
+logger = logging.getLogger("RequestThrottler")
+
+class RequestThrottler():
+    def __init__(self,requests_per_second=2,burst=4,max_retries=4,backoff=1.0,
+        retry_on=(RequestException,)):
+        """Token bucket rate limiter with retries and exponential backoff for
+            calls to stats.nba.com, safe to share between threads
+
+        Args:
+            requests_per_second (float, optional): Sustained request rate.
+                Defaults to 2.
+            burst (int, optional): Maximum number of requests that can be
+                made at once. Defaults to 4.
+            max_retries (int, optional): Retries after a failed request.
+                Defaults to 4.
+            backoff (float, optional): Seconds to wait before the first retry,
+                doubled on every following one. Defaults to 1.0.
+            retry_on (tuple, optional): Exceptions that trigger a retry.
+                Throttled requests surface as HTTP errors (429, 5xx) and
+                timeouts, other errors are raised right away.
+                Defaults to (RequestException,).
+        """
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.retry_on = retry_on
+        self.retry_count = 0
+
+        self.__tokens = burst
+        self.__last_refill = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request can be made"""
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                self.__tokens = min(self.burst,
+                    self.__tokens+(now-self.__last_refill)*self.requests_per_second)
+                self.__last_refill = now
+                if self.__tokens>=1:
+                    self.__tokens = self.__tokens-1
+                    return
+                wait_time = (1-self.__tokens)/self.requests_per_second
+            time.sleep(wait_time)
+
+    def call(self,function,*args,**kwargs):
+        """Call a function that makes a request, respecting the rate limit
+            and retrying with backoff when it fails
+
+        Args:
+            function (function): Function making the request
+
+        Returns:
+            Whatever the function returns
+        """
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                return function(*args,**kwargs)
+            except self.retry_on as error:
+                if attempt>=self.max_retries:
+                    logger.error("Request failed after "+str(attempt+1)+" attempts")
+                    raise
+                wait_time = self.backoff*2**attempt
+                logger.warning("Request failed ("+str(error)+"), retrying in "
+                    +str(wait_time)+" seconds")
+                with self.__lock:
+                    self.retry_count = self.retry_count+1
+                time.sleep(wait_time)
+                attempt = attempt+1
@@ -0,0 +1,85 @@
+import threading
+import logging
+
+logger = logging.getLogger("TeamGamelogRegistry")
+
+class TeamGamelogRegistry():
+    # process wide instance, see get_shared
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self.team_gamelogs = {}
+        self.fetch_count = 0
+        self.__lock = threading.Lock()
+        self.__key_locks = {}
+
+    @classmethod
+    def get_shared(cls):
+        """Get the process wide registry, creating it if needed
+
+        Returns:
+            TeamGamelogRegistry: Shared registry
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+
+        return cls._shared
+
+    def get_team_gamelog(self,team_id,season,fetch_function):
+        """Get a team gamelog with game numbers, fetching it only the first
+            time it is requested
+
+        Args:
+            team_id (int): Team ID
+            season (str): Season (ex: 2019-20)
+            fetch_function (function): Function that returns the team's
+                gamelog with game numbers given the team id
+
+        Returns:
+            pd.DataFrame: Team's gamelog and game number
+        """
+        key = (team_id,season)
+        with self.__lock:
+            key_lock = self.__key_locks.setdefault(key,threading.Lock())
+
+        # one lock per team so different teams can be fetched in parallel
+        with key_lock:
+            if key not in self.team_gamelogs:
+                logger.debug("Registering gamelog for team "+str(team_id))
+                self.team_gamelogs[key] = fetch_function(team_id)
+                with self.__lock:
+                    self.fetch_count = self.fetch_count+1
+
+        return self.team_gamelogs[key]
+
+    def refresh_team_gamelog(self,team_id,season,refresh_function):
+        """Update a registered team gamelog, for example with the games
+            played since it was fetched
+
+        Args:
+            team_id (int): Team ID
+            season (str): Season (ex: 2019-20)
+            refresh_function (function): Function that returns the updated
+                gamelog given the team id and the registered gamelog
+
+        Returns:
+            pd.DataFrame: Updated team gamelog, None if it was not registered
+        """
+        key = (team_id,season)
+        with self.__lock:
+            key_lock = self.__key_locks.setdefault(key,threading.Lock())
+
+        with key_lock:
+            if key not in self.team_gamelogs:
+                return None
+            self.team_gamelogs[key] = refresh_function(team_id,self.team_gamelogs[key])
+
+        return self.team_gamelogs[key]
+
+    def clear(self):
+        """Forget all registered team gamelogs"""
+        with self.__lock:
+            self.team_gamelogs = {}
+            self.__key_locks = {}
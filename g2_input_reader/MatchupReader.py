@@ -11,12 +11,14 @@ logger = logging.getLogger("MatchupReader")
 # TODO: in the 2.0 version, this should be able to read from basketball.sports.ws directly
 
 class MatchupReader():
-    def __init__(self):
+    def __init__(self,datafetcher=None):
         logger.info("MatchupReader initiated")
         self.valid_positions = ["G","F","C","GF","FG","FC","CF"]
         self.input_columns = ["Player","Game","Position","Team"]
         
-        self.datafetcher = DataFetcher()
+        if datafetcher is None:
+            datafetcher = DataFetcher()
+        self.datafetcher = datafetcher
         
     def __check_input_ok(self,input_table):
         assert all(col in self.input_columns
@@ -50,14 +52,14 @@ class MatchupReader():
         Returns:
             boolean: True if all players exist, False otherwise
         """        
-        players_exist = [player for player in input_table["Player"] 
-            if player in self.datafetcher.nba_players_list]
-
         players_dont_exist = [player for player in input_table["Player"] 
-            if player not in self.datafetcher.nba_players_list]
+            if player not in self.datafetcher.players_id_dict]
 
-        if len(players_exist)!=len(input_table["Player"]):
+        if len(players_dont_exist)>0:
             logger.error("The following players do not exist: "+str(players_dont_exist))
+            for player in players_dont_exist:
+                logger.error("Suggestions for "+str(player)+": "
+                    +str(self.datafetcher.name_index.suggest(player)))
             return_value = False
         else:
             logger.debug("All players exist")
@@ -68,6 +70,7 @@ class MatchupReader():
 
     def __fix_player_names(self,team_playersheet):
         """Fix potential problems with player names being imported
+            (accents, suffixes, nicknames, typos)
         
         Args:
             team_playersheet (pd.DataFrame): Table with team players
@@ -75,13 +78,13 @@ class MatchupReader():
         Returns:
             pd.DataFrame: Player teamsheet with fixed names
         """        
-        
-        # replace Jr for Jr.
-        team_playersheet["Player"] = team_playersheet["Player"].str.replace("Jr$","Jr.")
-        #TODO make the following more all encompassing
-        team_playersheet["Player"] = team_playersheet["Player"].str.replace("Bruce Brown Jr.","Bruce Brown")
-        team_playersheet["Player"] = team_playersheet["Player"].str.replace("Ellie","Elie")
-        team_playersheet["Player"] = team_playersheet["Player"].str.replace("Reddick","Redick")
+        resolved_names = self.datafetcher.resolve_player_names(
+            team_playersheet["Player"].tolist())["resolved"]
+        for player, full_name in resolved_names.items():
+            if player!=full_name:
+                logger.info("Renaming "+str(player)+" to "+str(full_name))
+        # names that could not be resolved are kept for __check_players_exist
+        team_playersheet["Player"] = team_playersheet["Player"].replace(resolved_names)
 
         return team_playersheet
 
@@ -0,0 +1,124 @@
+from pathlib import Path
+import numpy as np
+import logging
+
+logger = logging.getLogger("ContinuousFppmSampler")
+
+FPPM_MODELS = ["kde","normal"]
+
+class ContinuousFppmSampler():
+    def __init__(self,quantiles):
+        """Sampler over a continuous FPPM distribution through a tabulated
+            inverse CDF: quantiles[i] is the FPPM at probability
+            i/(len(quantiles)-1), draws are interpolated between them
+
+        Args:
+            quantiles (np.ndarray): Inverse CDF table, non decreasing
+        """
+        self.quantiles = np.asarray(quantiles,dtype=float)
+        self.probabilities = np.linspace(0,1,len(self.quantiles))
+
+    @classmethod
+    def fit(cls,fppms,method="kde",table_size=1024,max_fppm=3,bandwidth=None):
+        """Fit a distribution to a player's fppms and tabulate its inverse CDF
+
+        Args:
+            fppms (np.ndarray): FPPMs of the games the player played
+            method (str, optional): "kde" for a gaussian kernel density or
+                "normal" for a normal distribution, both truncated to
+                [0,max_fppm]. Defaults to "kde".
+            table_size (int, optional): Number of quantiles in the table.
+                Defaults to 1024.
+            max_fppm (float, optional): Highest possible FPPM. Defaults to 3.
+            bandwidth (float, optional): Kernel bandwidth. Defaults to
+                None, Silverman's rule.
+
+        Returns:
+            ContinuousFppmSampler: Fitted sampler
+        """
+        fppms = np.clip(np.asarray(fppms,dtype=float),0,max_fppm)
+        # the density is evaluated on a grid finer than the table
+        fppm_grid = np.linspace(0,max_fppm,4*table_size)
+
+        if method=="kde":
+            if bandwidth is None:
+                bandwidth = cls.silverman_bandwidth(fppms)
+            density = np.exp(-0.5*((fppm_grid[:,None]-fppms[None,:])/bandwidth)**2).sum(axis=1)
+        elif method=="normal":
+            # a single game or equal fppms still get some spread
+            std = max(np.std(fppms,ddof=1) if len(fppms)>1 else 0,0.01)
+            density = np.exp(-0.5*((fppm_grid-np.mean(fppms))/std)**2)
+        else:
+            raise ValueError("Unknown FPPM model "+str(method)+", use one of "+str(FPPM_MODELS))
+
+        # keep the cdf strictly increasing so it can be inverted everywhere
+        density = density+density.max()*1e-9
+        cdf = np.concatenate([[0],np.cumsum((density[1:]+density[:-1])/2*np.diff(fppm_grid))])
+        cdf = cdf/cdf[-1]
+        quantiles = np.interp(np.linspace(0,1,table_size),cdf,fppm_grid)
+
+        return cls(quantiles)
+
+    @staticmethod
+    def silverman_bandwidth(fppms):
+        """Silverman's rule of thumb bandwidth for a gaussian kernel
+
+        Args:
+            fppms (np.ndarray): FPPMs
+
+        Returns:
+            float: Bandwidth, at least 0.01
+        """
+        if len(fppms)<2:
+            return 0.1
+        iqr = np.subtract(*np.percentile(fppms,[75,25]))
+        spread = min(np.std(fppms,ddof=1),iqr/1.34) or np.std(fppms,ddof=1)
+
+        return max(0.9*spread*len(fppms)**(-1/5),0.01)
+
+    def save(self,path):
+        """Save the inverse CDF table
+
+        Args:
+            path (str): Path of the .npy file
+        """
+        np.save(Path(path),self.quantiles)
+
+    @classmethod
+    def load(cls,path):
+        """Load a table saved with save
+
+        Args:
+            path (str): Path of the .npy file
+
+        Returns:
+            ContinuousFppmSampler: Sampler with the saved table
+        """
+        return cls(np.load(Path(path)))
+
+    def sample_from_uniforms(self,uniforms):
+        """Map uniform draws in [0,1) to FPPM outcomes through the inverse CDF
+
+        Args:
+            uniforms (np.ndarray): Uniform draws
+
+        Returns:
+            np.ndarray: FPPM outcomes, same shape as uniforms
+        """
+        return np.interp(uniforms,self.probabilities,self.quantiles)
+
+    def sample(self,number_of_simulations,rng=None):
+        """Draw FPPM outcomes
+
+        Args:
+            number_of_simulations (int): Number of draws
+            rng (np.random.Generator, optional): Random generator.
+                Defaults to a new unseeded one.
+
+        Returns:
+            np.ndarray: Array with number_of_simulations FPPM outcomes
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+
+        return self.sample_from_uniforms(rng.random(number_of_simulations))
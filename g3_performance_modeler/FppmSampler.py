@@ -0,0 +1,62 @@
+import numpy as np
+import logging
+
+logger = logging.getLogger("FppmSampler")
+
+class FppmSampler():
+    def __init__(self,possible_fppm,probabilities):
+        """Inverse CDF sampler over a discrete FPPM distribution
+
+        Args:
+            possible_fppm (list): Possible FPPM values (bins)
+            probabilities (list): Probability of each possible FPPM
+        """
+        self.possible_fppm = np.asarray(possible_fppm,dtype=float)
+        probabilities = np.asarray(probabilities,dtype=float)
+        self.cdf = np.cumsum(probabilities)
+        self.last_bin = np.flatnonzero(probabilities>0)[-1]
+
+    def get_pmf(self):
+        """Get the distribution the sampler draws from
+
+        Returns:
+            tuple: Possible FPPMs and their probabilities
+        """
+        probabilities = np.diff(self.cdf,prepend=0)
+        # draws above the end of the cdf go to the last bin
+        probabilities[self.last_bin] = 1-self.cdf[self.last_bin]+probabilities[self.last_bin]
+        probabilities[self.last_bin+1:] = 0
+
+        return self.possible_fppm, probabilities
+
+    def sample_from_uniforms(self,uniforms):
+        """Map uniform draws in [0,1) to FPPM outcomes through the inverse CDF
+
+        Args:
+            uniforms (np.ndarray): Uniform draws
+
+        Returns:
+            np.ndarray: FPPM outcomes, same shape as uniforms
+        """
+        # side="right" so bins with zero probability can never be drawn
+        bin_index = np.searchsorted(self.cdf,uniforms,side="right")
+        # the cdf can end slightly below 1 due to rounding
+        bin_index = np.minimum(bin_index,self.last_bin)
+
+        return self.possible_fppm[bin_index]
+
+    def sample(self,number_of_simulations,rng=None):
+        """Draw FPPM outcomes
+
+        Args:
+            number_of_simulations (int): Number of draws
+            rng (np.random.Generator, optional): Random generator.
+                Defaults to a new unseeded one.
+
+        Returns:
+            np.ndarray: Array with number_of_simulations FPPM outcomes
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+
+        return self.sample_from_uniforms(rng.random(number_of_simulations))
@@ -1,99 +1,193 @@
+import hashlib
+from pathlib import Path
 import pandas as pd
 import numpy as np
-from collections import Counter
 import statistics as stat
 import logging
 
+from g3_performance_modeler.FppmSampler import FppmSampler
+from g3_performance_modeler.ContinuousFppmSampler import ContinuousFppmSampler, FPPM_MODELS
+
 logger = logging.getLogger("PerformanceModeler")
 
 class PerformanceModeler():
-    def __init__(self,bin_size=0.1):
+    def __init__(self,bin_size=0.1,fppm_model="discrete",table_size=1024,table_cache_dir=None):
         self.possible_fppm = np.arange(0,3.1,bin_size)
         self.possible_fppm = [round(value, 2) for value in self.possible_fppm]
         self.bin_size = bin_size
+        self.max_fppm = 3
+
+        # "discrete" for the histogram over possible_fppm, or a continuous
+        #   model from ContinuousFppmSampler ("kde" or "normal")
+        if fppm_model!="discrete" and fppm_model not in FPPM_MODELS:
+            raise ValueError("Unknown FPPM model "+str(fppm_model)+", use discrete or one of "
+                +str(FPPM_MODELS))
+        self.fppm_model = fppm_model
+        # size of the inverse CDF table of continuous models
+        self.table_size = table_size
+        # if set, continuous tables are saved there and reused by later runs
+        self.table_cache_dir = table_cache_dir
     
+    def __fppms_to_bins(self,fppms):
+        """Clip fppms to [0,max_fppm] and map them to the index of the
+            nearest possible fppm
+        
+        Args:
+            fppms (np.ndarray): Array with fppms
+        
+        Returns:
+            np.ndarray: Array with bin indices
+        """        
+        fppms = np.clip(fppms,0,self.max_fppm)
+        # round half up, with a small tolerance so that exact halves like
+        #   0.35 are not rounded down due to floating point error
+        fppm_bins = np.floor(fppms/self.bin_size+0.5+1e-9).astype(int)
+        fppm_bins = np.minimum(fppm_bins,len(self.possible_fppm)-1)
+
+        return fppm_bins
+
     def __preprocess_player_gamelog_for_fppm(self,player_gamelog):
         """Preprocess player gamelog in order to generate fppm prediction
                 - Select only games where player has played
                 - Cut outliers
-                - Round to neares 0.1
+                - Map to the nearest possible fppm bin
         
         Args:
             player_gamelog (pd.DataFrame): complete player gamelog
         
         Returns:
-            list: List with all valid fppms
+            np.ndarray: Array with the bin index of all valid fppms
         """
         logger.debug("Preprocessing player gamelogs...")        
-        fppms = player_gamelog[player_gamelog["MIN"]>0]["FPPM"]
+        fppms = self.__get_played_fppms(player_gamelog)
+        fppm_bins = self.__fppms_to_bins(fppms)
 
-        if len(fppms)>0:
+        return fppm_bins
 
-            # replace all negative values with 0
-            fppms = [0 if value < 0 else value for value in fppms]
-            fppms = [3 if value > 3 else value for value in fppms]
+    def __get_played_fppms(self,player_gamelog):
+        """Get the fppms of the games the player played
 
-            # round to nearest 0.1
-            fppms = [round(value * self.bin_size*100) / (self.bin_size *100)
-                for value in fppms]
+        Args:
+            player_gamelog (pd.DataFrame): complete player gamelog
 
-        else:
+        Returns:
+            np.ndarray: Array with fppms
+        """
+        fppms = player_gamelog[player_gamelog["MIN"]>0]["FPPM"].to_numpy(dtype=float)
+
+        if len(fppms)==0:
             logger.error("Player has not played any game")
             raise Exception("Player has not played any game")
 
         return fppms
 
-    def __calculate_probabilities(self,fppms):
-        """Given a list of fppms, calculate their probabilities
+    def __fit_continuous_sampler(self,fppms):
+        """Fit the continuous model to a player's fppms, reusing the table
+            from table_cache_dir if the same fppms were fitted before
+
+        Args:
+            fppms (np.ndarray): Array with fppms
+
+        Returns:
+            ContinuousFppmSampler: Sampler with the player's table
+        """
+        if self.table_cache_dir is None:
+            return ContinuousFppmSampler.fit(fppms,self.fppm_model,self.table_size,self.max_fppm)
+
+        fingerprint = hashlib.sha1(
+            (self.fppm_model+"_"+str(self.table_size)+"_"+str(self.max_fppm)).encode()
+            +np.ascontiguousarray(fppms,dtype=float).tobytes()).hexdigest()
+        table_path = Path(self.table_cache_dir)/(fingerprint+".npy")
+        if table_path.exists():
+            logger.debug("Loading fppm table "+str(table_path))
+            return ContinuousFppmSampler.load(table_path)
+
+        sampler = ContinuousFppmSampler.fit(fppms,self.fppm_model,self.table_size,self.max_fppm)
+        table_path.parent.mkdir(parents=True,exist_ok=True)
+        sampler.save(table_path)
+
+        return sampler
+
+    def __calculate_probabilities(self,fppm_bins):
+        """Given the bin indices of a player's fppms, calculate the
+            probability of each possible fppm
         
         Args:
-            fppms (list): list with all the player's fppms
+            fppm_bins (np.ndarray): Bin index of all the player's fppms
         
         Returns:
-            list: list with the probabilities for each possible fppm
+            np.ndarray: Array with the probabilities for each possible fppm
         """        
         logger.debug("Calculating probabilities...")
-        game_count = len(fppms)
+        occurrences = np.bincount(fppm_bins,minlength=len(self.possible_fppm))
+        probabilities = occurrences/len(fppm_bins)
+
+        return probabilities
 
-        # count number of observations
-        occ_counter = Counter(fppms)
+    def calculate_batch_probabilities(self,player_gamelogs):
+        """Calculate the fppm probabilities of many players at once
+        
+        Args:
+            player_gamelogs (dict): Dict with the complete gamelog of each player
+        
+        Returns:
+            dict: Dict with the probabilities for each possible fppm for
+                each player
+        """        
+        logger.debug("Calculating probabilities for "+str(len(player_gamelogs))+" players...")
+        player_names = list(player_gamelogs.keys())
+        number_of_bins = len(self.possible_fppm)
+        max_games = max(len(gamelog) for gamelog in player_gamelogs.values())
 
-        # insert number of observations into all posible occurrences
-        general_occ = {}
-        for pos in self.possible_fppm:
-            if round(pos, 1) in occ_counter.keys():
-                value = occ_counter[pos]
-            else:
-                value = 0
-            general_occ[round(pos, 1)] = value
+        # stack all gamelogs into a players x games array, NaN where a
+        #   player did not play
+        fppm_matrix = np.full((len(player_names),max_games),np.nan)
+        for i, player in enumerate(player_names):
+            gamelog = player_gamelogs[player]
+            fppm_matrix[i,:len(gamelog)] = np.where(gamelog["MIN"]>0,gamelog["FPPM"],np.nan)
 
-        # calculate probabilities given number of observations
-        probabilities = [general_occ[key] / game_count for key in general_occ.keys()]
+        played = ~np.isnan(fppm_matrix)
+        game_count = played.sum(axis=1)
+        if (game_count==0).any():
+            missing_players = [player_names[i] for i in np.flatnonzero(game_count==0)]
+            logger.error("Players have not played any game: "+str(missing_players))
+            raise Exception("Player has not played any game")
 
-        return probabilities
+        # offset each player's bins so one bincount covers all players
+        row_index = np.nonzero(played)[0]
+        fppm_bins = self.__fppms_to_bins(fppm_matrix[played])+row_index*number_of_bins
+        occurrences = np.bincount(fppm_bins,minlength=len(player_names)*number_of_bins)
+        occurrences = occurrences.reshape(len(player_names),number_of_bins)
+        probabilities = occurrences/game_count[:,None]
+
+        return {player:probabilities[i] for i, player in enumerate(player_names)}
 
-    def __run_simulations(self,probabilities,number_of_simulations=100):
+    def __run_simulations(self,probabilities,number_of_simulations=100,rng=None,uniforms=None):
         """ Run simulations given a set of probabilities
         
         Args:
             probabilities (list): List of probabilities for each possible fppm
             number_of_simulations (int, optional): Number of desired simulations.
                  Defaults to 100.
+            rng (np.random.Generator, optional): Random generator, pass a
+                seeded one for reproducible results. Defaults to a new
+                unseeded one.
+            uniforms (np.ndarray, optional): Uniform draws to map to fppms
+                instead of drawing them from rng, for example antithetic or
+                Sobol draws of UniformSampler. Defaults to None.
         
         Returns:
-            np.ndarray: possible_fppm x number_of_simulations array with all 
-                simulated outcomes
+            np.ndarray: Array with number_of_simulations simulated fppms
         """
         if round(sum(probabilities),4)==1:        
             logger.debug("Running simulations for the given player")
-            rng = np.random.default_rng()
-
-            simulation = rng.multinomial(1, probabilities, size=number_of_simulations)
+            if rng is None:
+                rng = np.random.default_rng()
 
-            outcomes = [
-                self.possible_fppm[np.where(simulation[key] == True)[0][0]].sum()
-                for key in range(len(simulation))
-            ]
+            sampler = FppmSampler(self.possible_fppm,probabilities)
+            if uniforms is not None:
+                return sampler.sample_from_uniforms(uniforms[:number_of_simulations])
+            outcomes = sampler.sample(number_of_simulations,rng)
 
             return outcomes
 
@@ -101,25 +195,57 @@ class PerformanceModeler():
             logger.error("Probabilities do not add up to 1")
             raise Exception("Probabilities do not add up to 1")
 
-    def determine_fppm_forecast(self,player_gamelog,number_of_simulations=100):
+    def determine_fppm_forecast(self,player_gamelog,number_of_simulations=100,rng=None,
+        uniforms=None):
         """Given a player gamelog, determine minutes played forecast
         
         Args:
            player_gamelog (pd.DataFrame): complete player gamelog
            number_of_simulations (int, optional): Number of desired simulations.
                 Defaults to 100.
+           rng (np.random.Generator, optional): Random generator.
+                Defaults to a new unseeded one.
+           uniforms (np.ndarray, optional): Uniform draws to map to fppms
+                instead of drawing them from rng. Defaults to None.
         
         Returns:
-            outcomes: list of simulated outcomes<
+            np.ndarray: Array with simulated outcomes
         """
-        #TODO: give option to do a continuous porbability simulation instead
-        #   of discrete        
+        if self.fppm_model!="discrete":
+            sampler = self.determine_fppm_sampler(player_gamelog)
+            if uniforms is not None:
+                return sampler.sample_from_uniforms(uniforms[:number_of_simulations])
+
+            return sampler.sample(number_of_simulations,rng)
+
         fppms = self.__preprocess_player_gamelog_for_fppm(player_gamelog)
         probabilities = self.__calculate_probabilities(fppms)
-        outcomes = self.__run_simulations(probabilities,number_of_simulations)
+        outcomes = self.__run_simulations(probabilities,number_of_simulations,rng,uniforms)
 
         return outcomes
 
+    def determine_fppm_sampler(self,player_gamelog):
+        """Given a player gamelog, build a sampler for the fppm forecast so
+            simulations can be drawn later in as many batches as needed
+        
+        Args:
+           player_gamelog (pd.DataFrame): complete player gamelog
+        
+        Returns:
+            FppmSampler: Sampler over the player's fppm distribution, a
+                ContinuousFppmSampler for continuous models
+        """
+        if self.fppm_model!="discrete":
+            return self.__fit_continuous_sampler(self.__get_played_fppms(player_gamelog))
+
+        fppms = self.__preprocess_player_gamelog_for_fppm(player_gamelog)
+        probabilities = self.__calculate_probabilities(fppms)
+
+        if round(sum(probabilities),4)!=1:
+            logger.error("Probabilities do not add up to 1")
+            raise Exception("Probabilities do not add up to 1")
+
+        return FppmSampler(self.possible_fppm,probabilities)
     
     def determine_minute_forecast(self,player_gamelog):
         """ Given a player gamelog, determine minutes played forecast
@@ -140,20 +266,25 @@ class PerformanceModeler():
 
         return minute_forecast
 
-    def determine_forecast(self,player_gamelog,number_of_simulations=100):
+    def determine_forecast(self,player_gamelog,number_of_simulations=100,rng=None,uniforms=None):
         """Run both models to get fppm and minute forecast
         
         Args:
             player_gamelog (pd.DataFrame): complete player gamelog
             number_of_simulations (int, optional): Number of desired simulations.
                 Defaults to 100.
+            rng (np.random.Generator, optional): Random generator.
+                Defaults to a new unseeded one.
+            uniforms (np.ndarray, optional): Uniform draws to map to fppms
+                instead of drawing them from rng. Defaults to None.
         
         Returns:
             dict: Dict with both forecasts
         """        
         logger.debug("Determining forecast for given player...")
 
-        fppm_forecast = self.determine_fppm_forecast(player_gamelog,number_of_simulations)
+        fppm_forecast = self.determine_fppm_forecast(player_gamelog,number_of_simulations,rng,
+            uniforms)
         minute_forecast = self.determine_minute_forecast(player_gamelog)
 
         output_dict = {"fppm_forecast":fppm_forecast,
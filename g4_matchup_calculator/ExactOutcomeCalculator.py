@@ -0,0 +1,143 @@
+import logging
+import numpy as np
+
+logger = logging.getLogger("ExactOutcomeCalculator")
+
+class ExactOutcomeCalculator():
+    def __init__(self,minute_allocator):
+        """Exact matchup outcome without simulating. Minutes do not depend
+            on FPPM, so every player's FP is a function of their FPPM alone
+            and its distribution follows from the FPPM pmf. Team FP is the
+            sum of independent players, so its pmf is their convolution,
+            done with FFT on the 0.5 FP grid FPU is rounded to
+
+        Args:
+            minute_allocator (MinuteAllocator): Allocator used by the
+                simulations, so minutes are handed out the same way
+        """
+        self.minute_allocator = minute_allocator
+
+    def team_fp_distribution(self,team_sheet,forecast_samplers):
+        """Distribution of a team's FP in regulation
+
+        Args:
+            team_sheet (pd.DataFrame): Team sheet with already played games
+            forecast_samplers (dict): Minute forecast and fppm sampler of
+                each player that has not played yet, the sampler needs a
+                get_pmf method
+
+        Returns:
+            dict: Dict with the pmf over half points starting at offset
+                (FP = (offset+i)/2), and whether position minute caps
+                leave some player minutes unused
+        """
+        ordered_sheet = team_sheet.sort_values("Order").reset_index(drop=True)
+        slots = self.minute_allocator.build_slots(ordered_sheet)
+        players = ordered_sheet["Player"].to_numpy()
+        minutes = ordered_sheet["MIN"].to_numpy(dtype=float)
+        fppm = ordered_sheet["FPPM"].to_numpy(dtype=float)
+        for player in forecast_samplers.keys():
+            minutes[players==player] = forecast_samplers[player]["minute_forecast"]
+
+        allocation = self.minute_allocator.allocate(minutes[None,:],
+            np.nan_to_num(fppm)[None,:],slots)
+        used_minutes = allocation["used_minutes"][0]
+        player_minutes = np.bincount(slots["player_index"],weights=used_minutes,
+            minlength=len(players))
+        # extra times only hand out minutes if some were left unused
+        caps_bind = bool((player_minutes<minutes-1e-9).any())
+
+        pmfs = []
+        offset = 0
+        for i in range(len(players)):
+            if players[i] in forecast_samplers:
+                fppm_values, probabilities = forecast_samplers[players[i]]["fppm_sampler"].get_pmf()
+            else:
+                fppm_values, probabilities = np.array([fppm[i]]), np.array([1.0])
+            # FPU of every slot of the player, rounded to 0.5 as in allocate
+            half_points = np.zeros(len(fppm_values),dtype=np.int64)
+            for slot_minutes in used_minutes[slots["player_index"]==i]:
+                half_points = half_points+np.round(slot_minutes*fppm_values*2).astype(np.int64)
+            player_offset = half_points.min()
+            pmfs.append(np.bincount(half_points-player_offset,weights=probabilities))
+            offset = offset+player_offset
+
+        output_dict = {"pmf":self.convolve(pmfs),
+            "offset":int(offset),
+            "caps_bind":caps_bind}
+
+        return output_dict
+
+    def convolve(self,pmfs):
+        """Distribution of the sum of independent variables on the same grid
+
+        Args:
+            pmfs (list): pmfs starting at 0
+
+        Returns:
+            np.ndarray: pmf of the sum
+        """
+        size = sum(len(pmf) for pmf in pmfs)-len(pmfs)+1
+        fft_size = 1<<int(np.ceil(np.log2(max(size,1))))
+        spectrum = np.ones(fft_size//2+1,dtype=complex)
+        for pmf in pmfs:
+            spectrum = spectrum*np.fft.rfft(pmf,fft_size)
+        pmf = np.fft.irfft(spectrum,fft_size)[:size]
+        # FFT round off leaves tiny negative values
+        pmf = np.clip(pmf,0,None)
+
+        return pmf/pmf.sum()
+
+    def margin_distribution(self,home_distribution,away_distribution):
+        """Distribution of the home score minus the away score, with the
+            +1/-1 home advantage of the simulations
+
+        Args:
+            home_distribution (dict): Output of team_fp_distribution
+            away_distribution (dict): Output of team_fp_distribution
+
+        Returns:
+            tuple: Margins in FP and their probabilities
+        """
+        away_pmf = away_distribution["pmf"]
+        pmf = self.convolve([home_distribution["pmf"],away_pmf[::-1]])
+        # half points of the lowest margin, home advantage is 2 FP
+        offset = home_distribution["offset"]-(away_distribution["offset"]+len(away_pmf)-1)+4
+        margins = (offset+np.arange(len(pmf)))/2
+
+        return margins, pmf
+
+    def summarise(self,margins,probabilities):
+        """Sum up a margin distribution like the simulation results. Only
+            exact if ties cannot happen or stay ties in every extra time
+
+        Args:
+            margins (np.ndarray): Margins in FP
+            probabilities (np.ndarray): Probability of each margin
+
+        Returns:
+            dict: Dict with win, tie and extra time probabilities, median
+                winning margins and the margin distribution
+        """
+        tie_probability = float(probabilities[margins==0].sum())
+        output_results = {"home_win_probability":float(probabilities[margins>0].sum()),
+            "away_win_probability":float(probabilities[margins<0].sum()),
+            "tie_probability":tie_probability,
+            "extra_time_probability":tie_probability,
+            "average_home_margin":self.__weighted_median(margins[margins>0],
+                probabilities[margins>0]),
+            "average_away_margin":self.__weighted_median(-margins[margins<0],
+                probabilities[margins<0]),
+            "margin_distribution":{float(margin):float(probability)
+                for margin, probability in zip(margins,probabilities) if probability>1e-15}}
+
+        return output_results
+
+    def __weighted_median(self,values,weights):
+        """Median of values drawn with the given probabilities"""
+        if weights.sum()==0:
+            return np.nan
+        order = np.argsort(values)
+        cumulative = np.cumsum(weights[order])
+
+        return values[order][np.searchsorted(cumulative,cumulative[-1]/2)]
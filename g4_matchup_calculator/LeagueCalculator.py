@@ -0,0 +1,119 @@
+import copy
+import time
+import logging
+
+from g1_data_gathering.DataFetcher import DataFetcher
+from g1_data_gathering.ConcurrentFetcher import ConcurrentFetcher
+from g4_matchup_calculator.MatchupCalculator import MatchupCalculator
+
+logger = logging.getLogger("LeagueCalculator")
+
+class LeagueCalculator():
+    def __init__(self,matchups,datafetcher=None,max_workers=8,**calculator_kwargs):
+        """Calculate all matchups of a league week at once. Each distinct
+            NBA player is fetched and forecast only once, even if they show
+            up in several matchups
+
+        Args:
+            matchups (dict or list): Matchup dicts as returned by
+                MatchupReader.read_given_excel, by matchup name. A list is
+                named by position
+            datafetcher (DataFetcher, optional): DataFetcher used for every
+                request. Defaults to a new one for this league week,
+                DataFetcher.get_shared() shares one process wide.
+            max_workers (int, optional): Maximum number of threads to fetch
+                players with. Defaults to 8.
+            **calculator_kwargs: Passed on to each MatchupCalculator
+                (vectorized, seed, processes...)
+        """
+        if isinstance(matchups,list):
+            matchups = {i:matchups[i] for i in range(len(matchups))}
+        self.matchups = matchups
+
+        if datafetcher is None:
+            datafetcher = DataFetcher()
+        self.datafetcher = datafetcher
+        self.max_workers = max_workers
+        self.calculator_kwargs = calculator_kwargs
+
+        # forecast samplers by player, shared by all matchups
+        self.forecast_cache = {}
+
+    def prefetch_performances(self):
+        """Fetch the gamelog of every distinct player once and look up the
+            performance of each (player, game number) requested by any
+            matchup
+
+        Returns:
+            dict: Dict with performances by (player name, game number)
+        """
+        player_requests = list(dict.fromkeys((player,matchup[key]["Game"].iloc[0])
+            for matchup in self.matchups.values()
+            for key in matchup.keys()
+            for player in matchup[key]["Player"]))
+
+        concurrent_fetcher = ConcurrentFetcher(self.datafetcher,self.max_workers)
+        player_gamelogs = concurrent_fetcher.get_player_gamelogs(
+            [player for player, _ in player_requests])
+
+        performances = {(player,game_number):self.datafetcher.get_performance_from_gamelog(
+                player,player_gamelogs[player],game_number)
+            for player, game_number in player_requests}
+
+        return performances
+
+    def generate_forecasts(self,number_of_simulations=100,**forecast_kwargs):
+        """Fetch all players, then forecast and simulate every matchup
+
+        Args:
+            number_of_simulations (int, optional): Number of simulations
+                per matchup. Defaults to 100.
+            **forecast_kwargs: Passed on to MatchupCalculator.generate_forecasts
+                (summary_only, chunk_size...)
+
+        Returns:
+            dict: Dict with the output of each matchup plus timings and
+                fetch counts
+        """
+        start_time = time.perf_counter()
+        team_fetches_before = self.datafetcher.team_registry.fetch_count
+
+        logger.info("Fetching players of "+str(len(self.matchups))+" matchups...")
+        prefetched_performances = self.prefetch_performances()
+        fetch_time = time.perf_counter()-start_time
+
+        matchup_outputs = {}
+        for name in self.matchups.keys():
+            logger.info("Calculating matchup "+str(name)+"...")
+            # generate_forecasts fills in the game dict, keep the input intact
+            game_dict = copy.deepcopy(self.matchups[name])
+            matchup_calculator = MatchupCalculator(game_dict,datafetcher=self.datafetcher,
+                **self.calculator_kwargs)
+            matchup_outputs[name] = matchup_calculator.generate_forecasts(game_dict,
+                number_of_simulations,prefetched_performances=prefetched_performances,
+                forecast_cache=self.forecast_cache,**forecast_kwargs)
+
+        wall_time = time.perf_counter()-start_time
+        player_slots = sum(len(matchup[key]) for matchup in self.matchups.values()
+            for key in matchup.keys())
+        fetch_counts = {"player_slots":player_slots,
+            "player_gamelogs":len({player for player, _ in prefetched_performances.keys()}),
+            "team_gamelogs":self.datafetcher.team_registry.fetch_count-team_fetches_before,
+            "forecasts":len(self.forecast_cache)}
+        if self.datafetcher.cache is not None:
+            fetch_counts["cache"] = self.datafetcher.cache.get_stats()
+        fetch_counts["memory_cache"] = self.datafetcher.memory_cache.get_stats()
+
+        logger.info("Calculated "+str(len(self.matchups))+" matchups in "
+            +str(round(wall_time,2))+"s ("+str(round(fetch_time,2))+"s fetching), "
+            +str(fetch_counts["player_gamelogs"])+" player gamelogs for "
+            +str(player_slots)+" player slots")
+
+        output_dict = {"matchups":matchup_outputs,
+            "results_summary":{name:matchup_outputs[name]["results_summary"]
+                for name in matchup_outputs.keys()},
+            "wall_time":wall_time,
+            "fetch_time":fetch_time,
+            "fetch_counts":fetch_counts}
+
+        return output_dict
@@ -1,29 +1,96 @@
+import time
 import logging
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 
 from g1_data_gathering.DataFetcher import DataFetcher
+from g1_data_gathering.ConcurrentFetcher import ConcurrentFetcher
 from g3_performance_modeler.PerformanceModeler import PerformanceModeler
+from g4_matchup_calculator.MinuteAllocator import MinuteAllocator
+from g4_matchup_calculator.SimulationSummary import SimulationSummary
+from g4_matchup_calculator.ExactOutcomeCalculator import ExactOutcomeCalculator
+from g4_matchup_calculator.UniformSampler import UniformSampler
+from g4_matchup_calculator.RunMetrics import RunMetrics, profile_run
 
 logger = logging.getLogger("MatchupCalculator")
 
 class MatchupCalculator():
-    def __init__(self,input_matchup):
+    def __init__(self,input_matchup,vectorized=False,datafetcher=None,max_workers=None,
+        max_extra_times=50,seed=None,processes=None,metrics_sink=None,profile_dir=None,
+        performance_modeler=None):
         self.positions = ["G","F","C"]
 
         self.input_matchup = input_matchup
+
+        # use the array based minute allocation instead of the team sheet one
+        self.vectorized = vectorized
+        
+        # reuse the reader's DataFetcher to share its team gamelogs, or pass
+        #   DataFetcher.get_shared() to share them process wide
+        if datafetcher is None:
+            datafetcher = DataFetcher()
+        self.datafetcher = datafetcher
+
+        # fetch all players of both teams in parallel if set
+        self.max_workers = max_workers
+
+        # pass PerformanceModeler(fppm_model="kde") for continuous fppm forecasts
+        if performance_modeler is None:
+            performance_modeler = PerformanceModeler()
+        self.performance_modeler = performance_modeler
+
+        self.minute_allocator = MinuteAllocator(self.positions)
+        self.exact_outcome_calculator = ExactOutcomeCalculator(self.minute_allocator)
+
+        # games still tied after this many extra times are left as a tie
+        self.max_extra_times = max_extra_times
+
+        # seed for reproducible simulations, None for a random one
+        self.seed = seed
+        # number of processes to simulate summary_only chunks with
+        self.processes = processes
+
+        # object with an emit(metrics) method that gets the stage times and
+        #   counts of every run, see RunMetrics
+        self.metrics_sink = metrics_sink
+        # if set, every run is profiled with cProfile and tracemalloc into
+        #   this folder
+        self.profile_dir = profile_dir
+
+    def __getstate__(self):
+        # the DataFetcher is not needed to simulate and can't be sent to
+        #   other processes
+        state = self.__dict__.copy()
+        state["datafetcher"] = None
+
+        return state
+
+    def prefetch_performances(self,game_dict):
+        """Fetch the performances of all players of all teams in parallel
+        
+        Args:
+            game_dict (dict): Dict with team sheets for home and away teams
         
-        self.datafetcher = DataFetcher()
+        Returns:
+            dict: Dict with performances by (player name, game number)
+        """        
+        player_requests = [(player,game_dict[key]["Game"][0])
+            for key in game_dict.keys()
+            for player in game_dict[key]["Player"]]
+        concurrent_fetcher = ConcurrentFetcher(self.datafetcher,self.max_workers)
 
-        self.performance_modeler = PerformanceModeler()
+        return concurrent_fetcher.get_player_performances(player_requests)
 
-    def assign_already_played_games(self,team_sheet):
+    def assign_already_played_games(self,team_sheet,prefetched_performances=None):
         #TODO pasar al matchup calculator
         """Get all performances from games already played for
             a given team
         
         Args:
             team_sheet (pd.DataFrame): Team Sheet
+            prefetched_performances (dict, optional): Performances already
+                fetched by prefetch_performances. Defaults to None.
         
         Returns:
             dict: Dict with gamelogs for all players and the complete performance_df
@@ -34,9 +101,13 @@ class MatchupCalculator():
         performance_list = []
         gamelog_dict = {}
         for player in team_sheet["Player"]:
-            output_performance = self.datafetcher.get_player_performance(
-                player_name=player,game_number=game_number
-            )
+            if (prefetched_performances is not None
+                and (player,game_number) in prefetched_performances):
+                output_performance = prefetched_performances[(player,game_number)]
+            else:
+                output_performance = self.datafetcher.get_player_performance(
+                    player_name=player,game_number=game_number
+                )
             gamelog_dict[player] = output_performance["player_gamelog"]
             performance_list.append(output_performance["performance"])
 
@@ -183,17 +254,20 @@ class MatchupCalculator():
         
         return result_dict
 
-    def process_team_performances(self,team_sheet):
+    def process_team_performances(self,team_sheet,prefetched_performances=None):
         """Assign already played games to a team sheet + save each player's
             gamelog in a dict
         
         Args:
             team_sheet (pd.DataFrame): Team sheet
+            prefetched_performances (dict, optional): Performances already
+                fetched by prefetch_performances. Defaults to None.
         
         Returns:
             pd.DataFrame: Pandas dataframe with performances
         """        
-        performance_output = self.assign_already_played_games(team_sheet)
+        performance_output = self.assign_already_played_games(team_sheet,
+            prefetched_performances)
         performance_table = performance_output["performance_df"]
         performance_table = performance_table.rename(
             columns={'PLAYER_NAME':'Player'}
@@ -216,29 +290,59 @@ class MatchupCalculator():
 
     # def assign_performance_forecasts
 
-    def __generate_game_scenarios(self,team_performances_dict,number_of_simulations=100):
+    def __generate_game_scenarios(self,team_performances_dict,number_of_simulations=100,rng=None,
+        forecast_cache=None,uniform_sampler=None):
         """Generate forecasts for all players that have not played yet
         
         Args:
             team_performances_dict (dict): Dict with team sheet and player gamelogs
             number_of_simulations (int, optional): Number of simulations
                 to be executed. Defaults to 100.
+            rng (np.random.Generator, optional): Random generator.
+                Defaults to a new unseeded one per player.
+            forecast_cache (dict, optional): Forecast samplers by player,
+                filled in and reused across matchups. Defaults to None.
+            uniform_sampler (UniformSampler, optional): Draws the uniforms
+                mapped to FPPM outcomes, seeded with self.seed. Defaults to
+                None, draws from rng.
         
         Returns:
             dict: Forecasts for all players that have not played yet
         """        
+        players_to_forecast = {}
+        for key in team_performances_dict.keys():
+            team_sheet = team_performances_dict[key]["team_sheet"]
+            players_to_forecast[key] = team_sheet[team_sheet["GAME_PLAYED"]!=1]["Player"].tolist()
+        uniforms = {}
+        if uniform_sampler is not None:
+            players = [(key,player) for key in players_to_forecast.keys()
+                for player in players_to_forecast[key]]
+            uniforms = dict(zip(players,uniform_sampler.draw([player for key, player in players],
+                number_of_simulations,np.random.SeedSequence(self.seed))))
+
+        if forecast_cache is not None:
+            forecast_samplers = self.__generate_forecast_samplers(team_performances_dict,
+                forecast_cache)
+            player_forecasts = {key:{player:{
+                "fppm_forecast":forecast_samplers[key][player]["fppm_sampler"].sample(
+                    number_of_simulations,rng) if uniform_sampler is None
+                    else forecast_samplers[key][player]["fppm_sampler"].sample_from_uniforms(
+                        uniforms[(key,player)]),
+                "minute_forecast":forecast_samplers[key][player]["minute_forecast"]}
+                for player in forecast_samplers[key].keys()}
+                for key in forecast_samplers.keys()}
+
+            return player_forecasts
         
         player_forecasts = {}
         for key in team_performances_dict.keys():
-            player_forecasts[key] = {}
-            team_sheet = team_performances_dict[key]["team_sheet"]
-            players_to_forecast = team_sheet[team_sheet["GAME_PLAYED"]!=1]["Player"].tolist()
-
             player_forecasts[key] = {player:self.performance_modeler.determine_forecast(
                 player_gamelog = team_performances_dict[key]["player_gamelogs"][player],
-                number_of_simulations=number_of_simulations
+                number_of_simulations=number_of_simulations,
+                rng=rng,
+                uniforms=uniforms.get((key,player))
             )
-            for player in players_to_forecast}
+            for player in players_to_forecast[key]}
 
         return player_forecasts
 
@@ -270,39 +374,274 @@ class MatchupCalculator():
         return filled_gamesheet
 
     def process_game(self,game_dict):
-        """Process a game dict in order to determine game winner
+        """Process a game dict in order to determine game winner. Ties are
+            resolved on the slot allocation of both teams, adding only the
+            minutes of each new extra time, and the team sheets are then
+            calculated once for the extra times that were needed
         
         Args:
             game_dict (dict): Dict with player sheets for home and away teams
         
         Returns:
-            dict: Dict with original game_dict, filled game_dict and result
+            dict: Dict with original game_dict, filled game_dict and result.
+                "capped" is True if the game is still tied after
+                max_extra_times extra times
         """        
-        
+        team_matrices = {key:self.__build_team_matrices([game_dict[key]])
+            for key in game_dict.keys()}
+        matrix_results = self.process_forecast_matrices(team_matrices)
+        # extra_times counts the regulation time too
+        needed_extra_times = int(matrix_results["extra_times"][0])-1
+
         # calculate Fantasy Points
-        endgame_dict = {}
-        result = "uncertain"
-        needed_extra_times = 0
-        while result not in ["Home","Away"]:
-            logger.debug("Calculating earned FP using "+str(needed_extra_times)+" ET")
-            for key in game_dict.keys():
-                endgame_dict[key] = self.__calculate_fp(
-                    team_sheet=game_dict[key],
-                    no_of_extra_times=needed_extra_times
-                )
-            result_dict = self.__determine_winner(endgame_dict)
-            result = result_dict["Result"]
-            logger.debug("Game result: "+str(result))
-            needed_extra_times = needed_extra_times+1
+        logger.debug("Calculating earned FP using "+str(needed_extra_times)+" ET")
+        endgame_dict = {key:self.__calculate_fp(
+                team_sheet=game_dict[key],
+                no_of_extra_times=needed_extra_times
+            )
+            for key in game_dict.keys()}
+        result_dict = self.__determine_winner(endgame_dict)
+        logger.debug("Game result: "+str(result_dict["Result"]))
 
         out_dict = {"game_dict":game_dict,
             "endgame_dict":endgame_dict,
             "result":result_dict,
-            "extra_times":needed_extra_times
+            "extra_times":needed_extra_times+1,
+            "capped":bool(matrix_results["capped"][0])
         }
 
         return out_dict
 
+    def __determine_winners(self,home_fp,away_fp):
+        """Determine winners for many simulated games at once
+        
+        Args:
+            home_fp (np.ndarray): Home FP for each simulation
+            away_fp (np.ndarray): Away FP for each simulation
+        
+        Returns:
+            dict: Dict with home scores, away scores and results arrays
+        """        
+        home_score = home_fp +1
+        away_score = away_fp -1
+
+        result = np.full(len(home_score),"Tie",dtype=object)
+        result[home_score>away_score] = "Home"
+        result[away_score>home_score] = "Away"
+
+        result_dict = {"Home":home_score,
+            "Away":away_score,
+            "Result":result}
+
+        return result_dict
+
+    def __build_team_matrices(self,team_sheets):
+        """Stack the MIN and FPPM columns of many filled team sheets of
+            the same team into n_simulations x n_players arrays
+        
+        Args:
+            team_sheets (list): List of filled team sheets
+        
+        Returns:
+            dict: Dict with slot structure, minutes and fppm arrays
+        """        
+        slots = self.minute_allocator.build_slots(team_sheets[0])
+        ordered_sheets = [sheet.sort_values("Order") for sheet in team_sheets]
+        minutes = np.array([sheet["MIN"].to_numpy(dtype=float)
+            for sheet in ordered_sheets])
+        fppm = np.array([sheet["FPPM"].to_numpy(dtype=float)
+            for sheet in ordered_sheets])
+
+        output_dict = {"slots":slots,
+            "minutes":minutes,
+            "fppm":fppm}
+
+        return output_dict
+
+    def build_forecast_matrices(self,team_sheet,forecast_dict,number_of_simulations):
+        """Build the n_simulations x n_players MIN and FPPM arrays of a team
+            straight from its team sheet and forecasts, without filling in
+            a team sheet per simulation
+        
+        Args:
+            team_sheet (pd.DataFrame): Team sheet with already played games
+            forecast_dict (dict): Dict with forecasts for all players
+                that have not played yet
+            number_of_simulations (int): Number of simulations
+        
+        Returns:
+            dict: Dict with slot structure, minutes and fppm arrays
+        """        
+        ordered_sheet = team_sheet.sort_values("Order").reset_index(drop=True)
+        slots = self.minute_allocator.build_slots(ordered_sheet)
+
+        minutes = np.tile(ordered_sheet["MIN"].to_numpy(dtype=float),
+            (number_of_simulations,1))
+        fppm = np.tile(ordered_sheet["FPPM"].to_numpy(dtype=float),
+            (number_of_simulations,1))
+        for player in forecast_dict.keys():
+            columns = np.flatnonzero(ordered_sheet["Player"]==player)
+            minutes[:,columns] = forecast_dict[player]["minute_forecast"]
+            fppm[:,columns] = np.asarray(
+                forecast_dict[player]["fppm_forecast"][:number_of_simulations],
+                dtype=float)[:,None]
+
+        output_dict = {"slots":slots,
+            "minutes":minutes,
+            "fppm":fppm}
+
+        return output_dict
+
+    def process_forecast_matrices(self,team_matrices):
+        """Determine the outcome of all simulations given the forecast
+            matrices of both teams
+        
+        Args:
+            team_matrices (dict): Dict with the forecast matrices of the home
+                and away teams
+        
+        Returns:
+            dict: Dict with scores, results, extra times and per slot
+                allocation arrays for all simulations. "capped" marks the
+                simulations still tied after max_extra_times extra times
+        """        
+        number_of_simulations = team_matrices["Home"]["minutes"].shape[0]
+        home_score = np.zeros(number_of_simulations)
+        away_score = np.zeros(number_of_simulations)
+        results = np.full(number_of_simulations,"Tie",dtype=object)
+        extra_times = np.zeros(number_of_simulations,dtype=int)
+        allocations = {}
+        for key in team_matrices.keys():
+            number_of_slots = len(team_matrices[key]["slots"]["player_index"])
+            allocations[key] = {
+                "used_minutes":np.zeros((number_of_simulations,number_of_slots)),
+                "fpu":np.zeros((number_of_simulations,number_of_slots))}
+
+        pending = np.arange(number_of_simulations)
+        needed_extra_times = 0
+        previous_allocations = None
+        while len(pending)>0 and needed_extra_times<=self.max_extra_times:
+            logger.debug("Calculating earned FP using "+str(needed_extra_times)+" ET for "
+                +str(len(pending))+" games")
+            team_allocations = {}
+            for key in team_matrices.keys():
+                if previous_allocations is None:
+                    allocation = self.minute_allocator.allocate(
+                        minutes=team_matrices[key]["minutes"][pending],
+                        fppm=team_matrices[key]["fppm"][pending],
+                        slots=team_matrices[key]["slots"]
+                    )
+                else:
+                    # only hand out the minutes of the new extra time
+                    allocation = self.minute_allocator.allocate_extra_time(
+                        minutes=team_matrices[key]["minutes"][pending],
+                        fppm=team_matrices[key]["fppm"][pending],
+                        slots=team_matrices[key]["slots"],
+                        previous_allocation=previous_allocations[key]
+                    )
+                team_allocations[key] = allocation
+                allocations[key]["used_minutes"][pending] = allocation["used_minutes"]
+                allocations[key]["fpu"][pending] = allocation["fpu"]
+
+            result_dict = self.__determine_winners(team_allocations["Home"]["fp"],
+                team_allocations["Away"]["fp"])
+            home_score[pending] = result_dict["Home"]
+            away_score[pending] = result_dict["Away"]
+            results[pending] = result_dict["Result"]
+            needed_extra_times = needed_extra_times+1
+            extra_times[pending] = needed_extra_times
+
+            tied = result_dict["Result"]=="Tie"
+            pending = pending[tied]
+            previous_allocations = {key:self.minute_allocator.select(team_allocations[key],tied)
+                for key in team_allocations.keys()}
+
+        capped = np.zeros(number_of_simulations,dtype=bool)
+        capped[pending] = True
+        if len(pending)>0:
+            logger.warning(str(len(pending))+" games still tied after "
+                +str(self.max_extra_times)+" extra times")
+
+        output_dict = {"Home":home_score,
+            "Away":away_score,
+            "Result":results,
+            "extra_times":extra_times,
+            "capped":capped,
+            "unresolved_ties":len(pending),
+            "allocations":allocations,
+            "players":{key:team_matrices[key]["slots"]["players"]
+                for key in team_matrices.keys()},
+            "slots":{key:team_matrices[key]["slots"]
+                for key in team_matrices.keys()}}
+
+        return output_dict
+
+    def __matrix_result_to_outcome(self,matrix_results,simulation_number):
+        """Get the outcome of one simulation out of the results of
+            process_forecast_matrices, as returned by process_game
+        
+        Args:
+            matrix_results (dict): Output of process_forecast_matrices
+            simulation_number (int): Number of the simulation
+        
+        Returns:
+            dict: Dict with per team allocation arrays and result
+        """        
+        i = simulation_number
+        endgame_dict = {key:{"players":matrix_results["players"][key],
+            "UM":matrix_results["allocations"][key]["used_minutes"][i],
+            "FPU":matrix_results["allocations"][key]["fpu"][i]}
+            for key in matrix_results["players"].keys()}
+        game_outcome = {"endgame_dict":endgame_dict,
+            "result":{"Home":matrix_results["Home"][i],
+                "Away":matrix_results["Away"][i],
+                "Result":matrix_results["Result"][i]},
+            "extra_times":matrix_results["extra_times"][i],
+            "capped":bool(matrix_results["capped"][i])
+        }
+
+        return game_outcome
+
+    def __matrix_results_to_outcomes(self,matrix_results,game_simulations=None):
+        """Split the results of process_forecast_matrices into one dict per
+            simulation, as returned by process_game
+        
+        Args:
+            matrix_results (dict): Output of process_forecast_matrices
+            game_simulations (list, optional): Filled game dicts to attach to
+                each outcome. Defaults to None.
+        
+        Returns:
+            list: List of dicts with per team allocation arrays and result
+        """        
+        game_outcomes = []
+        for i in range(len(matrix_results["Result"])):
+            game_outcome = self.__matrix_result_to_outcome(matrix_results,i)
+            if game_simulations is not None:
+                game_outcome["game_dict"] = game_simulations[i]
+            game_outcomes.append(game_outcome)
+
+        return game_outcomes
+
+    def process_games_vectorized(self,game_simulations):
+        """Process many game dicts at once using the array based minute
+            allocation. Gives the same results as process_game
+        
+        Args:
+            game_simulations (list): List of dicts with filled player sheets
+                for home and away teams
+        
+        Returns:
+            list: List of dicts with original game_dict, per team allocation
+                arrays and result
+        """        
+        team_matrices = {key:self.__build_team_matrices(
+            [game_dict[key] for game_dict in game_simulations])
+            for key in ["Home","Away"]}
+        matrix_results = self.process_forecast_matrices(team_matrices)
+
+        return self.__matrix_results_to_outcomes(matrix_results,game_simulations)
+
     def __sum_up_results(self,game_outcomes):
         """Sum up results in a couple of basic measures
         
@@ -328,33 +667,290 @@ class MatchupCalculator():
         average_home_margin = np.median(np.array(victory_margin)[[i for i,x in enumerate(results) if x=="Home"]])
         average_away_margin = np.median(np.array(victory_margin)[[i for i,x in enumerate(results) if x=="Away"]])
 
+        amount_of_extra_times = sum(extra_times)
+
+        # games that hit the extra time cap without a winner
+        unresolved_ties = sum([result=="Tie" for result in results])
+
+        output_results = {"home_victories":home_victories,
+            "away_victories":away_victories,
+            "average_home_margin":average_home_margin,
+            "average_away_margin":average_away_margin,
+            "amount_of_extra_times":amount_of_extra_times,
+            "unresolved_ties":unresolved_ties,
+            "max_extra_times":self.max_extra_times
+            }
+
+        self.__log_results_summary(output_results,len(game_outcomes))
+
+        return output_results
+
+    def __log_results_summary(self,results_summary,number_of_games):
+        """Log the main measures of a results summary
+        
+        Args:
+            results_summary (dict): Dict with calculated measures
+            number_of_games (int): Number of simulated games
+        """        
+        home_victories = results_summary["home_victories"]
+        away_victories = results_summary["away_victories"]
+        average_home_margin = results_summary["average_home_margin"]
+
         if home_victories>away_victories:
-            win_pct = round(home_victories/len(game_outcomes)*100,2)
+            win_pct = round(home_victories/number_of_games*100,2)
             logger.info("\n--> Home won "+str(win_pct)+" percent of the simulated games!")
             logger.info("----> Its average winning margin was "+
                 str(average_home_margin)+" FP")
         elif home_victories<away_victories:
-            win_pct = round(away_victories/len(game_outcomes),2)*100
+            win_pct = round(away_victories/number_of_games,2)*100
             logger.info("\n--> Away won "+str(win_pct)+" percent of the simulated games!")
             logger.info("----> Its average winning margin was "+
                 str(average_home_margin)+" FP")
         else:
             logger.info("--> We have a tie!")
         
-        amount_of_extra_times = sum(extra_times)
-        logger.info(str(amount_of_extra_times)+" extra times were needed")
-
-        output_results = {"home_victories":home_victories,
-            "away_victories":away_victories,
-            "average_home_margin":average_home_margin,
-            "average_away_margin":average_away_margin,
-            "amount_of_extra_times":amount_of_extra_times
-            }
+        logger.info(str(results_summary["amount_of_extra_times"])+" extra times were needed")
 
-        return output_results
+        if results_summary["unresolved_ties"]>0:
+            logger.info(str(results_summary["unresolved_ties"])+" games were still tied after "+
+                str(results_summary["max_extra_times"])+" extra times")
 
                     
-    def generate_forecasts(self,game_dict,number_of_simulations=100):
+    def __generate_forecast_samplers(self,team_performances_dict,forecast_cache=None):
+        """Build minute forecasts and fppm samplers for all players that
+            have not played yet, so their simulations can be drawn in chunks
+        
+        Args:
+            team_performances_dict (dict): Dict with team sheet and player gamelogs
+            forecast_cache (dict, optional): Forecast samplers by player,
+                filled in and reused across matchups. Defaults to None.
+        
+        Returns:
+            dict: Minute forecast and fppm sampler for all players that
+                have not played yet
+        """        
+        if forecast_cache is None:
+            forecast_cache = {}
+        forecast_samplers = {}
+        for key in team_performances_dict.keys():
+            team_sheet = team_performances_dict[key]["team_sheet"]
+            players_to_forecast = team_sheet[team_sheet["GAME_PLAYED"]!=1]["Player"].tolist()
+            player_gamelogs = team_performances_dict[key]["player_gamelogs"]
+
+            for player in players_to_forecast:
+                if player not in forecast_cache:
+                    forecast_cache[player] = {
+                        "fppm_sampler":self.performance_modeler.determine_fppm_sampler(
+                            player_gamelogs[player]),
+                        "minute_forecast":self.performance_modeler.determine_minute_forecast(
+                            player_gamelogs[player])}
+            forecast_samplers[key] = {player:forecast_cache[player]
+                for player in players_to_forecast}
+
+        return forecast_samplers
+
+    def simulate_chunk(self,team_sheets,forecast_samplers,chunk_size,seed_sequence,
+        reservoir_size=0,track_players=False,uniform_sampler=None):
+        """Simulate one chunk of games and sum them up
+        
+        Args:
+            team_sheets (dict): Dict with team sheets with already played games
+                for home and away teams
+            forecast_samplers (dict): Output of __generate_forecast_samplers
+            chunk_size (int): Number of simulations
+            seed_sequence (np.random.SeedSequence): Seed of the chunk
+            reservoir_size (int, optional): Number of full games to keep as a
+                random sample. Defaults to 0.
+            track_players (bool, optional): Sum each player's FPU over all
+                simulations. Defaults to False.
+            uniform_sampler (UniformSampler, optional): Draws the uniforms
+                mapped to FPPM outcomes. Defaults to None, random draws.
+        
+        Returns:
+            SimulationSummary: Aggregated results of the chunk
+        """        
+        if uniform_sampler is None:
+            uniform_sampler = UniformSampler()
+        sampling_seed, reservoir_seed = seed_sequence.spawn(2)
+        players = [(key,player) for key in team_sheets.keys()
+            for player in forecast_samplers[key].keys()]
+        uniforms = dict(zip(players,uniform_sampler.draw([player for key, player in players],
+            chunk_size,sampling_seed)))
+        team_matrices = {}
+        for key in team_sheets.keys():
+            forecast_dict = {player:{
+                "minute_forecast":forecast_samplers[key][player]["minute_forecast"],
+                "fppm_forecast":forecast_samplers[key][player]["fppm_sampler"].sample_from_uniforms(
+                    uniforms[(key,player)])}
+                for player in forecast_samplers[key].keys()}
+            team_matrices[key] = self.build_forecast_matrices(
+                team_sheet=team_sheets[key],
+                forecast_dict=forecast_dict,
+                number_of_simulations=chunk_size)
+        matrix_results = self.process_forecast_matrices(team_matrices)
+
+        simulation_summary = SimulationSummary(reservoir_size,track_players,
+            np.random.default_rng(reservoir_seed))
+        simulation_summary.add_chunk(matrix_results,
+            lambda i: self.__matrix_result_to_outcome(matrix_results,i))
+
+        return simulation_summary
+
+    def simulate_in_chunks(self,game_dict,forecast_samplers,number_of_simulations,
+        chunk_size=10000,reservoir_size=0,track_players=False,uniform_sampler=None):
+        """Simulate games chunk by chunk keeping only aggregated results, so
+            memory does not depend on the number of simulations. Each chunk
+            gets its own seed spawned from self.seed, so results only depend
+            on the seed and chunk size and not on the number of processes
+        
+        Args:
+            game_dict (dict): Dict with team sheets with already played games
+                for home and away teams
+            forecast_samplers (dict): Output of __generate_forecast_samplers
+            number_of_simulations (int): Number of simulations
+            chunk_size (int, optional): Simulations per chunk. Defaults to 10000.
+            reservoir_size (int, optional): Number of full games to keep as a
+                random sample. Defaults to 0.
+            track_players (bool, optional): Sum each player's FPU over all
+                simulations. Defaults to False.
+            uniform_sampler (UniformSampler, optional): Draws the uniforms
+                mapped to FPPM outcomes. Defaults to None, random draws.
+        
+        Returns:
+            SimulationSummary: Aggregated results
+        """        
+        team_sheets = {key:game_dict[key]["team_sheet"] for key in game_dict.keys()}
+        if uniform_sampler is not None:
+            chunk_size = uniform_sampler.get_chunk_size(chunk_size)
+        chunk_sizes = [min(chunk_size,number_of_simulations-chunk_start)
+            for chunk_start in range(0,number_of_simulations,chunk_size)]
+        merge_seed, *chunk_seeds = np.random.SeedSequence(self.seed).spawn(len(chunk_sizes)+1)
+        chunk_arguments = [(team_sheets,forecast_samplers,chunk_sizes[i],chunk_seeds[i],
+            reservoir_size,track_players,uniform_sampler) for i in range(len(chunk_sizes))]
+
+        if self.processes is not None and self.processes>1:
+            logger.info("Simulating "+str(len(chunk_sizes))+" chunks on "
+                +str(self.processes)+" processes...")
+            with ProcessPoolExecutor(max_workers=self.processes) as executor:
+                futures = [executor.submit(self.simulate_chunk,*arguments)
+                    for arguments in chunk_arguments]
+                chunk_summaries = [future.result() for future in futures]
+        else:
+            chunk_summaries = [self.simulate_chunk(*arguments)
+                for arguments in chunk_arguments]
+
+        # merge in chunk order so the result does not depend on the processes
+        simulation_summary = SimulationSummary(reservoir_size,track_players,
+            np.random.default_rng(merge_seed))
+        for chunk_summary in chunk_summaries:
+            simulation_summary.merge(chunk_summary)
+
+        return simulation_summary
+
+    def simulate_adaptively(self,game_dict,forecast_samplers,max_simulations,precision=None,
+        margin_precision=None,time_budget=None,confidence=0.95,chunk_size=10000,
+        reservoir_size=0,track_players=False,uniform_sampler=None):
+        """Simulate chunks until the confidence interval of the home win
+            probability (and of the mean margin if margin_precision is set)
+            is narrow enough, the time budget is spent or max_simulations
+            is reached. Chunk seeds are spawned in the same order as in
+            simulate_in_chunks, so stopping after k chunks gives the same
+            result as simulate_in_chunks with k*chunk_size simulations
+        
+        Args:
+            game_dict (dict): Dict with team sheets with already played games
+                for home and away teams
+            forecast_samplers (dict): Output of __generate_forecast_samplers
+            max_simulations (int): Highest number of simulations
+            precision (float, optional): Target half width of the home win
+                probability interval (ex: 0.005 for +-0.5 pp). Defaults to
+                None, no target.
+            margin_precision (float, optional): Target half width of the mean
+                margin interval in FP. Defaults to None, no target.
+            time_budget (float, optional): Seconds after which no new chunk
+                is started. Defaults to None, no budget.
+            confidence (float, optional): Confidence level of the intervals.
+                Defaults to 0.95.
+            chunk_size (int, optional): Simulations per chunk. Defaults to 10000.
+            reservoir_size (int, optional): Number of full games to keep as a
+                random sample. Defaults to 0.
+            track_players (bool, optional): Sum each player's FPU over all
+                simulations. Defaults to False.
+            uniform_sampler (UniformSampler, optional): Draws the uniforms
+                mapped to FPPM outcomes. The intervals assume independent
+                draws, so with antithetic or sobol sampling they overstate
+                the error. Defaults to None, random draws.
+        
+        Returns:
+            tuple: SimulationSummary with the aggregated results and the
+                reason the simulations stopped ("precision", "time_budget"
+                or "max_simulations")
+        """        
+        if max_simulations<=0:
+            raise ValueError("max_simulations must be positive, got "+str(max_simulations))
+        for name, value in [("precision",precision),("margin_precision",margin_precision)]:
+            if value is not None and value<=0:
+                raise ValueError(name+" must be positive, got "+str(value))
+        if time_budget is not None and time_budget<0:
+            raise ValueError("time_budget must not be negative, got "+str(time_budget))
+        start_time = time.perf_counter()
+        team_sheets = {key:game_dict[key]["team_sheet"] for key in game_dict.keys()}
+        if uniform_sampler is not None:
+            chunk_size = uniform_sampler.get_chunk_size(chunk_size)
+        seed_sequence = np.random.SeedSequence(self.seed)
+        merge_seed = seed_sequence.spawn(1)[0]
+        simulation_summary = SimulationSummary(reservoir_size,track_players,
+            np.random.default_rng(merge_seed))
+        # one chunk per process and round, the stopping rule is checked between rounds
+        chunks_per_round = self.processes if self.processes is not None and self.processes>1 else 1
+        executor = ProcessPoolExecutor(max_workers=chunks_per_round) if chunks_per_round>1 else None
+
+        try:
+            while True:
+                remaining = max_simulations-simulation_summary.number_of_games
+                if remaining<=0:
+                    stopped_by = "max_simulations"
+                    break
+                chunk_sizes = [min(chunk_size,remaining-chunk_start)
+                    for chunk_start in range(0,remaining,chunk_size)][:chunks_per_round]
+                chunk_seeds = seed_sequence.spawn(len(chunk_sizes))
+                chunk_arguments = [(team_sheets,forecast_samplers,chunk_sizes[i],chunk_seeds[i],
+                    reservoir_size,track_players,uniform_sampler) for i in range(len(chunk_sizes))]
+                if executor is not None:
+                    futures = [executor.submit(self.simulate_chunk,*arguments)
+                        for arguments in chunk_arguments]
+                    chunk_summaries = [future.result() for future in futures]
+                else:
+                    chunk_summaries = [self.simulate_chunk(*arguments)
+                        for arguments in chunk_arguments]
+                for chunk_summary in chunk_summaries:
+                    simulation_summary.merge(chunk_summary)
+
+                intervals = simulation_summary.get_confidence_intervals(confidence)
+                if ((precision is not None or margin_precision is not None)
+                    and (precision is None
+                        or intervals["home_win_probability"]["half_width"]<=precision)
+                    and (margin_precision is None
+                        or intervals["margin"]["half_width"]<=margin_precision)):
+                    stopped_by = "precision"
+                    break
+                if time_budget is not None and time.perf_counter()-start_time>=time_budget:
+                    stopped_by = "time_budget"
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        logger.info("Stopped by "+stopped_by+" after "+str(simulation_summary.number_of_games)
+            +" simulations, home win probability +-"
+            +str(round(intervals["home_win_probability"]["half_width"]*100,3))+" pp")
+
+        return simulation_summary, stopped_by
+
+    def generate_forecasts(self,game_dict,number_of_simulations=100,summary_only=False,
+        chunk_size=10000,reservoir_size=0,track_players=False,prefetched_performances=None,
+        forecast_cache=None,precision=None,margin_precision=None,time_budget=None,
+        confidence=0.95,sampling="random",common_random_numbers=False):
         """Master execute for the whole class:
             - Gather information of already played games
             - Generate forecasts for players that have not played yet
@@ -366,42 +962,349 @@ class MatchupCalculator():
             game_dict (dict): Dict with team sheets for home and away teams
             number_of_simulations (int, optional): Number of simulations
                 to be executed. Defaults to 100.
+            summary_only (bool, optional): Simulate in chunks and only keep
+                aggregated results instead of every simulated game.
+                Defaults to False.
+            chunk_size (int, optional): Simulations per chunk when
+                summary_only. Defaults to 10000.
+            reservoir_size (int, optional): Number of full simulated games
+                to keep as a random sample when summary_only. Defaults to 0.
+            track_players (bool, optional): Sum each player's FPU over all
+                simulations when summary_only. Defaults to False.
+            prefetched_performances (dict, optional): Performances by
+                (player name, game number) that were already fetched, for
+                example by LeagueCalculator. Defaults to None.
+            forecast_cache (dict, optional): Forecast samplers by player,
+                filled in and reused across matchups. Defaults to None.
+            precision (float, optional): If set, simulate adaptively until the
+                home win probability interval has this half width (ex: 0.005
+                for +-0.5 pp), number_of_simulations is then the maximum.
+                Implies summary_only. Defaults to None.
+            margin_precision (float, optional): Same as precision for the
+                mean margin in FP. Defaults to None.
+            time_budget (float, optional): If set, simulate adaptively and
+                start no new chunk after this many seconds. Implies
+                summary_only. Defaults to None.
+            confidence (float, optional): Confidence level of the reported
+                intervals. Defaults to 0.95.
+            sampling (str, optional): "random", "antithetic" or "sobol", see
+                UniformSampler. With "sobol" chunk_size is rounded down to a
+                power of 2, without summary_only number_of_simulations
+                should be one to keep the points balanced.
+                Defaults to "random".
+            common_random_numbers (bool, optional): Key each player's draws
+                on their name, so runs with the same seed and different
+                lineups can be compared. Defaults to False.
         
         Returns:
-            dict: Dict with all results
+            dict: Dict with all results, plus the run's stage times and
+                counts under "metrics"
         """        
+        stopping_rule = None
+        if precision is not None or margin_precision is not None or time_budget is not None:
+            summary_only = True
+            stopping_rule = {"precision":precision,
+                "margin_precision":margin_precision,
+                "time_budget":time_budget,
+                "confidence":confidence}
+        uniform_sampler = UniformSampler(sampling,common_random_numbers)
+
+        metrics = RunMetrics()
+        datafetcher_counts = self.__get_datafetcher_counts()
+
+        if self.profile_dir is not None:
+            run_name = "generate_forecasts_"+time.strftime("%Y%m%d_%H%M%S")+"_"+str(id(metrics))
+            with profile_run(self.profile_dir,run_name):
+                output_dict = self.__run_forecasts(game_dict,number_of_simulations,metrics,
+                    summary_only,chunk_size,reservoir_size,track_players,
+                    prefetched_performances,forecast_cache,stopping_rule,uniform_sampler)
+        else:
+            output_dict = self.__run_forecasts(game_dict,number_of_simulations,metrics,
+                summary_only,chunk_size,reservoir_size,track_players,
+                prefetched_performances,forecast_cache,stopping_rule,uniform_sampler)
+
+        # requests, cache hits and retries made during this run
+        for name, value in self.__get_datafetcher_counts().items():
+            metrics.count(name,value-datafetcher_counts.get(name,0))
+        metrics.count("simulations",
+            int(output_dict["results_summary"].get("number_of_games",number_of_simulations)))
+        metrics.count("games_with_extra_time",
+            int(output_dict["results_summary"]["amount_of_extra_times"]))
+        metrics.count("unresolved_ties",int(output_dict["results_summary"]["unresolved_ties"]))
+
+        output_dict["metrics"] = metrics.to_dict()
+        if self.metrics_sink is not None:
+            self.metrics_sink.emit(output_dict["metrics"])
+
+        return output_dict
+
+    def __process_game_performances(self,game_dict,prefetched_performances=None):
+        """Assign already played games to the team sheets of both teams,
+            replacing each team sheet in game_dict by the output of
+            process_team_performances
         
-        logger.info("\nStep 1: Gathering NBA info")
+        Args:
+            game_dict (dict): Dict with team sheets for home and away teams
+            prefetched_performances (dict, optional): Performances already
+                fetched. Defaults to None.
+        """        
+        if prefetched_performances is None and self.max_workers is not None:
+            prefetched_performances = self.prefetch_performances(game_dict)
         for key in game_dict.keys():
             # get already played games
             game_dict[key] = self.process_team_performances(
-                game_dict[key]
+                game_dict[key],prefetched_performances
             )
+
+    def calculate_exact_outcome(self,game_dict,fallback_simulations=100000,chunk_size=10000,
+        prefetched_performances=None,forecast_cache=None):
+        """Win probabilities and margin distribution without simulating:
+            each team's FP pmf is the FFT convolution of its players' FP
+            pmfs. Simulation is only used where the result can't be exact:
+            - a regulation tie is possible and position minute caps leave
+                minutes that extra times hand out, then only the outcome of
+                the tied games is estimated from simulated games tied in
+                regulation
+            - the fppm model is continuous, then everything is simulated
+        
+        Args:
+            game_dict (dict): Dict with team sheets for home and away teams
+            fallback_simulations (int, optional): Number of simulations
+                when falling back. Defaults to 100000.
+            chunk_size (int, optional): Simulations per chunk when falling
+                back. Defaults to 10000.
+            prefetched_performances (dict, optional): Performances by
+                (player name, game number) that were already fetched.
+                Defaults to None.
+            forecast_cache (dict, optional): Forecast samplers by player,
+                filled in and reused across matchups. Defaults to None.
+        
+        Returns:
+            dict: Dict with the results summary (probabilities, regulation
+                margin distribution and method: exact, simulated_ties or
+                simulation), forecasts and metrics
+        """        
+        metrics = RunMetrics()
+        logger.info("\nStep 1: Gathering NBA info")
+        with metrics.stage("fetch"):
+            self.__process_game_performances(game_dict,prefetched_performances)
+
+        logger.info("\nStep 2: Generating forecasts for players where required")
+        with metrics.stage("forecast"):
+            forecast_samplers = self.__generate_forecast_samplers(game_dict,forecast_cache)
+
+        if all(hasattr(forecast_samplers[key][player]["fppm_sampler"],"get_pmf")
+            for key in forecast_samplers.keys() for player in forecast_samplers[key].keys()):
+            logger.info("\nStep 3: Convolving player FP distributions")
+            with metrics.stage("convolve"):
+                team_distributions = {key:self.exact_outcome_calculator.team_fp_distribution(
+                    game_dict[key]["team_sheet"],forecast_samplers[key])
+                    for key in game_dict.keys()}
+                margins, probabilities = self.exact_outcome_calculator.margin_distribution(
+                    team_distributions["Home"],team_distributions["Away"])
+                results_summary = self.exact_outcome_calculator.summarise(margins,probabilities)
+                results_summary["method"] = "exact"
+
+            caps_bind = any(team_distributions[key]["caps_bind"]
+                for key in team_distributions.keys())
+            if caps_bind and results_summary["tie_probability"]>1e-12:
+                logger.info("\nStep 4: Simulating "+str(fallback_simulations)
+                    +" games to break regulation ties")
+                with metrics.stage("simulate"):
+                    tie_outcomes = self.__simulate_regulation_ties(game_dict,forecast_samplers,
+                        fallback_simulations,chunk_size)
+                number_of_ties = sum(tie_outcomes.values())
+                if number_of_ties>0:
+                    tie_probability = results_summary["tie_probability"]
+                    results_summary["home_win_probability"] = (results_summary[
+                        "home_win_probability"]+tie_probability*tie_outcomes["Home"]/number_of_ties)
+                    results_summary["away_win_probability"] = (results_summary[
+                        "away_win_probability"]+tie_probability*tie_outcomes["Away"]/number_of_ties)
+                    results_summary["tie_probability"] = (
+                        tie_probability*tie_outcomes["Tie"]/number_of_ties)
+                    results_summary["method"] = "simulated_ties"
+                else:
+                    logger.warning("No simulated game was tied in regulation, ties are left "
+                        "unresolved")
+        else:
+            logger.info("\nStep 3: Simulating "+str(fallback_simulations)
+                +" games, the fppm model is continuous")
+            with metrics.stage("simulate"):
+                simulation_summary = self.simulate_in_chunks(game_dict,forecast_samplers,
+                    fallback_simulations,chunk_size)
+            results_summary = simulation_summary.get_results_summary()
+            number_of_games = results_summary["number_of_games"]
+            results_summary.update({
+                "home_win_probability":results_summary["home_victories"]/number_of_games,
+                "away_win_probability":results_summary["away_victories"]/number_of_games,
+                "tie_probability":results_summary["unresolved_ties"]/number_of_games,
+                "extra_time_probability":results_summary["amount_of_extra_times"]/number_of_games,
+                "margin_distribution":{margin:count/number_of_games for margin, count
+                    in results_summary["margin_distribution"].items()},
+                "method":"simulation"})
+
+        logger.info("--> Home wins with probability "
+            +str(round(results_summary["home_win_probability"],4))+" ("
+            +results_summary["method"]+")")
+
+        output_dict = {"results_summary":results_summary,
+            "player_forecasts":forecast_samplers,
+            "game_dict":game_dict,
+            "metrics":metrics.to_dict()}
+        if self.metrics_sink is not None:
+            self.metrics_sink.emit(output_dict["metrics"])
+
+        return output_dict
+
+    def __simulate_regulation_ties(self,game_dict,forecast_samplers,number_of_simulations,
+        chunk_size):
+        """Simulate games and count the outcomes of the ones tied in
+            regulation
+        
+        Args:
+            game_dict (dict): Dict with team sheets with already played games
+            forecast_samplers (dict): Output of __generate_forecast_samplers
+            number_of_simulations (int): Number of simulations
+            chunk_size (int): Simulations per chunk
+        
+        Returns:
+            dict: Number of regulation ties won by Home, Away or still tied
+        """        
+        tie_outcomes = {"Home":0,"Away":0,"Tie":0}
+        chunk_sizes = [min(chunk_size,number_of_simulations-chunk_start)
+            for chunk_start in range(0,number_of_simulations,chunk_size)]
+        chunk_seeds = np.random.SeedSequence(self.seed).spawn(len(chunk_sizes))
+        for size, seed_sequence in zip(chunk_sizes,chunk_seeds):
+            rng = np.random.default_rng(seed_sequence)
+            team_matrices = {key:self.build_forecast_matrices(
+                team_sheet=game_dict[key]["team_sheet"],
+                forecast_dict={player:{
+                    "minute_forecast":forecast_samplers[key][player]["minute_forecast"],
+                    "fppm_forecast":forecast_samplers[key][player]["fppm_sampler"].sample(
+                        size,rng)}
+                    for player in forecast_samplers[key].keys()},
+                number_of_simulations=size)
+                for key in game_dict.keys()}
+            matrix_results = self.process_forecast_matrices(team_matrices)
+            tied = matrix_results["extra_times"]>1
+            for result in tie_outcomes.keys():
+                tie_outcomes[result] = (tie_outcomes[result]
+                    +int((matrix_results["Result"][tied]==result).sum()))
+
+        return tie_outcomes
+
+    def __get_datafetcher_counts(self):
+        """Running totals of the DataFetcher's requests, cache hits and
+            retries, to get the ones of a single run by difference
+        
+        Returns:
+            dict: Dict with the counts
+        """        
+        if self.datafetcher is None:
+            return {}
+        counts = {"api_requests":self.datafetcher.request_count,
+            "team_gamelog_fetches":self.datafetcher.team_registry.fetch_count}
+        if self.datafetcher.cache is not None:
+            counts["cache_hits"] = self.datafetcher.cache.hits
+            counts["cache_misses"] = self.datafetcher.cache.misses
+        if self.datafetcher.throttler is not None:
+            counts["api_retries"] = self.datafetcher.throttler.retry_count
+        counts["memory_cache_hits"] = self.datafetcher.memory_cache.hits
+        counts["memory_cache_misses"] = self.datafetcher.memory_cache.misses
+
+        return counts
+
+    def __run_forecasts(self,game_dict,number_of_simulations,metrics,summary_only,chunk_size,
+        reservoir_size,track_players,prefetched_performances,forecast_cache,stopping_rule=None,
+        uniform_sampler=None):
+        """Steps of generate_forecasts, each one timed in metrics"""
+        logger.info("\nStep 1: Gathering NBA info")
+        with metrics.stage("fetch"):
+            self.__process_game_performances(game_dict,prefetched_performances)
+        if summary_only:
+            logger.info("\nStep 2: Generating forecasts for players where required")
+            with metrics.stage("forecast"):
+                forecast_samplers = self.__generate_forecast_samplers(game_dict,forecast_cache)
+
+            logger.info("\nSteps 3-4: Simulating games in chunks of "+str(chunk_size))
+            with metrics.stage("simulate"):
+                if stopping_rule is not None:
+                    simulation_summary, stopped_by = self.simulate_adaptively(game_dict,
+                        forecast_samplers,number_of_simulations,chunk_size=chunk_size,
+                        reservoir_size=reservoir_size,track_players=track_players,
+                        uniform_sampler=uniform_sampler,**stopping_rule)
+                else:
+                    simulation_summary = self.simulate_in_chunks(game_dict,forecast_samplers,
+                        number_of_simulations,chunk_size,reservoir_size,track_players,
+                        uniform_sampler)
+
+            logger.info("\nStep 5: Summing up results")
+            with metrics.stage("summarise"):
+                results_summary = simulation_summary.get_results_summary()
+                results_summary["max_extra_times"] = self.max_extra_times
+                if stopping_rule is not None:
+                    results_summary["confidence_intervals"] = \
+                        simulation_summary.get_confidence_intervals(stopping_rule["confidence"])
+                    results_summary["stopped_by"] = stopped_by
+                self.__log_results_summary(results_summary,simulation_summary.number_of_games)
+
+            output_dict = {"results_summary":results_summary,
+                "simulated_games":simulation_summary.reservoir,
+                "player_forecasts":forecast_samplers,
+                "game_dict":game_dict}
+
+            return output_dict
+
         ## generate game scenarios
         logger.info("\nStep 2: Generating forecasts for players where required")
-        player_forecasts = self.__generate_game_scenarios(game_dict,number_of_simulations)
+        with metrics.stage("forecast"):
+            rng = np.random.default_rng(self.seed)
+            # plain random draws keep coming from rng, so seeded runs give
+            #   the same forecasts as before
+            if uniform_sampler is not None and (uniform_sampler.method!="random"
+                or uniform_sampler.common_random_numbers):
+                scenario_sampler = uniform_sampler
+            else:
+                scenario_sampler = None
+            player_forecasts = self.__generate_game_scenarios(game_dict,number_of_simulations,rng,
+                forecast_cache,scenario_sampler)
 
         ## fill forecasts with generated scenarios
         logger.info("\nStep 3: Filling in forecasts into game canvases")
-        game_simulations = []
-        for i in range(number_of_simulations):
-            game_dict_output = {}
-            for key in game_dict.keys():
-                game_dict_output[key] = self.__fill_gamesheet_with_forecast(
-                    processing_gamesheet=game_dict[key]["team_sheet"],
+        with metrics.stage("fill"):
+            if self.vectorized:
+                # one MIN and one FPPM array per team instead of a sheet per simulation
+                team_matrices = {key:self.build_forecast_matrices(
+                    team_sheet=game_dict[key]["team_sheet"],
                     forecast_dict=player_forecasts[key],
-                    simulation_number=i
-                    )
-            game_simulations.append(game_dict_output)
+                    number_of_simulations=number_of_simulations)
+                    for key in game_dict.keys()}
+            else:
+                game_simulations = []
+                for i in range(number_of_simulations):
+                    game_dict_output = {}
+                    for key in game_dict.keys():
+                        game_dict_output[key] = self.__fill_gamesheet_with_forecast(
+                            processing_gamesheet=game_dict[key]["team_sheet"],
+                            forecast_dict=player_forecasts[key],
+                            simulation_number=i
+                            )
+                    game_simulations.append(game_dict_output)
 
         ## determine outcome of each game
         logger.info("\nStep 4: Determining outcomes of simulated games")
-        game_outcomes = [self.process_game(game_simulations[game_no])
-            for game_no in range(len(game_simulations))]
+        with metrics.stage("score"):
+            if self.vectorized:
+                matrix_results = self.process_forecast_matrices(team_matrices)
+                game_outcomes = self.__matrix_results_to_outcomes(matrix_results)
+            else:
+                game_outcomes = [self.process_game(game_simulations[game_no])
+                    for game_no in range(len(game_simulations))]
 
         ## sum up results
         logger.info("\nStep 5: Summing up results")
-        results_summary = self.__sum_up_results(game_outcomes)
+        with metrics.stage("summarise"):
+            results_summary = self.__sum_up_results(game_outcomes)
 
         output_dict = {"results_summary":results_summary,
             "simulated_games":game_outcomes,
@@ -409,10 +1312,3 @@ class MatchupCalculator():
             "game_dict":game_dict}
         
         return output_dict
-
-
-    
-
-
-    
-
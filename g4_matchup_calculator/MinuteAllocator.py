@@ -0,0 +1,193 @@
+import logging
+import numpy as np
+
+logger = logging.getLogger("MinuteAllocator")
+
+class MinuteAllocator():
+    def __init__(self,positions=None):
+        if positions is None:
+            positions = ["G","F","C"]
+        self.positions = positions
+        # minutes available per position in regulation and per extra time
+        self.base_minutes = {"G":96,"F":96,"C":48}
+        self.extra_time_minutes = {"G":10,"F":10,"C":5}
+
+    def build_slots(self,team_sheet):
+        """Build the position slots for a team sheet, splitting double
+            position players into a primary and a secondary slot, in the
+            same order in which the team sheet is processed
+
+        Args:
+            team_sheet (pd.DataFrame): Team sheet with Player, Position and
+                Order columns
+
+        Returns:
+            dict: Dict with the ordered players and the slot structure
+        """
+        ordered_sheet = team_sheet.sort_values("Order").reset_index(drop=True)
+        players = ordered_sheet["Player"].tolist()
+
+        player_index = []
+        position_index = []
+        is_secondary = []
+        for i in range(len(ordered_sheet)):
+            position = ordered_sheet.loc[i,"Position"]
+            for j in range(len(position[:2])):
+                player_index.append(i)
+                position_index.append(self.positions.index(position[j]))
+                is_secondary.append(j==1)
+
+        slots = {"players":players,
+            "player_index":np.array(player_index,dtype=int),
+            "position_index":np.array(position_index,dtype=int),
+            "is_secondary":np.array(is_secondary,dtype=bool)}
+
+        return slots
+
+    def get_capacity(self,no_of_extra_times=0):
+        """Get the minutes available for each position
+
+        Args:
+            no_of_extra_times (int or np.ndarray, optional): Number of extra
+                times, either one for all simulations or one per simulation.
+                Defaults to 0.
+
+        Returns:
+            list: Available minutes for each position, in self.positions order
+        """
+        no_of_extra_times = np.asarray(no_of_extra_times)
+        capacity = [self.base_minutes[pos]+no_of_extra_times*self.extra_time_minutes[pos]
+            for pos in self.positions]
+
+        return capacity
+
+    def allocate(self,minutes,fppm,slots,no_of_extra_times=0,remaining_minutes=None):
+        """Cascade player minutes through the position slots for all
+            simulations at once. Equivalent to running the team sheet row
+            by row as MatchupCalculator.__calculate_fp does
+
+        Args:
+            minutes (np.ndarray): n_simulations x n_players array with minutes
+            fppm (np.ndarray): n_simulations x n_players array with FPPM
+            slots (dict): Slot structure as returned by build_slots
+            no_of_extra_times (int or np.ndarray, optional): Number of extra
+                times. Defaults to 0.
+            remaining_minutes (list, optional): Minutes available per position
+                to start from. Defaults to the capacity for no_of_extra_times.
+
+        Returns:
+            dict: Dict with used minutes and FPU per slot, remaining minutes
+                per position and total FP per simulation
+        """
+        minutes = np.asarray(minutes,dtype=float)
+        fppm = np.asarray(fppm,dtype=float)
+        number_of_simulations = minutes.shape[0]
+        number_of_slots = len(slots["player_index"])
+
+        if remaining_minutes is None:
+            remaining_minutes = self.get_capacity(no_of_extra_times)
+        remaining_minutes = [np.broadcast_to(np.asarray(value,dtype=float),
+            (number_of_simulations,)).copy() for value in remaining_minutes]
+
+        used_minutes = np.zeros((number_of_simulations,number_of_slots))
+        for slot in range(number_of_slots):
+            player = slots["player_index"][slot]
+            position = slots["position_index"][slot]
+            slot_minutes = minutes[:,player]
+            if slots["is_secondary"][slot]:
+                slot_minutes = slot_minutes-used_minutes[:,slot-1]
+            available = remaining_minutes[position]
+            used = np.where(slot_minutes<=available,slot_minutes,available)
+            used_minutes[:,slot] = used
+            remaining_minutes[position] = available-used
+
+        return self.__build_allocation(used_minutes,fppm,slots,remaining_minutes)
+
+    def __build_allocation(self,used_minutes,fppm,slots,remaining_minutes):
+        """Hidden method to score the used minutes of every slot, shared by
+            allocate and allocate_extra_time so both round FPU the same way
+
+        Args:
+            used_minutes (np.ndarray): n_simulations x n_slots used minutes
+            fppm (np.ndarray): n_simulations x n_players array with FPPM
+            slots (dict): Slot structure as returned by build_slots
+            remaining_minutes (list): Minutes left per position
+
+        Returns:
+            dict: Dict with used minutes and FPU per slot, remaining minutes
+                per position and total FP per simulation
+        """
+        fpu = used_minutes*fppm[:,slots["player_index"]]
+        # round off to nearest 0.5
+        fpu = np.round(fpu*2)/2
+
+        output_dict = {"used_minutes":used_minutes,
+            "fpu":fpu,
+            "remaining_minutes":remaining_minutes,
+            "fp":fpu.sum(axis=1)}
+
+        return output_dict
+
+    def select(self,allocation,mask):
+        """Keep only some simulations of an allocation
+
+        Args:
+            allocation (dict): Output of allocate or allocate_extra_time
+            mask (np.ndarray): Boolean array with the simulations to keep
+
+        Returns:
+            dict: Allocation for the selected simulations
+        """
+        selected = {"used_minutes":allocation["used_minutes"][mask],
+            "fpu":allocation["fpu"][mask],
+            "remaining_minutes":[value[mask] for value in allocation["remaining_minutes"]],
+            "fp":allocation["fp"][mask]}
+
+        return selected
+
+    def allocate_extra_time(self,minutes,fppm,slots,previous_allocation):
+        """Add one extra time on top of a previous allocation, only handing
+            out the minutes that became available instead of cascading the
+            whole team sheet again. Gives the same result as allocate with
+            one more extra time
+
+        Args:
+            minutes (np.ndarray): n_simulations x n_players array with minutes
+            fppm (np.ndarray): n_simulations x n_players array with FPPM
+            slots (dict): Slot structure as returned by build_slots
+            previous_allocation (dict): Allocation of the same simulations
+                with one extra time less
+
+        Returns:
+            dict: Dict with used minutes and FPU per slot, remaining minutes
+                per position and total FP per simulation
+        """
+        minutes = np.asarray(minutes,dtype=float)
+        fppm = np.asarray(fppm,dtype=float)
+        number_of_slots = len(slots["player_index"])
+        previous_used = previous_allocation["used_minutes"]
+
+        # previously unused minutes plus the ones of the new extra time
+        remaining_minutes = [previous_allocation["remaining_minutes"][i]
+            +self.extra_time_minutes[self.positions[i]]
+            for i in range(len(self.positions))]
+
+        used_minutes = previous_used.copy()
+        for slot in range(number_of_slots):
+            player = slots["player_index"][slot]
+            position = slots["position_index"][slot]
+            slot_minutes = minutes[:,player]
+            if slots["is_secondary"][slot]:
+                slot_minutes = slot_minutes-used_minutes[:,slot-1]
+                # if the primary position took extra minutes, the secondary
+                #   one hands them back to the players after it
+                returned = np.maximum(previous_used[:,slot]-slot_minutes,0)
+                remaining_minutes[position] = remaining_minutes[position]+returned
+                used_minutes[:,slot] = previous_used[:,slot]-returned
+            unmet_minutes = slot_minutes-used_minutes[:,slot]
+            available = remaining_minutes[position]
+            extra = np.where(unmet_minutes<=available,unmet_minutes,available)
+            used_minutes[:,slot] = used_minutes[:,slot]+extra
+            remaining_minutes[position] = available-extra
+
+        return self.__build_allocation(used_minutes,fppm,slots,remaining_minutes)
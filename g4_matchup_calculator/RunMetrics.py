@@ -0,0 +1,131 @@
+import json
+import time
+import cProfile
+import tracemalloc
+from pathlib import Path
+from contextlib import contextmanager
+import logging
+
+logger = logging.getLogger("RunMetrics")
+
+class RunMetrics():
+    def __init__(self):
+        """Wall and CPU time per stage plus counts of a single
+            generate_forecasts run
+        """
+        self.stages = {}
+        self.counts = {}
+        self.__start_wall = time.perf_counter()
+        self.__start_cpu = time.process_time()
+
+    @contextmanager
+    def stage(self,name):
+        """Time a stage, adding up if the same stage is timed again
+
+        Args:
+            name (str): Stage name
+        """
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            stage = self.stages.setdefault(name,{"wall_time":0,"cpu_time":0})
+            stage["wall_time"] = stage["wall_time"]+time.perf_counter()-start_wall
+            stage["cpu_time"] = stage["cpu_time"]+time.process_time()-start_cpu
+
+    def count(self,name,value):
+        """Set a count
+
+        Args:
+            name (str): Count name
+            value (int): Count
+        """
+        self.counts[name] = value
+
+    def to_dict(self):
+        """Get the metrics
+
+        Returns:
+            dict: Dict with the stage times, the counts and the total times
+        """
+        output_dict = {"stages":self.stages,
+            "counts":self.counts,
+            "wall_time":time.perf_counter()-self.__start_wall,
+            "cpu_time":time.process_time()-self.__start_cpu}
+
+        return output_dict
+
+
+class LoggingMetricsSink():
+    def __init__(self,level=logging.INFO):
+        """Metrics sink writing every run to the log
+
+        Args:
+            level (int, optional): Log level. Defaults to logging.INFO.
+        """
+        self.level = level
+
+    def emit(self,metrics):
+        """Log the metrics of a run
+
+        Args:
+            metrics (dict): Output of RunMetrics.to_dict
+        """
+        for name, stage in metrics["stages"].items():
+            logger.log(self.level,name+": "+str(round(stage["wall_time"],3))+"s wall, "
+                +str(round(stage["cpu_time"],3))+"s cpu")
+        logger.log(self.level,"counts: "+str(metrics["counts"]))
+
+
+class JsonLinesMetricsSink():
+    def __init__(self,path):
+        """Metrics sink appending every run as a line of JSON
+
+        Args:
+            path (str): Path of the file
+        """
+        self.path = Path(path)
+
+    def emit(self,metrics):
+        """Append the metrics of a run
+
+        Args:
+            metrics (dict): Output of RunMetrics.to_dict
+        """
+        with open(self.path,"a") as metrics_file:
+            metrics_file.write(json.dumps(metrics,default=str)+"\n")
+
+
+@contextmanager
+def profile_run(profile_dir,run_name):
+    """Run the block under cProfile and tracemalloc and dump both to
+        profile_dir: run_name.prof (open with pstats or snakeviz) and
+        run_name_memory.txt with the largest allocations
+
+    Args:
+        profile_dir (str): Folder for the profiles
+        run_name (str): Name of the files
+    """
+    profile_dir = Path(profile_dir)
+    profile_dir.mkdir(parents=True,exist_ok=True)
+    profiler = cProfile.Profile()
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        if not already_tracing:
+            tracemalloc.stop()
+
+        profiler.dump_stats(profile_dir/(run_name+".prof"))
+        with open(profile_dir/(run_name+"_memory.txt"),"w") as memory_file:
+            memory_file.write("peak: "+str(round(peak_memory/2**20,2))+" MB\n")
+            for statistic in snapshot.statistics("lineno")[:25]:
+                memory_file.write(str(statistic)+"\n")
+        logger.info("Profile saved to "+str(profile_dir/(run_name+".prof")))
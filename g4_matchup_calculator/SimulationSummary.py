@@ -0,0 +1,206 @@
+import logging
+from statistics import NormalDist
+import numpy as np
+
+logger = logging.getLogger("SimulationSummary")
+
+class SimulationSummary():
+    def __init__(self,reservoir_size=0,track_players=False,rng=None):
+        """Running aggregate of simulated games, fed chunk by chunk so memory
+            does not grow with the number of simulations
+
+        Args:
+            reservoir_size (int, optional): Number of full games to keep as a
+                uniform random sample for debugging. Defaults to 0.
+            track_players (bool, optional): Sum each player's FPU over all
+                simulations. Defaults to False.
+            rng (np.random.Generator, optional): Random generator for the
+                reservoir sample. Defaults to a new unseeded one.
+        """
+        self.reservoir_size = reservoir_size
+        self.track_players = track_players
+        if rng is None:
+            rng = np.random.default_rng()
+        self.rng = rng
+
+        self.number_of_games = 0
+        self.home_victories = 0
+        self.away_victories = 0
+        self.unresolved_ties = 0
+        self.amount_of_extra_times = 0
+        # margin (home - away score) -> number of games
+        self.margin_counts = {}
+        self.player_contributions = {}
+        self.reservoir = []
+
+    def add_chunk(self,matrix_results,game_outcomes=None):
+        """Add the results of a chunk of simulations
+
+        Args:
+            matrix_results (dict): Output of
+                MatchupCalculator.process_forecast_matrices
+            game_outcomes (function, optional): Function that returns the
+                full game outcome dict for a given index of the chunk, used
+                for the reservoir sample. Defaults to None.
+        """
+        results = matrix_results["Result"]
+        self.home_victories = self.home_victories+int((results=="Home").sum())
+        self.away_victories = self.away_victories+int((results=="Away").sum())
+        self.unresolved_ties = self.unresolved_ties+int((results=="Tie").sum())
+        self.amount_of_extra_times = (self.amount_of_extra_times
+            +int((matrix_results["extra_times"]>1).sum()))
+
+        margins, counts = np.unique(matrix_results["Home"]-matrix_results["Away"],
+            return_counts=True)
+        for margin, count in zip(margins,counts):
+            self.margin_counts[float(margin)] = self.margin_counts.get(float(margin),0)+int(count)
+
+        if self.track_players:
+            for key in matrix_results["players"].keys():
+                player_fpu = np.bincount(matrix_results["slots"][key]["player_index"],
+                    weights=matrix_results["allocations"][key]["fpu"].sum(axis=0),
+                    minlength=len(matrix_results["players"][key]))
+                for player, fpu in zip(matrix_results["players"][key],player_fpu):
+                    team_contributions = self.player_contributions.setdefault(key,{})
+                    team_contributions[player] = team_contributions.get(player,0)+fpu
+
+        if self.reservoir_size>0 and game_outcomes is not None:
+            self.__update_reservoir(len(results),game_outcomes)
+
+        self.number_of_games = self.number_of_games+len(results)
+
+    def __update_reservoir(self,chunk_size,game_outcomes):
+        """Keep a uniform sample of reservoir_size games (reservoir sampling)
+
+        Args:
+            chunk_size (int): Number of games in the chunk
+            game_outcomes (function): Function returning a game outcome dict
+                given its index in the chunk
+        """
+        game_numbers = self.number_of_games+np.arange(chunk_size)
+        replace_positions = self.rng.integers(0,game_numbers+1)
+        for i in range(chunk_size):
+            if game_numbers[i]<self.reservoir_size:
+                self.reservoir.append(game_outcomes(i))
+            elif replace_positions[i]<self.reservoir_size:
+                self.reservoir[replace_positions[i]] = game_outcomes(i)
+
+    def merge(self,other,rng=None):
+        """Add the aggregated results of another summary, for example one
+            computed by another process
+
+        Args:
+            other (SimulationSummary): Summary to add
+            rng (np.random.Generator, optional): Random generator used to
+                combine the reservoir samples. Defaults to self.rng.
+        """
+        if rng is None:
+            rng = self.rng
+        self.home_victories = self.home_victories+other.home_victories
+        self.away_victories = self.away_victories+other.away_victories
+        self.unresolved_ties = self.unresolved_ties+other.unresolved_ties
+        self.amount_of_extra_times = self.amount_of_extra_times+other.amount_of_extra_times
+
+        for margin, count in other.margin_counts.items():
+            self.margin_counts[margin] = self.margin_counts.get(margin,0)+count
+
+        for key in other.player_contributions.keys():
+            team_contributions = self.player_contributions.setdefault(key,{})
+            for player, fpu in other.player_contributions[key].items():
+                team_contributions[player] = team_contributions.get(player,0)+fpu
+
+        if self.reservoir_size>0:
+            # each reservoir is a uniform sample of its games, so take from
+            #   each one in proportion to the number of games it stands for
+            sample_size = min(self.reservoir_size,len(self.reservoir)+len(other.reservoir))
+            if self.number_of_games==0 or other.number_of_games==0:
+                taken_from_self = min(len(self.reservoir),sample_size)
+            else:
+                taken_from_self = rng.hypergeometric(self.number_of_games,
+                    other.number_of_games,sample_size)
+            taken_from_self = int(np.clip(taken_from_self,
+                sample_size-len(other.reservoir),len(self.reservoir)))
+            own_games = rng.choice(len(self.reservoir),taken_from_self,replace=False)
+            other_games = rng.choice(len(other.reservoir),sample_size-taken_from_self,
+                replace=False)
+            self.reservoir = ([self.reservoir[i] for i in own_games]
+                +[other.reservoir[i] for i in other_games])
+
+        self.number_of_games = self.number_of_games+other.number_of_games
+
+    def __weighted_median(self,values,counts):
+        """Median of values repeated counts times, same as np.median"""
+        if counts.sum()==0:
+            return np.nan
+        order = np.argsort(values)
+        values = values[order]
+        cumulative_counts = np.cumsum(counts[order])
+        total = cumulative_counts[-1]
+        lower = values[np.searchsorted(cumulative_counts,(total-1)//2,side="right")]
+        upper = values[np.searchsorted(cumulative_counts,total//2,side="right")]
+
+        return (lower+upper)/2
+
+    def get_confidence_intervals(self,confidence=0.95):
+        """Confidence intervals of the home win probability (Wilson score
+            interval) and of the mean margin (normal approximation)
+
+        Args:
+            confidence (float, optional): Confidence level. Defaults to 0.95.
+
+        Returns:
+            dict: Dict with estimate, lower and upper bound and half width
+                for the home win probability and the margin
+        """
+        z = NormalDist().inv_cdf(0.5+confidence/2)
+        n = self.number_of_games
+        if n==0:
+            return None
+
+        p = self.home_victories/n
+        denominator = 1+z**2/n
+        center = (p+z**2/(2*n))/denominator
+        half_width = z*np.sqrt(p*(1-p)/n+z**2/(4*n**2))/denominator
+        intervals = {"home_win_probability":{"estimate":float(p),
+            "lower":float(center-half_width),
+            "upper":float(center+half_width),
+            "half_width":float(half_width)}}
+
+        margins = np.array(list(self.margin_counts.keys()))
+        counts = np.array(list(self.margin_counts.values()))
+        mean_margin = (margins*counts).sum()/n
+        variance = ((margins-mean_margin)**2*counts).sum()/max(n-1,1)
+        half_width = z*np.sqrt(variance/n)
+        intervals["margin"] = {"estimate":float(mean_margin),
+            "lower":float(mean_margin-half_width),
+            "upper":float(mean_margin+half_width),
+            "half_width":float(half_width)}
+
+        return intervals
+
+    def get_results_summary(self):
+        """Get the aggregated results
+
+        Returns:
+            dict: Dict with calculated measures, same keys as
+                MatchupCalculator's results summary plus the margin
+                distribution and player contributions
+        """
+        margins = np.array(list(self.margin_counts.keys()))
+        counts = np.array(list(self.margin_counts.values()))
+
+        output_results = {"home_victories":self.home_victories,
+            "away_victories":self.away_victories,
+            "average_home_margin":self.__weighted_median(margins[margins>0],
+                counts[margins>0]),
+            "average_away_margin":self.__weighted_median(-margins[margins<0],
+                counts[margins<0]),
+            "amount_of_extra_times":self.amount_of_extra_times,
+            "unresolved_ties":self.unresolved_ties,
+            "number_of_games":self.number_of_games,
+            "margin_distribution":dict(sorted(self.margin_counts.items()))}
+
+        if self.track_players:
+            output_results["player_contributions"] = self.player_contributions
+
+        return output_results
@@ -0,0 +1,90 @@
+import zlib
+import logging
+import numpy as np
+
+logger = logging.getLogger("UniformSampler")
+
+SAMPLING_METHODS = ["random","antithetic","sobol"]
+
+class UniformSampler():
+    def __init__(self,method="random",common_random_numbers=False):
+        """Uniform draws that the fppm samplers map to FPPM outcomes through
+            their inverse CDF, one row per player to forecast:
+            - random: independent pseudo random draws
+            - antithetic: the second half of the simulations uses 1-u of the
+                first half, so high and low draws come in pairs
+            - sobol: scrambled Sobol points, one dimension per player, which
+                cover the unit cube more evenly than random draws. Chunk
+                sizes that are powers of 2 keep the points balanced
+            With common_random_numbers every player gets their own stream
+            keyed on their name, so runs with the same seed but a different
+            lineup share the draws of the common players and the difference
+            between them is estimated with much less noise
+
+        Args:
+            method (str, optional): One of SAMPLING_METHODS. Defaults to "random".
+            common_random_numbers (bool, optional): Key the draws on player
+                names. Not possible with sobol, whose dimensions depend on
+                the whole lineup. Defaults to False.
+        """
+        if method not in SAMPLING_METHODS:
+            raise ValueError("Unknown sampling method "+str(method)+", use one of "
+                +str(SAMPLING_METHODS))
+        if method=="sobol" and common_random_numbers:
+            raise ValueError("Common random numbers cannot be combined with sobol sampling")
+        self.method = method
+        self.common_random_numbers = common_random_numbers
+
+    def get_chunk_size(self,chunk_size):
+        """Chunk size to simulate with. Sobol points are only balanced for
+            powers of 2, so for sobol it is rounded down to one
+
+        Args:
+            chunk_size (int): Requested simulations per chunk
+
+        Returns:
+            int: Simulations per chunk
+        """
+        if self.method!="sobol" or chunk_size&(chunk_size-1)==0:
+            return chunk_size
+        balanced_chunk_size = 1<<(int(chunk_size).bit_length()-1)
+        logger.warning("Sobol points need chunks of a power of 2, simulating in chunks of "
+            +str(balanced_chunk_size)+" instead of "+str(chunk_size))
+
+        return balanced_chunk_size
+
+    def draw(self,players,number_of_simulations,seed_sequence):
+        """Draw uniforms for the players of a chunk
+
+        Args:
+            players (list): Names of the players to forecast
+            number_of_simulations (int): Number of draws per player
+            seed_sequence (np.random.SeedSequence): Seed of the chunk
+
+        Returns:
+            np.ndarray: Uniforms in [0,1], one row per player
+        """
+        if self.common_random_numbers:
+            chunk_state = seed_sequence.generate_state(4)
+            uniforms = [self.__draw_rows(1,number_of_simulations,np.random.default_rng(
+                    np.random.SeedSequence([zlib.crc32(str(player).encode()),*chunk_state])))[0]
+                for player in players]
+            return np.array(uniforms).reshape(len(players),number_of_simulations)
+
+        rng = np.random.default_rng(seed_sequence)
+        if self.method=="sobol" and len(players)>0:
+            # scipy is only needed for sobol draws
+            from scipy.stats import qmc
+            sobol = qmc.Sobol(len(players),scramble=True,seed=rng)
+            points = sobol.random_base2(int(np.ceil(np.log2(max(number_of_simulations,1)))))
+
+            return points[:number_of_simulations].T
+
+        return self.__draw_rows(len(players),number_of_simulations,rng)
+
+    def __draw_rows(self,number_of_rows,number_of_simulations,rng):
+        if self.method=="antithetic":
+            first_half = rng.random((number_of_rows,(number_of_simulations+1)//2))
+            return np.concatenate([first_half,1-first_half],axis=1)[:,:number_of_simulations]
+
+        return rng.random((number_of_rows,number_of_simulations))
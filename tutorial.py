@@ -18,10 +18,44 @@ logging.basicConfig(level=logging.INFO)
 # out = datafetch.get_player_performance("Nikola Jokic",60)
 
 
+# record the NBA API responses once, then run offline from the fixtures
+# from g1_data_gathering.GamelogSources import RecordingSource, ReplaySource
+# matchupreader = MatchupReader(DataFetcher(source=RecordingSource("fixtures")))
+# matchupreader = MatchupReader(DataFetcher(source=ReplaySource("fixtures")))
+
+# load the whole season's gamelogs in two requests and serve players from memory
+# from g1_data_gathering.LeagueGamelogStore import LeagueGamelogStore
+# league_store = LeagueGamelogStore.from_api(DataFetcher().season)
+# matchupreader = MatchupReader(DataFetcher(source=league_store))
+
 matchupreader = MatchupReader()
 
 out = matchupreader.read_given_excel("example_input.xlsx")
 
-matchupcalculator = MatchupCalculator(out)
+# share the reader's DataFetcher so team gamelogs are only fetched once
+matchupcalculator = MatchupCalculator(out,datafetcher=matchupreader.datafetcher)
 
 output = matchupcalculator.generate_forecasts(out,10)
+
+# exact win probabilities from the convolved FP distributions, no simulations
+# exact_output = matchupcalculator.calculate_exact_outcome(
+#     matchupreader.read_given_excel("example_input.xlsx"))
+
+# simulate until the home win probability is known to +-0.5 pp, at most 1M games or 60 s
+# adaptive_output = matchupcalculator.generate_forecasts(
+#     matchupreader.read_given_excel("example_input.xlsx"),1000000,precision=0.005,time_budget=60)
+# print(adaptive_output["results_summary"]["confidence_intervals"])
+# antithetic or scrambled sobol draws reach the same precision with fewer simulations
+# sobol_output = matchupcalculator.generate_forecasts(
+#     matchupreader.read_given_excel("example_input.xlsx"),65536,summary_only=True,
+#     chunk_size=16384,sampling="sobol")
+
+# continuous fppm forecasts (kernel density), tables saved for later runs
+# matchupcalculator = MatchupCalculator(out,datafetcher=matchupreader.datafetcher,
+#     performance_modeler=PerformanceModeler(fppm_model="kde",table_cache_dir="fppm_tables"))
+
+# several matchups of the same week, fetching and forecasting each player once
+# from g4_matchup_calculator.LeagueCalculator import LeagueCalculator
+# matchups = [matchupreader.read_given_excel(path)
+#     for path in ["example_input.xlsx","example_input_2.xlsx"]]
+# league_output = LeagueCalculator(matchups,datafetcher=matchupreader.datafetcher).generate_forecasts(10)